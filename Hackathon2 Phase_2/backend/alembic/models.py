@@ -1,5 +1,6 @@
-from sqlmodel import SQLModel, Field, Relationship
-from datetime import datetime
+from sqlmodel import SQLModel, Field, Relationship, Column, JSON
+from sqlalchemy import Index, LargeBinary, String, text
+from datetime import datetime, date
 from typing import Optional, List
 from enum import Enum
 
@@ -17,6 +18,21 @@ class RecurrencePatternEnum(str, Enum):
     monthly = "monthly"
 
 
+class TaskEventKindEnum(str, Enum):
+    created = "created"
+    updated = "updated"
+    toggled = "toggled"
+    deleted = "deleted"
+    restored = "restored"
+
+
+class ImportStatusEnum(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
 class User(SQLModel, table=True):
     __tablename__ = "user"
 
@@ -49,6 +65,21 @@ class Tag(SQLModel, table=True):
 
 class Task(SQLModel, table=True):
     __tablename__ = "task"
+    __table_args__ = (
+        Index("ix_task_user_id_rank", "user_id", "rank",
+              postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL")),
+        Index("ix_task_user_id_created_at", "user_id", "created_at",
+              postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL")),
+        Index("ix_task_deleted_at", "deleted_at",
+              postgresql_where=text("deleted_at IS NOT NULL"), sqlite_where=text("deleted_at IS NOT NULL")),
+        Index("ix_task_parent_id", "parent_id",
+              postgresql_where=text("parent_id IS NOT NULL"), sqlite_where=text("parent_id IS NOT NULL")),
+        Index("ix_task_user_id_actionable", "user_id", "open_blocker_count", "completed", "rank",
+              postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL")),
+        Index("ix_task_list_id_created_at", "list_id", "created_at",
+              postgresql_where=text("deleted_at IS NULL AND list_id IS NOT NULL"),
+              sqlite_where=text("deleted_at IS NULL AND list_id IS NOT NULL")),
+    )
 
     id: int = Field(primary_key=True)
     title: str = Field(min_length=1, max_length=255)
@@ -62,6 +93,12 @@ class Task(SQLModel, table=True):
     user_id: int = Field(foreign_key="user.id")  # Link to user who owns this task
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    rank: Optional[str] = Field(default=None, sa_column=Column(String(64).with_variant(String(64, collation="C"), "postgresql")))
+    deleted_at: Optional[datetime] = Field(default=None)
+    parent_id: Optional[int] = Field(default=None, foreign_key="task.id")
+    open_blocker_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    list_id: Optional[int] = Field(default=None, foreign_key="task_list.id")
 
     # Relationship to user (owner)
     user: Optional["User"] = Relationship(back_populates="tasks")
@@ -73,15 +110,78 @@ class Task(SQLModel, table=True):
     scheduled_reminders: List["ScheduledReminder"] = Relationship(back_populates="task")
 
 
+class TaskClosure(SQLModel, table=True):
+    __tablename__ = "task_closure"
+    __table_args__ = (
+        Index("ix_task_closure_descendant_id_depth", "descendant_id", "depth"),
+    )
+
+    ancestor_id: int = Field(foreign_key="task.id", primary_key=True)
+    descendant_id: int = Field(foreign_key="task.id", primary_key=True)
+    depth: int
+
+
+class TaskDependency(SQLModel, table=True):
+    __tablename__ = "task_dependency"
+    __table_args__ = (
+        Index("ix_task_dependency_blocker_id_task_id", "blocker_id", "task_id"),
+    )
+
+    task_id: int = Field(foreign_key="task.id", primary_key=True)
+    blocker_id: int = Field(foreign_key="task.id", primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskList(SQLModel, table=True):
+    __tablename__ = "task_list"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(min_length=1, max_length=100)
+    owner_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskListMember(SQLModel, table=True):
+    __tablename__ = "task_list_member"
+    __table_args__ = (
+        Index("ix_task_list_member_user_id_list_id", "user_id", "list_id"),
+    )
+
+    list_id: int = Field(foreign_key="task_list.id", primary_key=True)
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskEvent(SQLModel, table=True):
+    __tablename__ = "task_event"
+    __table_args__ = (
+        Index("ix_task_event_task_id_id", "task_id", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int
+    user_id: int
+    kind: TaskEventKindEnum
+    changes: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class RefreshToken(SQLModel, table=True):
     __tablename__ = "refresh_token"
+    __table_args__ = (
+        Index("ix_refresh_token_user_id_created_at", "user_id", "created_at",
+              postgresql_where=text("revoked_at IS NULL"), sqlite_where=text("revoked_at IS NULL")),
+        Index("ix_refresh_token_revoked_at", "revoked_at",
+              postgresql_where=text("revoked_at IS NOT NULL"), sqlite_where=text("revoked_at IS NOT NULL")),
+    )
 
     id: int = Field(primary_key=True)
-    token: str = Field(max_length=500, unique=True)
+    token_digest: bytes = Field(sa_column=Column(LargeBinary(32), nullable=False, unique=True, index=True))
     user_id: int = Field(foreign_key="user.id")
-    expires_at: datetime
+    expires_at: datetime = Field(index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     revoked: bool = Field(default=False)
+    revoked_at: Optional[datetime] = None
 
 
 class RecurringTaskHistory(SQLModel, table=True):
@@ -105,4 +205,66 @@ class ScheduledReminder(SQLModel, table=True):
     triggered_at: Optional[datetime] = Field(default=None)
 
     # Relationship to task
-    task: "Task" = Relationship(back_populates="scheduled_reminders")
\ No newline at end of file
+    task: "Task" = Relationship(back_populates="scheduled_reminders")
+
+class SmartList(SQLModel, table=True):
+    __tablename__ = "smart_list"
+
+    id: int = Field(primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    name: str = Field(max_length=100)
+    query: str = Field(max_length=500)
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SmartListMember(SQLModel, table=True):
+    __tablename__ = "smart_list_member"
+
+    smart_list_id: int = Field(foreign_key="smart_list.id", primary_key=True)
+    task_id: int = Field(foreign_key="task.id", primary_key=True, index=True)
+
+
+class DailyTaskRollup(SQLModel, table=True):
+    __tablename__ = "daily_task_rollup"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    dimension: str = Field(max_length=10, primary_key=True)
+    value: str = Field(default="", max_length=50, primary_key=True)
+    created_count: int = Field(default=0)
+    completed_count: int = Field(default=0)
+    reopened_count: int = Field(default=0)
+
+
+class TaskImportJob(SQLModel, table=True):
+    __tablename__ = "task_import_job"
+
+    id: int = Field(primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    format: str = Field(max_length=10)
+    status: ImportStatusEnum = Field(default=ImportStatusEnum.pending)
+    rows_read: int = Field(default=0)
+    rows_imported: int = Field(default=0)
+    rows_failed: int = Field(default=0)
+    errors: List[dict] = Field(default_factory=list, sa_column=Column(JSON))
+    rows_per_second: Optional[float] = Field(default=None)
+    message: Optional[str] = Field(default=None, max_length=500)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+
+
+class IdempotencyKey(SQLModel, table=True):
+    __tablename__ = "idempotency_key"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    key: str = Field(max_length=255, primary_key=True)
+    fingerprint: str = Field(max_length=64)
+    status: str = Field(default="in_progress", max_length=16)
+    response_status: Optional[int] = Field(default=None)
+    response_body: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    response_headers: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
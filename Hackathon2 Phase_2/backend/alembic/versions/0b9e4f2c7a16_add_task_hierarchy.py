@@ -0,0 +1,54 @@
+"""Add subtask hierarchy: task.parent_id and the task_closure table
+
+Revision ID: 0b9e4f2c7a16
+Revises: f1c3b8a2d947
+Create Date: 2026-10-19 21:24:52.903417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e4f2c7a16'
+down_revision: Union[str, Sequence[str], None] = 'f1c3b8a2d947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HAS_PARENT = sa.text('parent_id IS NOT NULL')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.add_column(sa.Column('parent_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_task_parent_id_task', 'task', ['parent_id'], ['id'])
+    op.create_index('ix_task_parent_id', 'task', ['parent_id'], unique=False,
+                    postgresql_where=HAS_PARENT, sqlite_where=HAS_PARENT)
+
+    # Primary key (ancestor_id, descendant_id) serves subtree reads; the
+    # (descendant_id, depth) index serves ancestor lookups. Existing tasks
+    # have no parents, so the table starts empty; rebuild_task_closure.py
+    # recomputes it from parent_id should the two ever disagree.
+    op.create_table(
+        'task_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['task.id'], ),
+        sa.ForeignKeyConstraint(['descendant_id'], ['task.id'], ),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_task_closure_descendant_id_depth', 'task_closure', ['descendant_id', 'depth'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_closure_descendant_id_depth', table_name='task_closure')
+    op.drop_table('task_closure')
+    op.drop_index('ix_task_parent_id', table_name='task')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_constraint('fk_task_parent_id_task', type_='foreignkey')
+        batch_op.drop_column('parent_id')
@@ -0,0 +1,41 @@
+"""Add daily task rollup table
+
+Revision ID: 5923b5a4dc54
+Revises: d6d5698b9b7e
+Create Date: 2026-10-19 11:58:31.402917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5923b5a4dc54'
+down_revision: Union[str, Sequence[str], None] = 'd6d5698b9b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The primary key leads with (user_id, day), which serves the
+    # "last N days for one user" range read
+    op.create_table(
+        'daily_task_rollup',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('dimension', sa.String(length=10), nullable=False),
+        sa.Column('value', sa.String(length=50), nullable=False),
+        sa.Column('created_count', sa.Integer(), nullable=False),
+        sa.Column('completed_count', sa.Integer(), nullable=False),
+        sa.Column('reopened_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'dimension', 'value')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_task_rollup')
@@ -0,0 +1,51 @@
+"""Add task dependencies: the task_dependency table and task.open_blocker_count
+
+Revision ID: 5d2a8e7c3f90
+Revises: 0b9e4f2c7a16
+Create Date: 2026-10-19 22:41:07.215836
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8e7c3f90'
+down_revision: Union[str, Sequence[str], None] = '0b9e4f2c7a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_TASK = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No task has blockers yet, so every count starts at 0
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.add_column(sa.Column('open_blocker_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_task_user_id_actionable', 'task', ['user_id', 'open_blocker_count', 'completed', 'rank'],
+                    unique=False, postgresql_where=LIVE_TASK, sqlite_where=LIVE_TASK)
+
+    # Primary key (task_id, blocker_id) serves a task's blockers; the
+    # (blocker_id, task_id) index serves its dependents
+    op.create_table(
+        'task_dependency',
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('blocker_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['task.id'], ),
+        sa.ForeignKeyConstraint(['blocker_id'], ['task.id'], ),
+        sa.PrimaryKeyConstraint('task_id', 'blocker_id')
+    )
+    op.create_index('ix_task_dependency_blocker_id_task_id', 'task_dependency', ['blocker_id', 'task_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_dependency_blocker_id_task_id', table_name='task_dependency')
+    op.drop_table('task_dependency')
+    op.drop_index('ix_task_user_id_actionable', table_name='task')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('open_blocker_count')
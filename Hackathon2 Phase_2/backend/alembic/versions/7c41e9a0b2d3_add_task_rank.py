@@ -0,0 +1,67 @@
+"""Add task rank for manual ordering
+
+Revision ID: 7c41e9a0b2d3
+Revises: d6dd4d1e218a
+Create Date: 2026-10-19 16:22:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41e9a0b2d3'
+down_revision: Union[str, Sequence[str], None] = 'd6dd4d1e218a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+def _sequential_keys(n: int) -> list:
+    """n ascending order keys in the format of src/utils/fractional_index.py.
+
+    Integer-only keys of one width: the head letter ('a' for one digit,
+    'b' for two, ...) followed by the zero-padded base-62 index.
+    """
+    width = 1
+    while len(DIGITS) ** width < n:
+        width += 1
+    keys = []
+    for index in range(n):
+        digits = ''
+        for _ in range(width):
+            index, digit = divmod(index, len(DIGITS))
+            digits = DIGITS[digit] + digits
+        keys.append(chr(ord('a') + width - 1) + digits)
+    return keys
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rank_type = sa.String(length=64).with_variant(sa.String(length=64, collation='C'), 'postgresql')
+    op.add_column('task', sa.Column('rank', rank_type, nullable=True))
+
+    # Existing tasks keep the order they are shown in today, newest first
+    task = sa.table('task', sa.column('id'), sa.column('user_id'), sa.column('created_at'), sa.column('rank'))
+    bind = op.get_bind()
+    user_ids = bind.execute(sa.select(task.c.user_id).distinct()).scalars().all()
+    for user_id in user_ids:
+        task_ids = bind.execute(
+            sa.select(task.c.id).where(task.c.user_id == user_id).order_by(task.c.created_at.desc(), task.c.id)
+        ).scalars().all()
+        ranks = _sequential_keys(len(task_ids))
+        bind.execute(
+            task.update().where(task.c.id == sa.bindparam('task_id')).values(rank=sa.bindparam('new_rank')),
+            [{'task_id': task_id, 'new_rank': rank} for task_id, rank in zip(task_ids, ranks)],
+        )
+
+    op.create_index('ix_task_user_id_rank', 'task', ['user_id', 'rank'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_user_id_rank', table_name='task')
+    op.drop_column('task', 'rank')
@@ -0,0 +1,65 @@
+"""Add shared task lists: task_list, task_list_member and task.list_id
+
+Revision ID: 8c4e1a6f2b37
+Revises: 5d2a8e7c3f90
+Create Date: 2026-10-19 23:52:18.640931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4e1a6f2b37'
+down_revision: Union[str, Sequence[str], None] = '5d2a8e7c3f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_SHARED_TASK = sa.text('deleted_at IS NULL AND list_id IS NOT NULL')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_list',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_list_owner_id'), 'task_list', ['owner_id'], unique=False)
+
+    op.create_table(
+        'task_list_member',
+        sa.Column('list_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['list_id'], ['task_list.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('list_id', 'user_id')
+    )
+    op.create_index('ix_task_list_member_user_id_list_id', 'task_list_member', ['user_id', 'list_id'], unique=False)
+
+    # Existing tasks stay personal (list_id NULL), so the partial index
+    # starts empty
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.add_column(sa.Column('list_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_task_list_id_task_list', 'task_list', ['list_id'], ['id'])
+    op.create_index('ix_task_list_id_created_at', 'task', ['list_id', 'created_at'], unique=False,
+                    postgresql_where=LIVE_SHARED_TASK, sqlite_where=LIVE_SHARED_TASK)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_list_id_created_at', table_name='task')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_constraint('fk_task_list_id_task_list', type_='foreignkey')
+        batch_op.drop_column('list_id')
+    op.drop_index('ix_task_list_member_user_id_list_id', table_name='task_list_member')
+    op.drop_table('task_list_member')
+    op.drop_index(op.f('ix_task_list_owner_id'), table_name='task_list')
+    op.drop_table('task_list')
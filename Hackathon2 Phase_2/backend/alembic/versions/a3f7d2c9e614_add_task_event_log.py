@@ -0,0 +1,42 @@
+"""Add the task_event activity log
+
+Revision ID: a3f7d2c9e614
+Revises: 8c4e1a6f2b37
+Create Date: 2026-10-20 00:37:45.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f7d2c9e614'
+down_revision: Union[str, Sequence[str], None] = '8c4e1a6f2b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Append-only; task_id has no foreign key so the history of a task
+    # survives its purge
+    op.create_table(
+        'task_event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.Enum('created', 'updated', 'toggled', 'deleted', 'restored', name='taskeventkindenum'), nullable=False),
+        sa.Column('changes', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_event_task_id_id', 'task_event', ['task_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_event_task_id_id', table_name='task_event')
+    op.drop_table('task_event')
+    sa.Enum(name='taskeventkindenum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,63 @@
+"""Add task soft delete and partial indexes over live tasks
+
+Revision ID: b83f0d6c2e15
+Revises: 7c41e9a0b2d3
+Create Date: 2026-10-19 17:48:03.502771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83f0d6c2e15'
+down_revision: Union[str, Sequence[str], None] = '7c41e9a0b2d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('deleted_at IS NULL')
+DELETED = sa.text('deleted_at IS NOT NULL')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    # Reads filter on deleted_at IS NULL, so their indexes only cover live tasks
+    op.drop_index('ix_task_user_id_rank', table_name='task')
+    op.create_index('ix_task_user_id_rank', 'task', ['user_id', 'rank'], unique=False,
+                    postgresql_where=LIVE, sqlite_where=LIVE)
+    op.create_index('ix_task_user_id_created_at', 'task', ['user_id', 'created_at'], unique=False,
+                    postgresql_where=LIVE, sqlite_where=LIVE)
+    op.create_index('ix_task_deleted_at', 'task', ['deleted_at'], unique=False,
+                    postgresql_where=DELETED, sqlite_where=DELETED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Soft-deleted tasks would reappear without the column, so they go now.
+    # Dependent tables were created under either naming scheme.
+    bind = op.get_bind()
+    tables = set(sa.inspect(bind).get_table_names())
+    deleted = 'SELECT id FROM task WHERE deleted_at IS NOT NULL'
+    dependents = [
+        ('tasktag', ['task_id']),
+        ('smart_list_member', ['task_id']),
+        ('scheduled_reminder', ['task_id']),
+        ('scheduledreminder', ['task_id']),
+        ('recurring_task_history', ['parent_task_id', 'instance_task_id']),
+        ('recurringtaskhistory', ['parent_task_id', 'instance_task_id']),
+    ]
+    for table, columns in dependents:
+        if table in tables:
+            condition = ' OR '.join(f'{column} IN ({deleted})' for column in columns)
+            op.execute(sa.text(f'DELETE FROM {table} WHERE {condition}'))
+    op.execute(sa.text('DELETE FROM task WHERE deleted_at IS NOT NULL'))
+
+    op.drop_index('ix_task_deleted_at', table_name='task')
+    op.drop_index('ix_task_user_id_created_at', table_name='task')
+    op.drop_index('ix_task_user_id_rank', table_name='task')
+    op.create_index('ix_task_user_id_rank', 'task', ['user_id', 'rank'], unique=False)
+    op.drop_column('task', 'deleted_at')
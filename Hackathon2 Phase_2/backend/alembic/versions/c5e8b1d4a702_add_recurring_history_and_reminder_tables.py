@@ -0,0 +1,55 @@
+"""Add the recurringtaskhistory and scheduledreminder tables
+
+Revision ID: c5e8b1d4a702
+Revises: a3f7d2c9e614
+Create Date: 2026-10-20 09:12:40.361517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8b1d4a702'
+down_revision: Union[str, Sequence[str], None] = 'a3f7d2c9e614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The purge and the recurring task worker write these tables, but so far
+    # only initialize_db created them; databases it set up already have them
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'recurringtaskhistory' not in tables:
+        op.create_table(
+            'recurringtaskhistory',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('parent_task_id', sa.Integer(), nullable=False),
+            sa.Column('instance_task_id', sa.Integer(), nullable=False),
+            sa.Column('occurrence_number', sa.Integer(), nullable=False),
+            sa.Column('scheduled_date', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['parent_task_id'], ['task.id'], ),
+            sa.ForeignKeyConstraint(['instance_task_id'], ['task.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'scheduledreminder' not in tables:
+        op.create_table(
+            'scheduledreminder',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('task_id', sa.Integer(), nullable=False),
+            sa.Column('scheduled_time', sa.DateTime(), nullable=False),
+            sa.Column('triggered', sa.Boolean(), nullable=False),
+            sa.Column('triggered_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['task_id'], ['task.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The tables may predate this revision (see upgrade), so they are kept
+    pass
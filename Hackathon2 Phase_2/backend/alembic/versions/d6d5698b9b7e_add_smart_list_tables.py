@@ -0,0 +1,55 @@
+"""Add smart list tables
+
+Revision ID: d6d5698b9b7e
+Revises: 4dd4c291eb61
+Create Date: 2026-10-19 11:40:12.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6d5698b9b7e'
+down_revision: Union[str, Sequence[str], None] = '4dd4c291eb61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'smart_list',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('query', sa.String(length=500), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_smart_list_user_id'), 'smart_list', ['user_id'], unique=False)
+
+    # Primary key (smart_list_id, task_id) serves the "open a list" join;
+    # the task_id index serves per-task membership maintenance
+    op.create_table(
+        'smart_list_member',
+        sa.Column('smart_list_id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['smart_list_id'], ['smart_list.id'], ),
+        sa.ForeignKeyConstraint(['task_id'], ['task.id'], ),
+        sa.PrimaryKeyConstraint('smart_list_id', 'task_id')
+    )
+    op.create_index(op.f('ix_smart_list_member_task_id'), 'smart_list_member', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_smart_list_member_task_id'), table_name='smart_list_member')
+    op.drop_table('smart_list_member')
+    op.drop_index(op.f('ix_smart_list_user_id'), table_name='smart_list')
+    op.drop_table('smart_list')
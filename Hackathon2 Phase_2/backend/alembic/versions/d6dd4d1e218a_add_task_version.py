@@ -0,0 +1,31 @@
+"""Add task version and stored idempotent response headers
+
+Revision ID: d6dd4d1e218a
+Revises: a057fb8a4ca8
+Create Date: 2026-10-19 14:05:12.648390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6dd4d1e218a'
+down_revision: Union[str, Sequence[str], None] = 'a057fb8a4ca8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows start at version 1 through the server default
+    op.add_column('task', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('idempotency_key', sa.Column('response_headers', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('idempotency_key', 'response_headers')
+    op.drop_column('task', 'version')
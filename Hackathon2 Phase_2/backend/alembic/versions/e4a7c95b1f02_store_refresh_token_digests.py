@@ -0,0 +1,79 @@
+"""Store refresh token digests instead of the tokens
+
+Revision ID: e4a7c95b1f02
+Revises: b83f0d6c2e15
+Create Date: 2026-10-19 19:02:41.118306
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c95b1f02'
+down_revision: Union[str, Sequence[str], None] = 'b83f0d6c2e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+REVOKED = sa.text('revoked_at IS NOT NULL')
+
+
+def _table_name() -> str:
+    # Created by the first migration as refresh_token, by create_all as refreshtoken
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    return 'refresh_token' if 'refresh_token' in tables else 'refreshtoken'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    name = _table_name()
+    op.add_column(name, sa.Column('token_digest', sa.LargeBinary(length=32), nullable=True))
+    op.add_column(name, sa.Column('revoked_at', sa.DateTime(), nullable=True))
+
+    # Digest the existing tokens in id order, one batch per statement round
+    table = sa.table(name, sa.column('id', sa.Integer()), sa.column('token', sa.String()),
+                     sa.column('token_digest', sa.LargeBinary()), sa.column('revoked', sa.Boolean()),
+                     sa.column('revoked_at', sa.DateTime()), sa.column('created_at', sa.DateTime()))
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c.token)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            table.update().where(table.c.id == sa.bindparam('row_id')).values(token_digest=sa.bindparam('digest')),
+            [{'row_id': row.id, 'digest': hashlib.sha256(row.token.encode('utf-8')).digest()} for row in rows],
+        )
+        last_id = rows[-1].id
+    # The time of revocation was not kept; creation time is the best bound
+    op.execute(table.update().where(table.c.revoked == sa.true()).values(revoked_at=table.c.created_at))
+
+    with op.batch_alter_table(name) as batch_op:
+        batch_op.alter_column('token_digest', existing_type=sa.LargeBinary(length=32), nullable=False)
+        batch_op.drop_column('token')
+    op.create_index(f'ix_{name}_token_digest', name, ['token_digest'], unique=True)
+    op.create_index(f'ix_{name}_revoked_at', name, ['revoked_at'], unique=False,
+                    postgresql_where=REVOKED, sqlite_where=REVOKED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    name = _table_name()
+    # Tokens cannot be recovered from their digests; their users sign in again
+    op.execute(sa.text(f'DELETE FROM {name}'))
+    op.drop_index(f'ix_{name}_revoked_at', table_name=name)
+    op.drop_index(f'ix_{name}_token_digest', table_name=name)
+    with op.batch_alter_table(name) as batch_op:
+        batch_op.add_column(sa.Column('token', sa.String(length=500), nullable=False))
+        batch_op.create_unique_constraint(f'uq_{name}_token', ['token'])
+        batch_op.drop_column('revoked_at')
+        batch_op.drop_column('token_digest')
@@ -0,0 +1,48 @@
+"""Add task import job table
+
+Revision ID: eaf23c118c69
+Revises: 5923b5a4dc54
+Create Date: 2026-10-19 12:41:07.530214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eaf23c118c69'
+down_revision: Union[str, Sequence[str], None] = '5923b5a4dc54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_import_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False),
+        sa.Column('status', sa.Enum('pending', 'running', 'completed', 'failed', name='importstatusenum'), nullable=False),
+        sa.Column('rows_read', sa.Integer(), nullable=False),
+        sa.Column('rows_imported', sa.Integer(), nullable=False),
+        sa.Column('rows_failed', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('rows_per_second', sa.Float(), nullable=True),
+        sa.Column('message', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_task_import_job_user_id'), 'task_import_job', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_import_job_user_id'), table_name='task_import_job')
+    op.drop_table('task_import_job')
+    sa.Enum(name='importstatusenum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,41 @@
+"""Add refresh token indexes for the purge and the per-user cap
+
+Revision ID: f1c3b8a2d947
+Revises: e4a7c95b1f02
+Create Date: 2026-10-19 20:11:26.540183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3b8a2d947'
+down_revision: Union[str, Sequence[str], None] = 'e4a7c95b1f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNREVOKED = sa.text('revoked_at IS NULL')
+
+
+def _table_name() -> str:
+    # Created by the first migration as refresh_token, by create_all as refreshtoken
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    return 'refresh_token' if 'refresh_token' in tables else 'refreshtoken'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    name = _table_name()
+    op.create_index(f'ix_{name}_expires_at', name, ['expires_at'], unique=False)
+    op.create_index(f'ix_{name}_user_id_created_at', name, ['user_id', 'created_at'], unique=False,
+                    postgresql_where=UNREVOKED, sqlite_where=UNREVOKED)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    name = _table_name()
+    op.drop_index(f'ix_{name}_user_id_created_at', table_name=name)
+    op.drop_index(f'ix_{name}_expires_at', table_name=name)
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+from typing import Optional
+from config import settings
+from database import get_session
+from services.analytics_service import AnalyticsService
+from middleware.auth_middleware import get_current_user
+from models.user import User
+
+
+router = APIRouter()
+
+
+@router.get("/analytics/daily")
+def get_daily_analytics(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    days: int = Query(90, ge=1, le=settings.ANALYTICS_MAX_DAYS, description="Number of days to return, ending today"),
+    dimension: Optional[str] = Query(None, pattern="^(all|priority|tag)$", description="Only return one breakdown (all, priority, tag)")
+):
+    """Get tasks created and completed per day, overall and per priority and tag"""
+    try:
+        return AnalyticsService(session).get_daily(current_user.id, days, dimension)
+    except Exception as e:
+        print(f"Error retrieving analytics: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve analytics")
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlmodel import Session
 from database import get_session
 from models.user import UserLogin, UserResponse
 from schemas.auth import LoginResponse, RefreshTokenRequest, TokenRefreshResponse
-from services.auth_service import create_user, authenticate_and_create_tokens, refresh_access_token
+from services.auth_service import create_user, authenticate_and_create_tokens, refresh_access_token, revoke_refresh_token
 from utils.validation import validate_password_strength
+from utils.password_hasher import HashQueueFullError
+from utils.rate_limit import check_auth_rate_limit
 from .request_models import UserCreateRequest
 
 
@@ -13,9 +15,20 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 from models.user import UserCreate  # Import at the top to avoid runtime import
 
+
+def _hashing_busy(e: HashQueueFullError) -> HTTPException:
+    """503 for a login or registration turned away because password hashing is saturated"""
+    return HTTPException(
+        status_code=503,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
 @router.post("/register")  # Temporarily remove response_model to test
-def register(user_create: UserCreateRequest, session: Session = Depends(get_session)):
+def register(user_create: UserCreateRequest, request: Request, session: Session = Depends(get_session)):
     """Register a new user."""
+    check_auth_rate_limit(request, user_create.email)
+
     # Manual validation to avoid any potential bcrypt-related issues during request parsing
     password = user_create.password
     if len(password) < 8:
@@ -38,6 +51,8 @@ def register(user_create: UserCreateRequest, session: Session = Depends(get_sess
         result = create_user(session, sql_user_create)
         # Return a simple dict instead of the model
         return {"id": result.id, "email": result.email, "created_at": result.created_at.isoformat()}
+    except HashQueueFullError as e:
+        raise _hashing_busy(e)
     except ValueError as e:
         print("Error in register:", e )
 
@@ -45,9 +60,13 @@ def register(user_create: UserCreateRequest, session: Session = Depends(get_sess
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(user_login: UserLogin, session: Session = Depends(get_session)):
+def login(user_login: UserLogin, request: Request, session: Session = Depends(get_session)):
     """Authenticate user and return access/refresh tokens."""
-    result = authenticate_and_create_tokens(session, user_login.email, user_login.password)
+    check_auth_rate_limit(request, user_login.email)
+    try:
+        result = authenticate_and_create_tokens(session, user_login.email, user_login.password)
+    except HashQueueFullError as e:
+        raise _hashing_busy(e)
     if not result:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
@@ -61,4 +80,10 @@ def refresh_token(refresh_request: RefreshTokenRequest, session: Session = Depen
     if not result:
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
     
-    return TokenRefreshResponse(access_token=result["access_token"])
\ No newline at end of file
+    return TokenRefreshResponse(access_token=result["access_token"])
+
+
+@router.post("/logout", status_code=204)
+def logout(refresh_request: RefreshTokenRequest, session: Session = Depends(get_session)):
+    """Revoke a refresh token. Unknown or already revoked tokens are accepted too."""
+    revoke_refresh_token(session, refresh_request.refresh_token)
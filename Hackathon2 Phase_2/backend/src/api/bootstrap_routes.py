@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+from config import settings
+from database import get_session, begin_read_snapshot
+from models.task_model import Tag
+from schemas.bootstrap import BootstrapResponse
+from services.task_service import TaskService
+from middleware.auth_middleware import get_current_user
+from models.user import User
+
+
+router = APIRouter()
+
+
+@router.get("/bootstrap", response_model=BootstrapResponse, response_model_exclude_none=True)
+def get_bootstrap(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Get everything the dashboard needs after login in one round-trip.
+
+    Authentication, the first page of tasks, all tags, task counts and
+    upcoming reminders share one session, and the reads run inside one
+    read-only transaction so they are mutually consistent. The queries run
+    one after another: the sync drivers used here cannot multiplex a single
+    connection, and spreading them over several connections would give up
+    the shared snapshot.
+    """
+    try:
+        user_id = current_user.id
+        begin_read_snapshot(session)
+
+        task_service = TaskService(session)
+        tasks = task_service.get_task_page(user_id, settings.BOOTSTRAP_TASK_LIMIT)
+        tags = session.exec(select(Tag)).all()
+        counts = task_service.get_task_counts(user_id)
+        reminders = task_service.get_upcoming_reminders(user_id, settings.BOOTSTRAP_REMINDER_LIMIT)
+
+        return BootstrapResponse(tasks=tasks, tags=tags, counts=counts, reminders=reminders)
+    except Exception as e:
+        print(f"Error building bootstrap payload: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to load dashboard data")
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from middleware.auth_middleware import get_current_user
+from models.user import User
+from utils.metrics import metrics
+
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics(current_user: User = Depends(get_current_user)):
+    """Get in-process counters and timings for this worker"""
+    return metrics.snapshot()
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import List
+from database import get_session
+from models.task_model import Task
+from models.smart_list_model import SmartListCreate, SmartListUpdate, SmartListRead
+from services.smart_list_service import SmartListService
+from middleware.auth_middleware import get_current_user
+from models.user import User
+
+
+router = APIRouter()
+
+
+@router.get("/smart-lists", response_model=List[SmartListRead])
+def get_smart_lists(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Get all saved smart lists for the authenticated user"""
+    try:
+        return SmartListService(session).get_lists(current_user.id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to retrieve smart lists")
+
+
+@router.post("/smart-lists", response_model=SmartListRead, status_code=201)
+def create_smart_list(
+    list_data: SmartListCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Save a filter expression as a smart list for the authenticated user"""
+    try:
+        return SmartListService(session).create_list(list_data, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to create smart list")
+
+
+@router.put("/smart-lists/{id}", response_model=SmartListRead)
+def update_smart_list(
+    id: int,
+    list_data: SmartListUpdate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Rename a smart list or change its filter expression"""
+    try:
+        smart_list = SmartListService(session).update_list(id, current_user.id, list_data)
+        if not smart_list:
+            raise HTTPException(status_code=404, detail="Smart list not found")
+        return smart_list
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to update smart list")
+
+
+@router.delete("/smart-lists/{id}", status_code=204)
+def delete_smart_list(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Delete a smart list"""
+    try:
+        success = SmartListService(session).delete_list(id, current_user.id)
+        if not success:
+            raise HTTPException(status_code=404, detail="Smart list not found")
+        return {"message": "Smart list deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to delete smart list")
+
+
+@router.get("/smart-lists/{id}/tasks", response_model=List[Task])
+def get_smart_list_tasks(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Get the tasks in a smart list from its materialized membership"""
+    try:
+        smart_list_service = SmartListService(session)
+        smart_list = smart_list_service.get_list(id, current_user.id)
+        if not smart_list:
+            raise HTTPException(status_code=404, detail="Smart list not found")
+        return smart_list_service.get_list_tasks(smart_list)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error retrieving smart list tasks: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve smart list tasks")
+
+
+@router.post("/smart-lists/{id}/rebuild")
+def rebuild_smart_list(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Recompute the membership of a smart list from scratch"""
+    try:
+        smart_list_service = SmartListService(session)
+        smart_list = smart_list_service.get_list(id, current_user.id)
+        if not smart_list:
+            raise HTTPException(status_code=404, detail="Smart list not found")
+        count = smart_list_service.rebuild_list(smart_list)
+        return {"id": id, "task_count": count}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Failed to rebuild smart list")
@@ -3,6 +3,7 @@ from sqlmodel import Session, select
 from typing import List
 from database import get_session
 from models.task_model import Tag, TagCreate, TagRead
+from services.tag_service import invalidate_tag
 from utils.error_formatter import format_error, format_success
 
 router = APIRouter()
@@ -60,8 +61,10 @@ def delete_tag(id: int, session: Session = Depends(get_session)):
         if not tag:
             raise HTTPException(status_code=404, detail="Tag not found")
         
+        name = tag.name
         session.delete(tag)
         session.commit()
+        invalidate_tag(name)
         return {"message": "Tag deleted successfully"}
     except HTTPException:
         raise
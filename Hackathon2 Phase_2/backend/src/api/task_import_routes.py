@@ -0,0 +1,70 @@
+import os
+import tempfile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+from config import settings
+from database import get_session
+from models.task_import_job_model import TaskImportJobRead
+from services.task_import_service import TaskImportService, run_import_job
+from middleware.auth_middleware import get_current_user
+from models.user import User
+
+
+router = APIRouter()
+
+
+@router.post("/tasks/import", response_model=TaskImportJobRead, status_code=202)
+async def import_tasks(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Format of the request body (ndjson, csv)"),
+    gzip: bool = Query(False, description="The request body is gzip-compressed")
+):
+    """Start importing the tasks in the request body; poll the returned job for progress.
+
+    The body is the same layout GET /api/tasks/export produces. It is
+    streamed to a temporary file and loaded in the background. File and
+    database writes run in the threadpool, off the event loop.
+    """
+    fd, path = tempfile.mkstemp(prefix="task-import-", suffix=f".{format}")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as upload:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.IMPORT_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Imports may be at most {settings.IMPORT_MAX_BYTES} bytes"
+                    )
+                await run_in_threadpool(upload.write, chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="The request body is empty")
+
+        job = await run_in_threadpool(TaskImportService(session).create_job, current_user.id, format)
+    except HTTPException:
+        await run_in_threadpool(os.remove, path)
+        raise
+    except Exception as e:
+        await run_in_threadpool(os.remove, path)
+        print(f"Error starting task import: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to start import")
+
+    background_tasks.add_task(run_import_job, job.id, path, gzip)
+    return job
+
+
+@router.get("/tasks/import/{job_id}", response_model=TaskImportJobRead)
+def get_import_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Get the status and progress of an import job"""
+    job = TaskImportService(session).get_job(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
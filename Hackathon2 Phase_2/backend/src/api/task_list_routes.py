@@ -0,0 +1,102 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session
+from typing import List
+from database import get_session
+from models.task_list_model import TaskListCreate, TaskListMemberCreate, TaskListRead, TaskListMemberRead
+from services.task_list_service import TaskListService
+from middleware.auth_middleware import get_current_user
+from models.user import User
+
+
+router = APIRouter()
+
+
+@router.get("/task-lists", response_model=List[TaskListRead])
+def get_task_lists(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Get the shared task lists the authenticated user is a member of"""
+    try:
+        return TaskListService(session).get_lists(current_user.id)
+    except Exception as e:
+        print(f"Error retrieving task lists: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve task lists")
+
+
+@router.post("/task-lists", response_model=TaskListRead, status_code=201)
+def create_task_list(
+    list_data: TaskListCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Create a shared task list owned by the authenticated user.
+
+    Tasks are added to it by creating them with its list_id.
+    """
+    try:
+        return TaskListService(session).create_list(list_data, current_user.id)
+    except Exception as e:
+        print(f"Error creating task list: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to create task list")
+
+
+@router.get("/task-lists/{id}/members", response_model=List[TaskListMemberRead])
+def get_task_list_members(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Get the members of a shared task list"""
+    try:
+        members = TaskListService(session).get_members(id, current_user.id)
+        if members is None:
+            raise HTTPException(status_code=404, detail="Task list not found")
+        return members
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error retrieving task list members: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve task list members")
+
+
+@router.post("/task-lists/{id}/members", status_code=201)
+def add_task_list_member(
+    id: int,
+    member_data: TaskListMemberCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Give another user access to the list's tasks; only the list's owner may"""
+    try:
+        member = TaskListService(session).add_member(id, current_user.id, member_data.email)
+        if not member:
+            raise HTTPException(status_code=404, detail="Task list not found")
+        return {"list_id": member.list_id, "user_id": member.user_id}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error adding task list member: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to add task list member")
+
+
+@router.delete("/task-lists/{id}/members/{user_id}", status_code=204)
+def remove_task_list_member(
+    id: int,
+    user_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Remove a member from a shared task list, or leave it (user_id of the authenticated user)"""
+    try:
+        if not TaskListService(session).remove_member(id, current_user.id, user_id):
+            raise HTTPException(status_code=404, detail="Member not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error removing task list member: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to remove task list member")
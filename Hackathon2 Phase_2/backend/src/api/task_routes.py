@@ -1,31 +1,160 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import re
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query
 from sqlmodel import Session
 from typing import List, Optional
-from database import get_session
-from models.task_model import Task, TaskCreate, TaskUpdate, PriorityEnum
-from services.task_service import TaskService
+from database import get_session, get_engine
+from models.task_model import Task, TaskCreate, TaskUpdate, TaskMove, TaskReparent, PriorityEnum
+from models.task_dependency_model import TaskBlockerCreate
+from services.task_service import TaskService, VersionConflictError
+from services.task_rank_service import TaskRankService, rebalance_user_ranks
+from services.task_hierarchy_service import TaskHierarchyService
+from services.task_dependency_service import TaskDependencyService
+from services.task_event_service import TaskEventService
+from services.task_export_service import (
+    TaskExportService, EXPORT_MEDIA_TYPES, ndjson_chunks, csv_chunks, gzip_chunks
+)
+from schemas.bulk import BulkRequest, BulkResponse, BulkModeEnum
+from config import settings
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from middleware.auth_middleware import get_current_user
+from utils.idempotency import run_idempotent, request_fingerprint
 from models.user import User
 
 
 router = APIRouter()
 
+_ETAG_PATTERN = re.compile(r'(?:W/)?"v(\d+)"')
+
+
+def _task_response(task: Task, status_code: int = 200) -> JSONResponse:
+    """Serialize a task with its version as the ETag"""
+    return JSONResponse(
+        status_code=status_code,
+        content=jsonable_encoder(task),
+        headers={"ETag": f'"v{task.version}"'},
+    )
+
+
+def _expected_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """Versions accepted by an If-Match header; None when any version is acceptable"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    matches = (_ETAG_PATTERN.fullmatch(tag.strip()) for tag in if_match.split(","))
+    return [int(match.group(1)) for match in matches if match]
+
+
+def _version_conflict(error: VersionConflictError) -> HTTPException:
+    return HTTPException(
+        status_code=412,
+        detail="Task was modified by another request",
+        headers={"ETag": f'"v{error.current_version}"'},
+    )
+
 
 @router.post("/tasks", response_model=Task, status_code=201)
 def create_task(
     task_data: TaskCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Create a new task for the authenticated user"""
+    def create():
+        try:
+            task_service = TaskService(session)
+            task = task_service.create_task(task_data, current_user.id)
+            return _task_response(task, status_code=201)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Failed to create task")
+
+    return run_idempotent(
+        session, current_user.id, idempotency_key, request_fingerprint("POST /tasks", task_data), create,
+        status_code=201
+    )
+
+
+@router.post("/tasks/bulk", response_model=BulkResponse)
+def bulk_tasks(
+    bulk_request: BulkRequest,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Create, update, delete and toggle many tasks in one request and one transaction.
+
+    Returns one result per operation. In atomic mode nothing is applied if
+    any operation fails, and the response status is 409.
+    """
+    operations = bulk_request.operations
+    if not operations:
+        raise HTTPException(status_code=400, detail="At least one operation is required")
+    if len(operations) > settings.BULK_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch may contain at most {settings.BULK_MAX_OPERATIONS} operations"
+        )
+
+    def apply():
+        try:
+            task_service = TaskService(session)
+            result = task_service.apply_bulk(
+                operations, current_user.id, atomic=bulk_request.mode == BulkModeEnum.atomic
+            )
+        except Exception as e:
+            print(f"Error applying bulk operations: {str(e)}")  # This would typically go to a logger
+            raise HTTPException(status_code=500, detail="Failed to apply bulk operations")
+
+        if not result["committed"]:
+            return JSONResponse(status_code=409, content=jsonable_encoder(BulkResponse(**result)))
+        return result
+
+    return run_idempotent(
+        session, current_user.id, idempotency_key, request_fingerprint("POST /tasks/bulk", bulk_request), apply
+    )
+
+
+def _export_stream(user_id: int, format: str, compress: bool):
+    # The stream outlives the request handler, so it reads through its own session
+    with Session(get_engine()) as session:
+        batches = TaskExportService(session).iter_batches(user_id)
+        chunks = ndjson_chunks(batches) if format == "ndjson" else csv_chunks(batches)
+        if compress:
+            yield from gzip_chunks(chunks)
+        else:
+            for chunk in chunks:
+                yield chunk.encode("utf-8")
+
+
+@router.get("/tasks/export")
+def export_tasks(
+    current_user: User = Depends(get_current_user),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format (ndjson, csv)"),
+    gzip: bool = Query(False, description="Compress the export as a .gz file")
+):
+    """Stream all tasks of the authenticated user, including their tags"""
+    filename = f"tasks.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        _export_stream(current_user.id, format, gzip),
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/tasks/actionable", response_model=List[Task])
+def get_actionable_tasks(
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of tasks to return")
+):
+    """Get open tasks whose blockers are all completed, in the manual order"""
     try:
-        task_service = TaskService(session)
-        task = task_service.create_task(task_data, current_user.id)
-        return task
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        return TaskDependencyService(session).actionable(current_user.id, limit)
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to create task")
+        print(f"Error retrieving actionable tasks: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve actionable tasks")
 
 
 @router.get("/tasks", response_model=List[Task])
@@ -37,10 +166,15 @@ def get_tasks(
     completed: Optional[bool] = Query(None, description="Filter tasks by completion status"),
     tag: Optional[str] = Query(None, description="Filter tasks by tag name"),
     due_status: Optional[str] = Query(None, description="Filter tasks by due status (overdue, due_today, upcoming)"),
-    sort: Optional[str] = Query("created_at", description="Sort tasks by field (created_at, priority, due_date)"),
-    order: Optional[str] = Query("desc", description="Sort order (asc, desc)")
+    sort: Optional[str] = Query("created_at", description="Sort tasks by field (created_at, priority, due_date, manual)"),
+    order: Optional[str] = Query("desc", description="Sort order (asc, desc)"),
+    q: Optional[str] = Query(
+        None,
+        description="Filter expression, e.g. priority:high AND (tag:work OR due<friday) AND NOT completed:true"
+    ),
+    list_id: Optional[int] = Query(None, description="Only the tasks of this shared list")
 ):
-    """Get all tasks for the authenticated user with optional filtering, searching, and sorting"""
+    """Get all tasks visible to the authenticated user (their own and their shared lists') with optional filtering, searching, and sorting"""
     try:
         task_service = TaskService(session)
         # Safely handle empty or missing search query
@@ -54,9 +188,13 @@ def get_tasks(
             tag=tag,
             due_status=due_status,
             sort=sort,
-            order=order
+            order=order,
+            q=q,
+            list_id=list_id
         )
         return tasks
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         # Log the actual error for debugging
         print(f"Error retrieving tasks: {str(e)}")  # This would typically go to a logger
@@ -75,7 +213,7 @@ def get_task(
         task = task_service.get_task_by_id(id, current_user.id)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
-        return task
+        return _task_response(task)
     except HTTPException:
         raise
     except Exception as e:
@@ -87,21 +225,34 @@ def update_task(
     id: int,
     task_data: TaskUpdate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    if_match: Optional[str] = Header(None, alias="If-Match")
 ):
-    """Update a specific task by ID for the authenticated user"""
-    try:
-        task_service = TaskService(session)
-        task = task_service.update_task(id, current_user.id, task_data)
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
-        return task
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Failed to update task")
+    """Update a specific task by ID for the authenticated user.
+
+    With If-Match: "v<version>" the update only applies if the task is
+    still at that version, and fails with 412 otherwise.
+    """
+    def update():
+        try:
+            task_service = TaskService(session)
+            task = task_service.update_task(id, current_user.id, task_data, _expected_versions(if_match))
+            if not task:
+                raise HTTPException(status_code=404, detail="Task not found")
+            return _task_response(task)
+        except VersionConflictError as e:
+            raise _version_conflict(e)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail="Failed to update task")
+
+    return run_idempotent(
+        session, current_user.id, idempotency_key, request_fingerprint(f"PUT /tasks/{id}", task_data), update
+    )
 
 
 @router.delete("/tasks/{id}", status_code=204)
@@ -123,22 +274,275 @@ def delete_task(
         raise HTTPException(status_code=500, detail="Failed to delete task")
 
 
+@router.post("/tasks/{id}/restore", response_model=Task)
+def restore_task(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Restore a deleted task, up to TASK_DELETE_RETENTION_SECONDS after its deletion"""
+    try:
+        task = TaskService(session).restore_task(id, current_user.id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Deleted task not found")
+        return _task_response(task)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error restoring task: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to restore task")
+
+
 @router.patch("/tasks/{id}/toggle-complete", response_model=Task)
 def toggle_task_complete(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    if_match: Optional[str] = Header(None, alias="If-Match")
+):
+    """Toggle the completion status of a specific task for the authenticated user.
+
+    Honors If-Match like PUT /tasks/{id}.
+    """
+    def toggle():
+        try:
+            task_service = TaskService(session)
+            task = task_service.toggle_task_completion(id, current_user.id, _expected_versions(if_match))
+            if not task:
+                raise HTTPException(status_code=404, detail="Task not found")
+            return _task_response(task)
+        except VersionConflictError as e:
+            raise _version_conflict(e)
+        except HTTPException:
+            raise
+        except Exception as e:
+            # Log the actual error for debugging
+            print(f"Error toggling task completion: {str(e)}")  # This would typically go to a logger
+            raise HTTPException(status_code=500, detail="Failed to toggle task completion")
+
+    return run_idempotent(
+        session, current_user.id, idempotency_key, request_fingerprint(f"PATCH /tasks/{id}/toggle-complete"), toggle
+    )
+
+
+@router.patch("/tasks/{id}/move", response_model=Task)
+def move_task(
+    id: int,
+    move: TaskMove,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    if_match: Optional[str] = Header(None, alias="If-Match")
+):
+    """Move a task in the manual order (sort=manual) to just after `after` and/or just before `before`.
+
+    Honors If-Match like PUT /tasks/{id}.
+    """
+    def move_handler():
+        try:
+            task = TaskService(session).move_task(
+                id, current_user.id, after_id=move.after, before_id=move.before,
+                expected_versions=_expected_versions(if_match)
+            )
+            if not task:
+                raise HTTPException(status_code=404, detail="Task not found")
+            if TaskRankService(session).needs_rebalance(task.rank):
+                background_tasks.add_task(rebalance_user_ranks, current_user.id)
+            return _task_response(task)
+        except VersionConflictError as e:
+            raise _version_conflict(e)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error moving task: {str(e)}")  # This would typically go to a logger
+            raise HTTPException(status_code=500, detail="Failed to move task")
+
+    return run_idempotent(
+        session, current_user.id, idempotency_key,
+        request_fingerprint(f"PATCH /tasks/{id}/move", move), move_handler
+    )
+
+
+@router.patch("/tasks/{id}/parent", response_model=Task)
+def reparent_task(
+    id: int,
+    reparent: TaskReparent,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    if_match: Optional[str] = Header(None, alias="If-Match")
+):
+    """Move a task and all its subtasks under `parent_id`, or to the top level when it is null.
+
+    Honors If-Match like PUT /tasks/{id}.
+    """
+    def reparent_handler():
+        try:
+            task = TaskService(session).reparent_task(
+                id, current_user.id, reparent.parent_id, _expected_versions(if_match)
+            )
+            if not task:
+                raise HTTPException(status_code=404, detail="Task not found")
+            return _task_response(task)
+        except VersionConflictError as e:
+            raise _version_conflict(e)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error moving task subtree: {str(e)}")  # This would typically go to a logger
+            raise HTTPException(status_code=500, detail="Failed to move task")
+
+    return run_idempotent(
+        session, current_user.id, idempotency_key,
+        request_fingerprint(f"PATCH /tasks/{id}/parent", reparent), reparent_handler
+    )
+
+
+@router.get("/tasks/{id}/subtree")
+def get_task_subtree(
     id: int,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    """Toggle the completion status of a specific task for the authenticated user"""
+    """Get a task and all its subtasks at any depth.
+
+    Subtasks come level by level, each with its depth below the task and
+    its parent_id to rebuild the tree.
+    """
     try:
-        task_service = TaskService(session)
-        task = task_service.toggle_task_completion(id, current_user.id)
+        task = TaskService(session).get_task_by_id(id, current_user.id)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
-        return task
+        subtree = TaskHierarchyService(session).subtree(id, current_user.id)
+        return {
+            "task": task,
+            "subtasks": [{**jsonable_encoder(subtask), "depth": depth} for subtask, depth in subtree],
+        }
     except HTTPException:
         raise
     except Exception as e:
-        # Log the actual error for debugging
-        print(f"Error toggling task completion: {str(e)}")  # This would typically go to a logger
-        raise HTTPException(status_code=500, detail="Failed to toggle task completion")
\ No newline at end of file
+        print(f"Error retrieving task subtree: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve task subtree")
+
+
+@router.get("/tasks/{id}/progress")
+def get_task_progress(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Get the share of a task's subtasks, at any depth, that are completed"""
+    try:
+        task = TaskService(session).get_task_by_id(id, current_user.id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return TaskHierarchyService(session).progress(task)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error retrieving task progress: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve task progress")
+
+
+@router.get("/tasks/{id}/blockers", response_model=List[Task])
+def get_task_blockers(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Get the tasks a task is blocked by, open ones first"""
+    try:
+        task = TaskService(session).get_task_by_id(id, current_user.id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return TaskDependencyService(session).blockers(id, current_user.id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error retrieving task blockers: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve task blockers")
+
+
+@router.post("/tasks/{id}/blockers", status_code=201)
+def add_task_blocker(
+    id: int,
+    blocker: TaskBlockerCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Mark a task as blocked by `blocker_id` until that task is completed.
+
+    Answers 400 if the blocker already depends on the task, directly or
+    through other tasks.
+    """
+    def add_blocker():
+        try:
+            if not TaskService(session).add_blocker(id, blocker.blocker_id, current_user.id):
+                raise HTTPException(status_code=404, detail="Task not found")
+            return {"task_id": id, "blocker_id": blocker.blocker_id}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error adding task blocker: {str(e)}")  # This would typically go to a logger
+            raise HTTPException(status_code=500, detail="Failed to add task blocker")
+
+    return run_idempotent(
+        session, current_user.id, idempotency_key,
+        request_fingerprint(f"POST /tasks/{id}/blockers", blocker), add_blocker, status_code=201
+    )
+
+
+@router.delete("/tasks/{id}/blockers/{blocker_id}", status_code=204)
+def remove_task_blocker(
+    id: int,
+    blocker_id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Remove a blocker from a task"""
+    try:
+        if not TaskService(session).remove_blocker(id, blocker_id, current_user.id):
+            raise HTTPException(status_code=404, detail="Blocker not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error removing task blocker: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to remove task blocker")
+
+
+@router.get("/tasks/{id}/activity")
+def get_task_activity(
+    id: int,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of events to return"),
+    before: Optional[int] = Query(None, description="Cursor: next_before of the previous page")
+):
+    """Get the change history of a task, newest first.
+
+    Events are written asynchronously and show up within
+    TASK_EVENT_FLUSH_SECONDS of the change. A deleted task's history stays
+    readable until the task is purged.
+    """
+    try:
+        task = TaskService(session).get_task_by_id(id, current_user.id, include_deleted=True)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        events, next_before = TaskEventService(session).get_activity(id, limit, before)
+        return {"events": events, "next_before": next_before}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error retrieving task activity: {str(e)}")  # This would typically go to a logger
+        raise HTTPException(status_code=500, detail="Failed to retrieve task activity")
@@ -0,0 +1,19 @@
+import argparse
+from sqlmodel import Session
+from database import get_engine
+from services.analytics_service import AnalyticsService
+
+
+def backfill_rollups(user_id: int = None):
+    """Rebuild daily_task_rollup from the task table."""
+    engine = get_engine()
+    with Session(engine) as session:
+        count = AnalyticsService(session).backfill(user_id)
+        print(f"Wrote {count} daily rollup rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill daily task rollups")
+    parser.add_argument("--user-id", type=int, help="Only rebuild rollups of this user")
+    args = parser.parse_args()
+    backfill_rollups(user_id=args.user_id)
@@ -0,0 +1,86 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def benchmark_writes(iterations: int = 50, database_url: str = None):
+    """Report statements per request and latency of the write endpoints.
+
+    Runs the app in-process against a scratch SQLite database unless a
+    database URL is given. Each statement sent to the database counts as
+    one round-trip; COMMIT is counted separately.
+    """
+    if not database_url:
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+    os.environ["DATABASE_URL"] = database_url
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from fastapi.testclient import TestClient
+    from sqlmodel import SQLModel
+    from database import get_engine
+    from main import app
+    import initialize_db  # noqa: F401 - registers every table
+
+    SQLModel.metadata.create_all(get_engine())
+    client = TestClient(app)
+
+    counts = {"statements": 0, "commits": 0}
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _count_statement(*args):
+        counts["statements"] += 1
+
+    @event.listens_for(Engine, "commit")
+    def _count_commit(*args):
+        counts["commits"] += 1
+
+    results = {}
+
+    def measure(name, call):
+        counts["statements"] = counts["commits"] = 0
+        start = time.perf_counter()
+        response = call()
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name} failed with {response.status_code}: {response.text}")
+        entry = results.setdefault(name, {"statements": [], "commits": [], "ms": []})
+        entry["statements"].append(counts["statements"])
+        entry["commits"].append(counts["commits"])
+        entry["ms"].append(elapsed)
+        return response
+
+    password = "Benchmark123"
+    for i in range(iterations):
+        email = f"bench{i}-{int(time.time() * 1000)}@example.com"
+        measure("POST /api/auth/register", lambda: client.post(
+            "/api/auth/register", json={"email": email, "password": password}))
+        login = measure("POST /api/auth/login", lambda: client.post(
+            "/api/auth/login", json={"email": email, "password": password}))
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        task = measure("POST /api/tasks", lambda: client.post(
+            "/api/tasks", json={"title": f"task {i}", "tag_names": ["bench"]}, headers=headers)).json()
+        measure("PUT /api/tasks/{id}", lambda: client.put(
+            f"/api/tasks/{task['id']}", json={"title": f"task {i} edited", "priority": "high"}, headers=headers))
+        measure("PATCH /api/tasks/{id}/toggle-complete", lambda: client.patch(
+            f"/api/tasks/{task['id']}/toggle-complete", headers=headers))
+        measure("DELETE /api/tasks/{id}", lambda: client.delete(
+            f"/api/tasks/{task['id']}", headers=headers))
+
+    print(f"{'endpoint':40} {'stmts':>6} {'commits':>8} {'p50 ms':>8} {'mean ms':>8}")
+    for name, entry in results.items():
+        print(
+            f"{name:40} {statistics.median(entry['statements']):>6.0f} {statistics.median(entry['commits']):>8.0f}"
+            f" {statistics.median(entry['ms']):>8.2f} {statistics.mean(entry['ms']):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark round-trips and latency of the write endpoints")
+    parser.add_argument("--iterations", type=int, default=50, help="Requests per endpoint")
+    parser.add_argument("--database-url", help="Database to run against (default: a scratch SQLite file)")
+    args = parser.parse_args()
+    benchmark_writes(iterations=args.iterations, database_url=args.database_url)
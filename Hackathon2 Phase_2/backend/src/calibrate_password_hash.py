@@ -0,0 +1,43 @@
+import argparse
+import statistics
+import time
+from config import settings
+from utils.security_fixed import get_password_hash, verify_password
+
+
+def _verify_seconds(hashed_password: str, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        verify_password("CalibrationPassword1", hashed_password)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate_pbkdf2(target_ms: float, samples: int = 5) -> int:
+    """The PBKDF2 iteration count whose verify takes about target_ms on this host."""
+    iterations = settings.PASSWORD_HASH_ITERATIONS
+    # Cost is linear in iterations: scale from a measurement, then re-measure
+    for _ in range(3):
+        seconds = _verify_seconds(get_password_hash("CalibrationPassword1", iterations), samples)
+        iterations = max(10000, int(round(iterations * (target_ms / 1000) / seconds, -4)))
+    return iterations
+
+
+def calibrate_password_hash(target_ms: float, samples: int):
+    """Benchmark this host and print hash parameters meeting the target verify latency."""
+    iterations = calibrate_pbkdf2(target_ms, samples)
+    measured = _verify_seconds(get_password_hash("CalibrationPassword1", iterations), samples) * 1000
+    print(f"PBKDF2-SHA256: {iterations} iterations verify in {measured:.1f} ms "
+          f"(currently {settings.PASSWORD_HASH_ITERATIONS})")
+
+    print("\nSettings (e.g. in .env); existing hashes are upgraded on each user's next login:")
+    print(f"PASSWORD_HASH_ITERATIONS={iterations}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick password hash parameters for a target verify latency")
+    parser.add_argument("--target-ms", type=float, default=100.0, help="Target verify time per login (default: 100)")
+    parser.add_argument("--samples", type=int, default=5, help="Timings per measurement; the median is used")
+    args = parser.parse_args()
+    calibrate_password_hash(args.target_ms, args.samples)
@@ -13,6 +13,99 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     BETTER_AUTH_SECRET: str = ""
+    # Limits for the ?q= task filter language
+    TASK_FILTER_MAX_LENGTH: int = 500
+    TASK_FILTER_MAX_TERMS: int = 20
+    TASK_FILTER_MAX_DEPTH: int = 8
+    TASK_FILTER_CACHE_SIZE: int = 256
+    # Smart lists comparing against "now" are rebuilt on open once older than this
+    SMART_LIST_INSTANT_REFRESH_SECONDS: int = 60
+    # Share one query between identical concurrent GET /api/tasks requests
+    TASK_QUERY_COALESCING: bool = True
+    # Users and shared lists whose last write generation is remembered for it
+    TASK_QUERY_GENERATION_CACHE_SIZE: int = 10000
+    # Page sizes for GET /api/bootstrap
+    BOOTSTRAP_TASK_LIMIT: int = 50
+    BOOTSTRAP_REMINDER_LIMIT: int = 20
+    # Longest window served by GET /api/analytics/daily
+    ANALYTICS_MAX_DAYS: int = 366
+    # Largest batch accepted by POST /api/tasks/bulk
+    BULK_MAX_OPERATIONS: int = 500
+    # In-process tag name -> id cache used when attaching tags to tasks
+    TAG_ID_CACHE_SIZE: int = 4096
+    TAG_ID_CACHE_TTL_SECONDS: int = 300
+    # Rows fetched per server-side cursor batch by GET /api/tasks/export
+    EXPORT_BATCH_SIZE: int = 1000
+    # POST /api/tasks/import: rows validated and committed per transaction,
+    # largest accepted upload, and row errors kept on the job
+    IMPORT_CHUNK_SIZE: int = 5000
+    IMPORT_MAX_BYTES: int = 100 * 1024 * 1024
+    IMPORT_MAX_ERRORS: int = 100
+    # Idempotency-Key handling: where responses are kept ("database" or
+    # "memory"), how long they are replayed, how long a duplicate waits for
+    # the first request, after how long an unfinished claim is abandoned,
+    # and how often expired keys are purged
+    IDEMPOTENCY_STORE: str = "database"
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 3600
+    # Manual order keys longer than this trigger a background rebalance of
+    # the user's ranks
+    TASK_RANK_MAX_LENGTH: int = 24
+    # Deleted tasks can be restored for this long; the purger then removes
+    # them and their dependent rows, this many tasks per transaction
+    TASK_DELETE_RETENTION_SECONDS: int = 7 * 24 * 60 * 60
+    TASK_PURGE_BATCH_SIZE: int = 500
+    TASK_PURGE_INTERVAL_SECONDS: int = 600
+    # Verified access tokens are cached by digest until they expire, user
+    # rows for AUTH_USER_CACHE_TTL_SECONDS. The TTL bounds how long a user
+    # deleted or changed by another process keeps authenticating.
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_SIZE: int = 10000
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30
+    # Password hashing runs on its own pool of PASSWORD_HASH_WORKERS threads.
+    # Once PASSWORD_HASH_QUEUE_SIZE more calls are waiting, login and register
+    # answer 503. Keep the sum well below the server's request threads (40).
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+    # Password hash cost; pick values with calibrate_password_hash.py. Stored
+    # hashes with other parameters are redone on the user's next login.
+    PASSWORD_HASH_ITERATIONS: int = 100000  # PBKDF2-SHA256 (utils.security_fixed)
+    # Refreshes check revocation against an in-process set of revoked token
+    # digests; revocations by other processes reach it within this long
+    REFRESH_TOKEN_REVOCATION_SYNC_SECONDS: int = 30
+    # Logging in revokes a user's oldest refresh tokens beyond this many.
+    # Expired tokens are deleted this many per transaction, periodically.
+    REFRESH_TOKEN_MAX_ACTIVE_PER_USER: int = 10
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = 1000
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+    # Token buckets for login and register, per client IP and per email:
+    # sustained attempts per minute and burst. Buckets live in this process
+    # ("memory") or in Redis, shared by all workers ("redis"). While the
+    # password hash queue delays new hashes by more than the target, rates
+    # shrink in proportion, down to AUTH_RATE_LIMIT_MIN_SCALE of normal.
+    AUTH_RATE_LIMIT_STORE: str = "memory"
+    AUTH_RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/1"
+    AUTH_RATE_LIMIT_IP_PER_MINUTE: float = 30
+    AUTH_RATE_LIMIT_IP_BURST: int = 10
+    AUTH_RATE_LIMIT_EMAIL_PER_MINUTE: float = 6
+    AUTH_RATE_LIMIT_EMAIL_BURST: int = 5
+    AUTH_RATE_LIMIT_TARGET_WAIT_MS: float = 100
+    AUTH_RATE_LIMIT_MIN_SCALE: float = 0.1
+    AUTH_RATE_LIMIT_MEMORY_KEYS: int = 100000
+    # User id -> ids of the shared task lists the user belongs to. Changes in
+    # this process apply at once; changes made by other processes (including
+    # removals) within the TTL.
+    TASK_LIST_MEMBERSHIP_CACHE_SIZE: int = 10000
+    TASK_LIST_MEMBERSHIP_CACHE_TTL_SECONDS: int = 60
+    # Task activity events are buffered in process and inserted in batches
+    # of up to TASK_EVENT_BATCH_SIZE, at the latest TASK_EVENT_FLUSH_SECONDS
+    # after they were recorded. Events beyond TASK_EVENT_BUFFER_SIZE waiting
+    # (e.g. while the database is down) are dropped, not waited for.
+    TASK_EVENT_BATCH_SIZE: int = 500
+    TASK_EVENT_FLUSH_SECONDS: float = 1.0
+    TASK_EVENT_BUFFER_SIZE: int = 10000
 
     class Config:
         env_file = ".env"
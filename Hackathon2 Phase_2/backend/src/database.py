@@ -19,4 +19,34 @@ def get_engine():
 def get_session():
     engine = get_engine()
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+def begin_read_snapshot(session: Session):
+    """Start a fresh transaction in which all following reads see one snapshot.
+
+    Ends any implicit transaction already open on the session (for example
+    the one used by the authentication lookup). On PostgreSQL the new
+    transaction is REPEATABLE READ and READ ONLY; SQLite serializes access
+    through its single connection anyway.
+    """
+    session.commit()
+    if session.get_bind().dialect.name == "postgresql":
+        session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+        )
+
+
+def commit_without_expiring(session: Session):
+    """Commit, keeping the attributes of loaded objects instead of expiring them.
+
+    Objects written with INSERT/UPDATE ... RETURNING already hold their
+    final column values, so reading them after commit would only repeat
+    that work with a refresh SELECT.
+    """
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
@@ -0,0 +1,37 @@
+import argparse
+from sqlmodel import Session
+from database import get_engine
+from services.task_import_service import TaskImportService, open_import_source
+
+
+def import_tasks(path: str, user_id: int, format: str = None):
+    """Import an NDJSON or CSV task file (optionally .gz) into one user's account."""
+    compressed = path.endswith(".gz")
+    if not format:
+        format = "csv" if path[:-3 if compressed else None].endswith(".csv") else "ndjson"
+
+    def report(job):
+        print(f"{job.rows_read} rows read, {job.rows_imported} imported, "
+              f"{job.rows_failed} failed ({job.rows_per_second} rows/s)")
+
+    engine = get_engine()
+    with Session(engine) as session:
+        service = TaskImportService(session)
+        job = service.create_job(user_id, format)
+        with open_import_source(path, compressed) as source:
+            job = service.run(job, source, on_progress=report)
+        print(f"Import job {job.id} {job.status.value}: {job.rows_imported} tasks imported "
+              f"at {job.rows_per_second} rows/s")
+        for error in job.errors:
+            print(f"  line {error['line']}: {error['error']}")
+        if job.message:
+            print(f"  {job.message}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import tasks from an NDJSON or CSV file")
+    parser.add_argument("path", help="File to import (.ndjson, .csv, optionally .gz)")
+    parser.add_argument("--user-id", type=int, required=True, help="Owner of the imported tasks")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Input format (default: from the file name)")
+    args = parser.parse_args()
+    import_tasks(args.path, args.user_id, format=args.format)
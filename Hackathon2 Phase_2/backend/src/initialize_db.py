@@ -3,7 +3,16 @@ from database import get_engine
 from models.user import User
 from models.task_model import Task, Tag, TaskTag
 from models.scheduled_reminder_model import ScheduledReminder
+from models.recurring_task_history_model import RecurringTaskHistory
 from models.refresh_token import RefreshToken
+from models.smart_list_model import SmartList, SmartListMember
+from models.daily_task_rollup_model import DailyTaskRollup
+from models.task_import_job_model import TaskImportJob
+from models.idempotency_key_model import IdempotencyKey
+from models.task_closure_model import TaskClosure
+from models.task_dependency_model import TaskDependency
+from models.task_list_model import TaskList, TaskListMember
+from models.task_event_model import TaskEvent
 
 def create_tables():
     engine = get_engine()
@@ -2,6 +2,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -12,15 +13,36 @@ from fastapi.middleware.cors import CORSMiddleware
 from api.task_routes import router as task_router
 from api.tag_routes import router as tag_router
 from api.auth import router as auth_router
+from api.smart_list_routes import router as smart_list_router
+from api.task_list_routes import router as task_list_router
+from api.metrics_routes import router as metrics_router
+from api.bootstrap_routes import router as bootstrap_router
+from api.analytics_routes import router as analytics_router
+from api.task_import_routes import router as task_import_router
 from config import settings
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load revoked refresh tokens before the first refresh needs them
+    from sqlmodel import Session
+    from database import get_engine
+    from utils.revoked_tokens import revoked_refresh_tokens
+    with Session(get_engine()) as session:
+        revoked_refresh_tokens.sync(session, full=True)
+    yield
+    # Write the task events still buffered before the process exits
+    from services.task_event_service import task_event_writer
+    task_event_writer.close()
+
+
 def create_app():
     app = FastAPI(
         title="Todo API",
         description="API for managing todo tasks with organization and search features",
         version="1.1.0",
-        debug=settings.DEBUG
+        debug=settings.DEBUG,
+        lifespan=lifespan
     )
     #####
 
@@ -38,6 +60,12 @@ def create_app():
     app.include_router(task_router, prefix="/api", tags=["tasks"])
     app.include_router(tag_router, prefix="/api", tags=["tags"])
     app.include_router(auth_router, prefix="/api", tags=["auth"])
+    app.include_router(smart_list_router, prefix="/api", tags=["smart-lists"])
+    app.include_router(task_list_router, prefix="/api", tags=["task-lists"])
+    app.include_router(metrics_router, prefix="/api", tags=["metrics"])
+    app.include_router(bootstrap_router, prefix="/api", tags=["bootstrap"])
+    app.include_router(analytics_router, prefix="/api", tags=["analytics"])
+    app.include_router(task_import_router, prefix="/api", tags=["tasks"])
 
     @app.get("/")
     def read_root():
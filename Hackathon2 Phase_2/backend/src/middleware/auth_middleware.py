@@ -2,7 +2,8 @@ from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session
 from database import get_session
-from utils.jwt import verify_token
+from utils.jwt import REFRESH_TOKEN_TYPE, verify_token
+from utils.auth_cache import cache_principal, get_cached_principal, load_user
 from models.user import User
 
 
@@ -13,19 +14,29 @@ def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: Session = Depends(get_session)
 ):
-    """Get the current authenticated user from the token."""
+    """Get the current authenticated user from the token.
+
+    Verified tokens and user rows are cached (see utils.auth_cache), so a
+    repeat request with the same token usually needs neither signature
+    verification nor a database round-trip.
+    """
     token = credentials.credentials
-    
-    payload = verify_token(token)
-    if payload is None:
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-    
-    user_id: str = payload.get("sub")
+
+    user_id = get_cached_principal(token)
     if user_id is None:
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-    
-    user = session.get(User, int(user_id))
+        payload = verify_token(token)
+        if payload is None:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+
+        subject = payload.get("sub")
+        if subject is None or payload.get("type") == REFRESH_TOKEN_TYPE:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        user_id = int(subject)
+        if payload.get("exp") is not None:
+            cache_principal(token, user_id, payload["exp"])
+
+    user = load_user(session, user_id)
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
-    
-    return user
\ No newline at end of file
+
+    return user
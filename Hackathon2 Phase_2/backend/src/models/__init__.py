@@ -3,5 +3,13 @@ from .user import User
 from .task_model import Task, Tag, TaskTag
 from .scheduled_reminder_model import ScheduledReminder
 from .refresh_token import RefreshToken
+from .smart_list_model import SmartList, SmartListMember
+from .daily_task_rollup_model import DailyTaskRollup
+from .task_import_job_model import TaskImportJob
+from .idempotency_key_model import IdempotencyKey
+from .task_closure_model import TaskClosure
+from .task_dependency_model import TaskDependency
+from .task_list_model import TaskList, TaskListMember
+from .task_event_model import TaskEvent
 
-__all__ = ["User", "Task", "Tag", "TaskTag", "ScheduledReminder", "RefreshToken"]
\ No newline at end of file
+__all__ = ["User", "Task", "Tag", "TaskTag", "ScheduledReminder", "RefreshToken", "SmartList", "SmartListMember", "DailyTaskRollup", "TaskImportJob", "IdempotencyKey", "TaskClosure", "TaskDependency", "TaskList", "TaskListMember", "TaskEvent"]
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel, Field
+from datetime import date
+
+
+class DailyTaskRollup(SQLModel, table=True):
+    """Per-user daily task counters, one row per (day, dimension, value).
+
+    dimension is "all" (value ""), "priority" (value low/medium/high) or
+    "tag" (value is the tag name). Rows are incremented as tasks are created
+    and toggled, and rebuilt by backfill_rollups.py.
+    """
+    __tablename__ = "daily_task_rollup"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    dimension: str = Field(max_length=10, primary_key=True)
+    value: str = Field(default="", max_length=50, primary_key=True)
+    created_count: int = Field(default=0)
+    completed_count: int = Field(default=0)
+    reopened_count: int = Field(default=0)  # Completed tasks toggled back to open
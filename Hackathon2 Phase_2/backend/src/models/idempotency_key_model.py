@@ -0,0 +1,22 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from datetime import datetime
+from typing import Optional
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Outcome of the first request sent with an Idempotency-Key, replayed to retries.
+
+    A row is claimed as "in_progress" before the request runs and holds the
+    response once it finishes. Rows expire after IDEMPOTENCY_TTL_SECONDS.
+    """
+    __tablename__ = "idempotency_key"
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    key: str = Field(max_length=255, primary_key=True)
+    fingerprint: str = Field(max_length=64)  # SHA-256 of the route and payload
+    status: str = Field(default="in_progress", max_length=16)  # in_progress or completed
+    response_status: Optional[int] = Field(default=None)
+    response_body: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    response_headers: Optional[dict] = Field(default=None, sa_column=Column(JSON))  # e.g. ETag
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
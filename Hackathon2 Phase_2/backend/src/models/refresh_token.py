@@ -1,12 +1,29 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, LargeBinary, text
 from datetime import datetime
 from typing import Optional
 
 
+# SHA-256 of the issued token; the token itself is never stored
+TOKEN_DIGEST_SIZE = 32
+
+
 class RefreshToken(SQLModel, table=True):
+    __table_args__ = (
+        # A user's unrevoked tokens by age, for the per-user cap at login
+        Index("ix_refreshtoken_user_id_created_at", "user_id", "created_at",
+              postgresql_where=text("revoked_at IS NULL"), sqlite_where=text("revoked_at IS NULL")),
+        # Revocations, read when rebuilding and syncing the in-process revoked set
+        Index("ix_refreshtoken_revoked_at", "revoked_at",
+              postgresql_where=text("revoked_at IS NOT NULL"), sqlite_where=text("revoked_at IS NOT NULL")),
+    )
+
     id: int = Field(primary_key=True)
-    token: str = Field(unique=True, max_length=500)
+    token_digest: bytes = Field(
+        sa_column=Column(LargeBinary(TOKEN_DIGEST_SIZE), nullable=False, unique=True, index=True)
+    )
     user_id: int = Field(foreign_key="user.id")
-    expires_at: datetime
+    expires_at: datetime = Field(index=True)  # The purger deletes by expiry
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    revoked: bool = Field(default=False)
\ No newline at end of file
+    revoked: bool = Field(default=False)
+    revoked_at: Optional[datetime] = None
@@ -0,0 +1,42 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class SmartList(SQLModel, table=True):
+    __tablename__ = "smart_list"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    name: str = Field(min_length=1, max_length=100)
+    query: str = Field(min_length=1, max_length=500)  # Filter expression, see utils.task_filter
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow)  # Last full rebuild of membership
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+
+
+class SmartListMember(SQLModel, table=True):
+    """Materialized membership of a smart list, maintained by TaskService writes."""
+    __tablename__ = "smart_list_member"
+
+    smart_list_id: int = Field(foreign_key="smart_list.id", primary_key=True)
+    task_id: int = Field(foreign_key="task.id", primary_key=True, index=True)
+
+
+class SmartListCreate(SQLModel):
+    name: str = Field(min_length=1, max_length=100)
+    query: str = Field(min_length=1, max_length=500)
+
+
+class SmartListUpdate(SQLModel):
+    name: Optional[str] = Field(default=None, min_length=1, max_length=100)
+    query: Optional[str] = Field(default=None, min_length=1, max_length=500)
+
+
+class SmartListRead(SQLModel):
+    id: int
+    name: str
+    query: str
+    refreshed_at: datetime
+    created_at: datetime
+    updated_at: datetime
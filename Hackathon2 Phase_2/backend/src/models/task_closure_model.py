@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+
+
+class TaskClosure(SQLModel, table=True):
+    """Every ancestor/descendant pair of the subtask hierarchy, maintained by TaskService writes.
+
+    A row per pair at any distance (depth 1 is the parent), so subtrees and
+    ancestor chains are read with one indexed lookup instead of one query
+    per level. Tasks without parent or children have no rows.
+    """
+    __tablename__ = "task_closure"
+    __table_args__ = (
+        # Ancestors of a task, for moves and new subtasks
+        Index("ix_task_closure_descendant_id_depth", "descendant_id", "depth"),
+    )
+
+    ancestor_id: int = Field(foreign_key="task.id", primary_key=True)  # The primary key serves subtree reads
+    descendant_id: int = Field(foreign_key="task.id", primary_key=True)
+    depth: int
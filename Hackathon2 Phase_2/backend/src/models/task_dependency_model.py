@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from datetime import datetime
+
+
+class TaskDependency(SQLModel, table=True):
+    """task_id cannot be worked on until blocker_id is completed; maintained by TaskService."""
+    __tablename__ = "task_dependency"
+    __table_args__ = (
+        # Dependents of a task, for completion changes and cycle checks
+        Index("ix_task_dependency_blocker_id_task_id", "blocker_id", "task_id"),
+    )
+
+    task_id: int = Field(foreign_key="task.id", primary_key=True)  # The primary key serves blocker lookups
+    blocker_id: int = Field(foreign_key="task.id", primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskBlockerCreate(SQLModel):
+    blocker_id: int
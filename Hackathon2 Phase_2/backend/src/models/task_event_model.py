@@ -0,0 +1,38 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Index
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+
+
+class TaskEventKindEnum(str, Enum):
+    created = "created"
+    updated = "updated"
+    toggled = "toggled"
+    deleted = "deleted"
+    restored = "restored"
+
+
+class TaskEvent(SQLModel, table=True):
+    """One change to a task, in an append-only log written by TaskEventWriter."""
+    __tablename__ = "task_event"
+    __table_args__ = (
+        # Serves GET /api/tasks/{id}/activity, newest first by id
+        Index("ix_task_event_task_id_id", "task_id", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int  # No foreign key: the history outlives the purged task
+    user_id: int  # Who made the change; for shared tasks, any list member
+    kind: TaskEventKindEnum
+    changes: Optional[dict] = Field(default=None, sa_column=Column(JSON))  # created: the fields set; updated: {field: {"old", "new"}} of the fields that changed
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskEventRead(SQLModel):
+    id: int
+    task_id: int
+    user_id: int
+    kind: TaskEventKindEnum
+    changes: Optional[dict]
+    created_at: datetime
@@ -0,0 +1,45 @@
+from sqlmodel import SQLModel, Field, Column, JSON
+from datetime import datetime
+from typing import Optional, List
+from enum import Enum
+
+
+class ImportStatusEnum(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class TaskImportJob(SQLModel, table=True):
+    """Progress of one bulk task import, polled through GET /api/tasks/import/{id}."""
+    __tablename__ = "task_import_job"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    format: str = Field(max_length=10)  # ndjson or csv
+    status: ImportStatusEnum = Field(default=ImportStatusEnum.pending)
+    rows_read: int = Field(default=0)
+    rows_imported: int = Field(default=0)
+    rows_failed: int = Field(default=0)
+    errors: List[dict] = Field(default_factory=list, sa_column=Column(JSON))  # First IMPORT_MAX_ERRORS row errors
+    rows_per_second: Optional[float] = Field(default=None)
+    message: Optional[str] = Field(default=None, max_length=500)  # Why a failed job stopped
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+
+
+class TaskImportJobRead(SQLModel):
+    id: int
+    format: str
+    status: ImportStatusEnum
+    rows_read: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[dict]
+    rows_per_second: Optional[float] = None
+    message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
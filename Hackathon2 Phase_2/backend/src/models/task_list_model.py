@@ -0,0 +1,47 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from datetime import datetime
+from typing import Optional
+
+
+class TaskList(SQLModel, table=True):
+    """A list whose tasks every member can read and edit; see TaskListService."""
+    __tablename__ = "task_list"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(min_length=1, max_length=100)
+    owner_id: int = Field(foreign_key="user.id", index=True)  # Manages members; is a member too
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskListMember(SQLModel, table=True):
+    __tablename__ = "task_list_member"
+    __table_args__ = (
+        # Lists of a user, read on membership cache misses
+        Index("ix_task_list_member_user_id_list_id", "user_id", "list_id"),
+    )
+
+    list_id: int = Field(foreign_key="task_list.id", primary_key=True)
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskListCreate(SQLModel):
+    name: str = Field(min_length=1, max_length=100)
+
+
+class TaskListMemberCreate(SQLModel):
+    email: str = Field(max_length=255)
+
+
+class TaskListRead(SQLModel):
+    id: int
+    name: str
+    owner_id: int
+    created_at: datetime
+
+
+class TaskListMemberRead(SQLModel):
+    user_id: int
+    email: str
+    created_at: datetime
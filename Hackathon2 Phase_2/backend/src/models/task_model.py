@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, Index, String, text
 from datetime import datetime, date
 from typing import Optional, List
 from enum import Enum
@@ -43,11 +44,46 @@ class TaskBase(SQLModel):
     last_occurrence_id: Optional[int] = Field(default=None)  # Foreign key to task.id
 
 
+# Order keys compare byte-wise; PostgreSQL needs the "C" collation for that
+RANK_TYPE = String(64).with_variant(String(64, collation="C"), "postgresql")
+
+
+# Reads only ever see live tasks, so their indexes leave soft-deleted rows out
+LIVE_TASK = text("deleted_at IS NULL")
+
+
 class Task(TaskBase, table=True):
+    __table_args__ = (
+        # Serves sort=manual and the neighbour lookups of a move
+        Index("ix_task_user_id_rank", "user_id", "rank", postgresql_where=LIVE_TASK, sqlite_where=LIVE_TASK),
+        # Serves the default newest-first task list
+        Index("ix_task_user_id_created_at", "user_id", "created_at", postgresql_where=LIVE_TASK, sqlite_where=LIVE_TASK),
+        # Serves the purger and restores
+        Index("ix_task_deleted_at", "deleted_at",
+              postgresql_where=text("deleted_at IS NOT NULL"), sqlite_where=text("deleted_at IS NOT NULL")),
+        # Serves GET /api/tasks/actionable, already in manual order
+        Index("ix_task_user_id_actionable", "user_id", "open_blocker_count", "completed", "rank",
+              postgresql_where=LIVE_TASK, sqlite_where=LIVE_TASK),
+        # Serves tasks of shared lists, read as list_id IN (the user's lists)
+        Index("ix_task_list_id_created_at", "list_id", "created_at",
+              postgresql_where=text("deleted_at IS NULL AND list_id IS NOT NULL"),
+              sqlite_where=text("deleted_at IS NULL AND list_id IS NOT NULL")),
+        # Children of a task
+        Index("ix_task_parent_id", "parent_id", postgresql_where=text("parent_id IS NOT NULL"),
+              sqlite_where=text("parent_id IS NOT NULL")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")  # NEW: Link to user who owns this task
+    list_id: Optional[int] = Field(default=None, foreign_key="task_list.id")  # Shared with the list's members; null: personal
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})  # Bumped on every write, sent as ETag "v<version>"
+    rank: Optional[str] = Field(default=None, sa_column=Column(RANK_TYPE))  # Manual order key, see utils.fractional_index
+    deleted_at: Optional[datetime] = Field(default=None)  # Set by DELETE; the row is purged after TASK_DELETE_RETENTION_SECONDS
+    parent_id: Optional[int] = Field(default=None, foreign_key="task.id")  # Subtask of; see TaskClosure
+    # Blockers (TaskDependency) not yet completed; the task is actionable at 0
+    open_blocker_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     # NEW: Relationship to user (owner)
     user: Optional["User"] = Relationship(back_populates="tasks")
@@ -82,6 +118,8 @@ class Task(TaskBase, table=True):
 
 class TaskCreate(TaskBase):
     tag_names: Optional[List[str]] = []  # List of tag names to associate with the task
+    parent_id: Optional[int] = None  # Create as a subtask of this task
+    list_id: Optional[int] = None  # Create in this shared list; the user must be a member
 
 
 class TaskUpdate(SQLModel):
@@ -96,6 +134,15 @@ class TaskUpdate(SQLModel):
     tag_names: Optional[List[str]] = None  # List of tag names to associate with the task
 
 
+class TaskMove(SQLModel):
+    after: Optional[int] = None  # Task the moved task should follow directly
+    before: Optional[int] = None  # Task the moved task should directly precede
+
+
+class TaskReparent(SQLModel):
+    parent_id: Optional[int] = None  # New parent; null makes the task top-level
+
+
 class TagCreate(SQLModel):
     name: str = Field(max_length=50)
 
@@ -0,0 +1,20 @@
+import argparse
+from sqlmodel import Session
+from database import get_engine
+from services.task_purge_service import TaskPurgeService
+
+
+def purge_deleted_tasks(batch_size: int = None, max_batches: int = None):
+    """Hard-delete tasks deleted longer ago than the restore window, with their dependent rows."""
+    engine = get_engine()
+    with Session(engine) as session:
+        removed = TaskPurgeService(session).purge(batch_size=batch_size, max_batches=max_batches)
+        print(f"Purged {removed} deleted tasks")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Purge soft-deleted tasks past their restore window")
+    parser.add_argument("--batch-size", type=int, help="Tasks removed per transaction (default: TASK_PURGE_BATCH_SIZE)")
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    args = parser.parse_args()
+    purge_deleted_tasks(batch_size=args.batch_size, max_batches=args.max_batches)
@@ -0,0 +1,20 @@
+import argparse
+from sqlmodel import Session
+from database import get_engine
+from services.refresh_token_purge_service import RefreshTokenPurgeService
+
+
+def purge_refresh_tokens(batch_size: int = None, max_batches: int = None):
+    """Delete expired refresh tokens, revoked or not."""
+    engine = get_engine()
+    with Session(engine) as session:
+        removed = RefreshTokenPurgeService(session).purge(batch_size=batch_size, max_batches=max_batches)
+        print(f"Purged {removed} expired refresh tokens")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Purge expired refresh tokens")
+    parser.add_argument("--batch-size", type=int, help="Tokens removed per transaction (default: REFRESH_TOKEN_PURGE_BATCH_SIZE)")
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    args = parser.parse_args()
+    purge_refresh_tokens(batch_size=args.batch_size, max_batches=args.max_batches)
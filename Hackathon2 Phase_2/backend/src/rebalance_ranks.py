@@ -0,0 +1,38 @@
+import argparse
+from sqlmodel import Session, select
+from sqlalchemy import func, or_
+from config import settings
+from database import get_engine
+from models.task_model import Task
+from services.task_rank_service import TaskRankService
+
+
+def rebalance_ranks(user_id: int = None, max_length: int = None):
+    """Rebalance the manual order keys of users with long or missing ranks (or of one user)."""
+    max_length = max_length or settings.TASK_RANK_MAX_LENGTH
+    engine = get_engine()
+    with Session(engine) as session:
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = session.exec(
+                select(Task.user_id)
+                .where(Task.deleted_at.is_(None), or_(Task.rank.is_(None), func.length(Task.rank) > max_length))
+                .distinct()
+            ).all()
+
+        service = TaskRankService(session)
+        for uid in user_ids:
+            count = service.rebalance(uid)
+            session.commit()
+            print(f"User {uid}: {count} ranks rewritten")
+        print(f"Rebalanced {len(user_ids)} users")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebalance manual task order keys")
+    parser.add_argument("--user-id", type=int, help="Rebalance only this user")
+    parser.add_argument("--max-length", type=int,
+                        help=f"Rebalance users with keys longer than this (default: {settings.TASK_RANK_MAX_LENGTH})")
+    args = parser.parse_args()
+    rebalance_ranks(user_id=args.user_id, max_length=args.max_length)
@@ -0,0 +1,33 @@
+import argparse
+from sqlmodel import Session, select
+from database import get_engine
+from models.smart_list_model import SmartList
+from services.smart_list_service import SmartListService
+
+
+def rebuild_smart_lists(user_id: int = None, list_id: int = None):
+    """Recompute materialized smart list membership, e.g. after predicate semantics change."""
+    engine = get_engine()
+    with Session(engine) as session:
+        statement = select(SmartList)
+        if user_id is not None:
+            statement = statement.where(SmartList.user_id == user_id)
+        if list_id is not None:
+            statement = statement.where(SmartList.id == list_id)
+
+        service = SmartListService(session)
+        for smart_list in session.exec(statement).all():
+            try:
+                count = service.rebuild_list(smart_list)
+                print(f"Rebuilt smart list {smart_list.id} ({smart_list.name!r}): {count} tasks")
+            except ValueError as e:
+                session.rollback()
+                print(f"Skipped smart list {smart_list.id} ({smart_list.name!r}): {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild smart list membership")
+    parser.add_argument("--user-id", type=int, help="Only rebuild lists of this user")
+    parser.add_argument("--list-id", type=int, help="Only rebuild this list")
+    args = parser.parse_args()
+    rebuild_smart_lists(user_id=args.user_id, list_id=args.list_id)
@@ -0,0 +1,29 @@
+import argparse
+from sqlmodel import Session, select
+from database import get_engine
+from models.task_model import Task
+from services.task_hierarchy_service import TaskHierarchyService
+
+
+def rebuild_task_closure(user_id: int = None):
+    """Recompute the subtask closure table from task.parent_id, one user per transaction."""
+    engine = get_engine()
+    with Session(engine) as session:
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = session.exec(select(Task.user_id).distinct()).all()
+
+        service = TaskHierarchyService(session)
+        for uid in user_ids:
+            count = service.rebuild(uid)
+            session.commit()
+            print(f"User {uid}: {count} closure rows written")
+        print(f"Rebuilt the task hierarchy of {len(user_ids)} users")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the subtask closure table from parent_id")
+    parser.add_argument("--user-id", type=int, help="Rebuild only this user")
+    args = parser.parse_args()
+    rebuild_task_closure(user_id=args.user_id)
@@ -0,0 +1,20 @@
+import argparse
+from sqlmodel import Session
+from database import get_engine
+from services.task_dependency_service import TaskDependencyService
+
+
+def recount_task_blockers(user_id: int = None):
+    """Recompute every task's open blocker count from the task_dependency links."""
+    engine = get_engine()
+    with Session(engine) as session:
+        changed = TaskDependencyService(session).recount(user_id)
+        session.commit()
+        print(f"Corrected the open blocker count of {changed} tasks")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute open blocker counts from the task dependencies")
+    parser.add_argument("--user-id", type=int, help="Recount only this user's tasks")
+    args = parser.parse_args()
+    recount_task_blockers(user_id=args.user_id)
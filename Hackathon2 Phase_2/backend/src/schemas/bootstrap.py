@@ -0,0 +1,25 @@
+from sqlmodel import SQLModel
+from datetime import datetime
+from typing import List
+from models.task_model import Task, TagRead
+
+
+class TaskCounts(SQLModel):
+    total: int
+    completed: int
+    open: int
+    overdue: int
+    due_today: int
+
+
+class ReminderSummary(SQLModel):
+    id: int
+    task_id: int
+    scheduled_time: datetime
+
+
+class BootstrapResponse(SQLModel):
+    tasks: List[Task]
+    tags: List[TagRead]
+    counts: TaskCounts
+    reminders: List[ReminderSummary]
@@ -0,0 +1,41 @@
+from sqlmodel import SQLModel
+from typing import Any, Dict, List, Optional
+from enum import Enum
+from models.task_model import Task
+
+
+class BulkOpEnum(str, Enum):
+    create = "create"
+    update = "update"
+    delete = "delete"
+    toggle = "toggle"
+
+
+class BulkModeEnum(str, Enum):
+    partial = "partial"  # Apply every valid operation, report failures per item
+    atomic = "atomic"  # Apply nothing if any operation fails
+
+
+class BulkOperation(SQLModel):
+    op: BulkOpEnum
+    id: Optional[int] = None  # Required for update, delete and toggle
+    data: Optional[Dict[str, Any]] = None  # TaskCreate for create, TaskUpdate for update
+
+
+class BulkRequest(SQLModel):
+    mode: BulkModeEnum = BulkModeEnum.partial
+    operations: List[BulkOperation]
+
+
+class BulkItemResult(SQLModel):
+    index: int
+    op: BulkOpEnum
+    status: int  # HTTP-style status of this item
+    id: Optional[int] = None
+    task: Optional[Task] = None
+    error: Optional[str] = None
+
+
+class BulkResponse(SQLModel):
+    committed: bool
+    results: List[BulkItemResult]
@@ -0,0 +1,194 @@
+from sqlmodel import Session, select
+from sqlalchemy import delete, func, literal, union_all
+from sqlalchemy import select as sa_select
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from models.daily_task_rollup_model import DailyTaskRollup
+from models.task_model import Task, Tag, TaskTag
+from utils.upsert import increment_counters
+
+
+_KEY_COLUMNS = ["user_id", "day", "dimension", "value"]
+_COUNTER_COLUMNS = ["created_count", "completed_count", "reopened_count"]
+
+
+def _as_date(value) -> date:
+    # func.date() returns a string on SQLite and a date on PostgreSQL
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class AnalyticsService:
+    """Daily productivity rollups fed by task writes instead of scanning the task table."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def record_created(self, task: Task, tag_names: Iterable[str]):
+        """Count a newly created task. Does not commit."""
+        self.record_created_many([(task, tag_names)])
+
+    def record_created_many(self, items: Iterable[Tuple[Task, Iterable[str]]]):
+        """Count newly created tasks given as (task, tag_names) pairs. Does not commit.
+
+        A task created already completed also counts as a completion that
+        day, as backfill() counts it.
+        """
+        rows = []
+        for task, tag_names in items:
+            rows += self._rows(task.user_id, task.created_at or datetime.utcnow(), task.priority, tag_names,
+                               created_count=1, completed_count=1 if task.completed else 0)
+        self._apply(rows)
+
+    def record_toggled(self, task: Task, tag_names: Optional[Iterable[str]] = None):
+        """Count a completion (or a reopen) of a task. Does not commit."""
+        self.record_toggled_many([task], None if tag_names is None else {task.id: tag_names})
+
+    def record_toggled_many(self, tasks: List[Task], tag_names_by_task: Optional[Dict[int, Iterable[str]]] = None):
+        """Count completions and reopens of tasks in their current state. Does not commit."""
+        if tag_names_by_task is None:
+            tag_names_by_task = self._tag_names([task.id for task in tasks])
+        now = datetime.utcnow()
+        rows = []
+        for task in tasks:
+            counter = "completed_count" if task.completed else "reopened_count"
+            rows += self._rows(task.user_id, now, task.priority, tag_names_by_task.get(task.id, []),
+                               **{counter: 1})
+        self._apply(rows)
+
+    def get_daily(self, user_id: int, days: int, dimension: Optional[str] = None) -> dict:
+        """Read a user's rollup rows for the last `days` days"""
+        end = datetime.utcnow().date()
+        start = end - timedelta(days=days - 1)
+        statement = (
+            select(DailyTaskRollup)
+            .where(DailyTaskRollup.user_id == user_id, DailyTaskRollup.day >= start)
+            .order_by(DailyTaskRollup.day, DailyTaskRollup.dimension, DailyTaskRollup.value)
+        )
+        if dimension:
+            statement = statement.where(DailyTaskRollup.dimension == dimension)
+        rows = self.session.exec(statement).all()
+
+        overall = {"created": 0, "completed": 0, "reopened": 0}
+        for row in rows:
+            if row.dimension == "all":
+                overall["created"] += row.created_count
+                overall["completed"] += row.completed_count
+                overall["reopened"] += row.reopened_count
+        net_completed = overall["completed"] - overall["reopened"]
+        overall["completion_rate"] = round(net_completed / overall["created"], 4) if overall["created"] else None
+
+        return {
+            "start": start,
+            "end": end,
+            # Totals come from the "all" rows, which a dimension filter may exclude
+            "totals": overall if dimension in (None, "all") else None,
+            "rows": [
+                {
+                    "day": row.day,
+                    "dimension": row.dimension,
+                    "value": row.value,
+                    "created": row.created_count,
+                    "completed": row.completed_count,
+                    "reopened": row.reopened_count,
+                }
+                for row in rows
+            ],
+        }
+
+    def backfill(self, user_id: Optional[int] = None) -> int:
+        """Rebuild rollups from the task table.
+
+        Creation days come from created_at. The task table has no completion
+        timestamp, so completions are attributed to the updated_at day of
+        tasks that are currently completed; live counting is exact from then on.
+        Deleted tasks still count, as they do in the live rollups, which are
+        history and are not decremented on delete.
+        """
+        delete_statement = delete(DailyTaskRollup)
+        if user_id is not None:
+            delete_statement = delete_statement.where(DailyTaskRollup.user_id == user_id)
+        self.session.execute(delete_statement)
+
+        totals: Dict[tuple, Dict[str, int]] = {}
+        for dimension, value_column, joins in (
+            ("all", literal(""), False),
+            ("priority", Task.priority, False),
+            ("tag", Tag.name, True),
+        ):
+            for row in self.session.execute(self._backfill_query(value_column, joins, user_id)):
+                value = getattr(row.value, "value", row.value)
+                key = (row.user_id, _as_date(row.day), dimension, value)
+                counters = totals.setdefault(key, {"created_count": 0, "completed_count": 0})
+                counters[row.kind] += row.count
+
+        rows = [
+            {"user_id": u, "day": d, "dimension": dim, "value": v, "reopened_count": 0, **counters}
+            for (u, d, dim, v), counters in totals.items()
+        ]
+        if rows:
+            self.session.execute(DailyTaskRollup.__table__.insert(), rows)
+        self.session.commit()
+        return len(rows)
+
+    def _backfill_query(self, value_column, joins: bool, user_id: Optional[int]):
+        created = sa_select(
+            Task.user_id, func.date(Task.created_at).label("day"),
+            value_column.label("value"), literal("created_count").label("kind"),
+        )
+        completed = sa_select(
+            Task.user_id, func.date(Task.updated_at).label("day"),
+            value_column.label("value"), literal("completed_count").label("kind"),
+        ).where(Task.completed == True)
+        if joins:
+            created = created.join(TaskTag, TaskTag.task_id == Task.id).join(Tag, Tag.id == TaskTag.tag_id)
+            completed = completed.join(TaskTag, TaskTag.task_id == Task.id).join(Tag, Tag.id == TaskTag.tag_id)
+        if user_id is not None:
+            created = created.where(Task.user_id == user_id)
+            completed = completed.where(Task.user_id == user_id)
+
+        events = union_all(created, completed).subquery()
+        return sa_select(
+            events.c.user_id, events.c.day, events.c.value, events.c.kind,
+            func.count().label("count"),
+        ).group_by(events.c.user_id, events.c.day, events.c.value, events.c.kind)
+
+    def _tag_names(self, task_ids: List[int]) -> Dict[int, List[str]]:
+        names: Dict[int, List[str]] = {}
+        if not task_ids:
+            return names
+        rows = self.session.exec(
+            select(TaskTag.task_id, Tag.name)
+            .join(Tag, Tag.id == TaskTag.tag_id)
+            .where(TaskTag.task_id.in_(task_ids))
+        ).all()
+        for task_id, name in rows:
+            names.setdefault(task_id, []).append(name)
+        return names
+
+    def _rows(self, user_id: int, when: datetime, priority, tag_names: Iterable[str], **counters) -> List[dict]:
+        day = when.date()
+        base = {name: counters.get(name, 0) for name in _COUNTER_COLUMNS}
+        keys = [("all", ""), ("priority", getattr(priority, "value", priority))]
+        keys += [("tag", name) for name in sorted(set(tag_names or []))]
+        return [
+            {"user_id": user_id, "day": day, "dimension": dimension, "value": value, **base}
+            for dimension, value in keys
+        ]
+
+    def _apply(self, rows: List[dict]):
+        # Merge rows with the same key first: one INSERT ... ON CONFLICT
+        # statement cannot update the same target row twice
+        merged: Dict[tuple, dict] = {}
+        for row in rows:
+            key = tuple(row[name] for name in _KEY_COLUMNS)
+            if key in merged:
+                for name in _COUNTER_COLUMNS:
+                    merged[key][name] += row[name]
+            else:
+                merged[key] = dict(row)
+        increment_counters(self.session, DailyTaskRollup.__table__, list(merged.values()),
+                           _KEY_COLUMNS, _COUNTER_COLUMNS)
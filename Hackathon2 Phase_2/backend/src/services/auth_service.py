@@ -1,10 +1,17 @@
 from sqlmodel import Session, select
-from typing import Optional
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from models.user import User, UserCreate, UserResponse
 from models.refresh_token import RefreshToken
-from utils.security_fixed import get_password_hash
-from utils.jwt import create_access_token, create_refresh_token, authenticate_user, verify_token
+from config import settings
+from database import commit_without_expiring
+from utils.metrics import metrics
+from utils.password_hasher import get_password_hasher
+from utils.jwt import REFRESH_TOKEN_TYPE, create_access_token, create_refresh_token, authenticate_user, verify_token
+from utils.auth_cache import load_user, token_digest
+from utils.revoked_tokens import revoked_refresh_tokens
 
 
 def create_user(session: Session, user_create: UserCreate) -> UserResponse:
@@ -24,14 +31,19 @@ def create_user(session: Session, user_create: UserCreate) -> UserResponse:
         raise ValueError("Password must contain at least one number")
 
     # Create new user
-    hashed_password = get_password_hash(user_create.password)
-    db_user = User(
-        email=user_create.email,
-        hashed_password=hashed_password
-    )
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    hashed_password = get_password_hasher().hash(user_create.password)
+    now = datetime.utcnow()
+    try:
+        db_user = session.scalars(
+            insert(User)
+            .values(email=user_create.email, hashed_password=hashed_password, created_at=now, updated_at=now)
+            .returning(User)
+        ).one()
+        commit_without_expiring(session)
+    except IntegrityError:
+        # Registered concurrently after the check above
+        session.rollback()
+        raise ValueError("Email already registered")
 
     return UserResponse(
         id=db_user.id,
@@ -61,15 +73,19 @@ def authenticate_and_create_tokens(session: Session, email: str, password: str)
         expires_delta=refresh_token_expires
     )
 
-    # Store refresh token in database
-    db_refresh_token = RefreshToken(
-        token=refresh_token,
-        user_id=user.id,
-        expires_at=datetime.utcnow() + refresh_token_expires
+    # Store the refresh token's digest in the database
+    session.execute(
+        insert(RefreshToken).values(
+            token_digest=token_digest(refresh_token),
+            user_id=user.id,
+            expires_at=datetime.utcnow() + refresh_token_expires,
+            created_at=datetime.utcnow(),
+        )
     )
-    session.add(db_refresh_token)
+    evicted = _revoke_oldest_refresh_tokens(session, user.id)
     session.commit()
-    session.refresh(db_refresh_token)  # Refresh to get the ID
+    for digest, expires_at in evicted:
+        revoked_refresh_tokens.add(digest, expires_at)
 
     return {
         "access_token": access_token,
@@ -78,30 +94,64 @@ def authenticate_and_create_tokens(session: Session, email: str, password: str)
     }
 
 
+def _revoke_oldest_refresh_tokens(session: Session, user_id: int) -> List[Tuple[bytes, datetime]]:
+    """Revoke the user's unrevoked tokens beyond REFRESH_TOKEN_MAX_ACTIVE_PER_USER, oldest first.
+
+    Returns (digest, expires_at) of each revoked token. Does not commit.
+    Tokens are revoked rather than deleted, since a signed token stays
+    valid until its expiry unless it is known to be revoked.
+    """
+    now = datetime.utcnow()
+    beyond_cap = (
+        select(RefreshToken.id)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > now)
+        .order_by(RefreshToken.created_at.desc(), RefreshToken.id.desc())
+        .offset(settings.REFRESH_TOKEN_MAX_ACTIVE_PER_USER)
+    )
+    evicted = session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id.in_(beyond_cap))
+        .values(revoked=True, revoked_at=now)
+        .returning(RefreshToken.token_digest, RefreshToken.expires_at)
+    ).all()
+    if evicted:
+        metrics.increment("auth.refresh_tokens_evicted", len(evicted))
+    return [(bytes(digest), expires_at) for digest, expires_at in evicted]
+
+
 def refresh_access_token(session: Session, refresh_token: str) -> Optional[dict]:
-    """Refresh an access token using a refresh token."""
-    # Find the refresh token in the database
-    db_refresh_token = session.exec(
-        select(RefreshToken)
-        .where(RefreshToken.token == refresh_token)
-        .where(RefreshToken.revoked == False)
-        .where(RefreshToken.expires_at > datetime.utcnow())
-    ).first()
-    
-    if not db_refresh_token:
-        return None
-    
-    # Verify the refresh token
+    """Refresh an access token using a refresh token.
+
+    The signature and exp prove the token was issued by us and is current,
+    so revocation is the only question left; the in-process revoked set
+    answers it without a query.
+    """
     payload = verify_token(refresh_token)
     if not payload:
         return None
-    
+
+    digest = token_digest(refresh_token)
+    if payload.get("type") == REFRESH_TOKEN_TYPE:
+        if revoked_refresh_tokens.contains(session, digest):
+            return None
+    else:
+        # Issued before refresh tokens were typed: only the table tells
+        # these apart from access tokens
+        db_refresh_token = session.exec(
+            select(RefreshToken.id)
+            .where(RefreshToken.token_digest == digest)
+            .where(RefreshToken.revoked == False)
+            .where(RefreshToken.expires_at > datetime.utcnow())
+        ).first()
+        if not db_refresh_token:
+            return None
+
     # Get the user
     user_id = payload.get("sub")
     if not user_id:
         return None
-    
-    user = session.get(User, int(user_id))
+
+    user = load_user(session, int(user_id))
     if not user:
         return None
     
@@ -115,4 +165,22 @@ def refresh_access_token(session: Session, refresh_token: str) -> Optional[dict]
     return {
         "access_token": access_token,
         "token_type": "bearer"
-    }
\ No newline at end of file
+    }
+
+
+def revoke_refresh_token(session: Session, refresh_token: str) -> bool:
+    """Revoke a refresh token; returns False if it is unknown or already revoked."""
+    digest = token_digest(refresh_token)
+    now = datetime.utcnow()
+    expires_at = session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_digest == digest, RefreshToken.revoked == False)
+        .values(revoked=True, revoked_at=now)
+        .returning(RefreshToken.expires_at)
+    ).scalar()
+    session.commit()
+    if expires_at is None:
+        return False
+
+    revoked_refresh_tokens.add(digest, expires_at)
+    return True
@@ -0,0 +1,52 @@
+import time
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Session, select
+from sqlalchemy import delete
+from config import settings
+from models.refresh_token import RefreshToken
+from utils.metrics import metrics
+
+
+class RefreshTokenPurgeService:
+    """Deletes expired refresh tokens, revoked or not.
+
+    Every login adds a row. Rows are removed here once their token has
+    expired, REFRESH_TOKEN_PURGE_BATCH_SIZE per transaction, oldest expiry
+    first through the expires_at index. Revoked tokens are kept until they
+    expire too: their row is the revocation record the in-process revoked
+    set is rebuilt from (see utils.revoked_tokens). Logins never touch
+    expired rows, so the purge does not contend with them.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def purge(self, batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> int:
+        """Delete expired tokens in batches; returns how many rows were removed"""
+        batch_size = batch_size or settings.REFRESH_TOKEN_PURGE_BATCH_SIZE
+        now = datetime.utcnow()
+
+        removed = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            token_ids = self.session.exec(
+                select(RefreshToken.id)
+                .where(RefreshToken.expires_at <= now)
+                .order_by(RefreshToken.expires_at)
+                .limit(batch_size)
+            ).all()
+            if not token_ids:
+                break
+
+            started = time.perf_counter()
+            result = self.session.execute(delete(RefreshToken).where(RefreshToken.id.in_(token_ids)))
+            self.session.commit()
+            metrics.observe("refresh_token_purge.batch", time.perf_counter() - started)
+            removed += result.rowcount
+            batches += 1
+            if len(token_ids) < batch_size:
+                break
+
+        metrics.increment("refresh_token_purge.tokens", removed)
+        return removed
@@ -0,0 +1,204 @@
+from sqlmodel import Session, select
+from sqlalchemy import case, delete, exists, insert, literal, tuple_
+from sqlalchemy import select as sa_select
+from typing import List, Optional
+from datetime import datetime, timedelta
+from config import settings
+from models.smart_list_model import SmartList, SmartListMember, SmartListCreate, SmartListUpdate
+from models.task_model import Task
+from utils.task_filter import TaskFilterError, compile_task_filter, filter_time_granularity
+
+
+class SmartListService:
+    """Saved filters with a materialized membership table.
+
+    Membership is rebuilt with one INSERT ... SELECT when a list is created or
+    its query changes, and maintained incrementally by TaskService on every
+    task write by evaluating only the written task against the user's lists.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_lists(self, user_id: int) -> List[SmartList]:
+        """Get all smart lists for a specific user"""
+        return self.session.exec(
+            select(SmartList).where(SmartList.user_id == user_id).order_by(SmartList.id)
+        ).all()
+
+    def get_list(self, list_id: int, user_id: int) -> Optional[SmartList]:
+        """Get a smart list by its ID for a specific user"""
+        return self.session.exec(
+            select(SmartList).where(SmartList.id == list_id, SmartList.user_id == user_id)
+        ).first()
+
+    def create_list(self, list_data: SmartListCreate, user_id: int) -> SmartList:
+        """Create a smart list and build its membership"""
+        compile_task_filter(list_data.query)  # Raises TaskFilterError (a ValueError) if invalid
+
+        smart_list = SmartList(name=list_data.name, query=list_data.query, user_id=user_id)
+        self.session.add(smart_list)
+        self.session.flush()
+        self._rebuild(smart_list)
+        self.session.commit()
+        self.session.refresh(smart_list)
+        return smart_list
+
+    def update_list(self, list_id: int, user_id: int, list_data: SmartListUpdate) -> Optional[SmartList]:
+        """Update a smart list, rebuilding its membership if the query changed"""
+        smart_list = self.get_list(list_id, user_id)
+        if not smart_list:
+            return None
+
+        update_data = list_data.dict(exclude_unset=True)
+        query_changed = "query" in update_data and update_data["query"] != smart_list.query
+        if query_changed:
+            compile_task_filter(update_data["query"])
+
+        for field, value in update_data.items():
+            setattr(smart_list, field, value)
+
+        if query_changed:
+            self._rebuild(smart_list)
+
+        self.session.add(smart_list)
+        self.session.commit()
+        self.session.refresh(smart_list)
+        return smart_list
+
+    def delete_list(self, list_id: int, user_id: int) -> bool:
+        """Delete a smart list and its membership rows"""
+        smart_list = self.get_list(list_id, user_id)
+        if not smart_list:
+            return False
+
+        self.session.execute(delete(SmartListMember).where(SmartListMember.smart_list_id == list_id))
+        self.session.delete(smart_list)
+        self.session.commit()
+        return True
+
+    def get_list_tasks(self, smart_list: SmartList) -> List[Task]:
+        """Get the tasks of a smart list through the membership table"""
+        if self._is_stale(smart_list):
+            # Lists over relative dates ("due:today", "due<now") change
+            # membership as time passes, not only when tasks are written
+            self._rebuild(smart_list)
+            self.session.commit()
+
+        statement = (
+            select(Task)
+            .join(SmartListMember, SmartListMember.task_id == Task.id)
+            .where(SmartListMember.smart_list_id == smart_list.id, Task.deleted_at.is_(None))
+            .order_by(Task.created_at.desc())
+        )
+        return self.session.exec(statement).all()
+
+    def rebuild_list(self, smart_list: SmartList) -> int:
+        """Recompute the membership of a smart list from scratch"""
+        count = self._rebuild(smart_list)
+        self.session.commit()
+        return count
+
+    def rebuild_user_lists(self, user_id: int) -> int:
+        """Recompute every smart list of a user, e.g. after a bulk import"""
+        count = 0
+        for smart_list in self.get_lists(user_id):
+            try:
+                count += self._rebuild(smart_list)
+            except TaskFilterError:
+                continue
+        self.session.commit()
+        return count
+
+    def sync_task(self, task_id: int, user_id: int):
+        """Bring one task's membership up to date after it was written.
+
+        Does not commit; callers run this inside their own write transaction.
+        """
+        self.sync_tasks([task_id], user_id)
+
+    def sync_tasks(self, task_ids: List[int], user_id: int):
+        """Bring the membership of the given tasks up to date. Does not commit."""
+        if not task_ids:
+            return
+        lists = self.session.exec(
+            select(SmartList.id, SmartList.query).where(SmartList.user_id == user_id)
+        ).all()
+        if not lists:
+            return
+
+        # One query evaluates every list predicate against only the written
+        # rows and reports their current membership alongside
+        columns = [Task.id]
+        for list_id, query in lists:
+            try:
+                predicate = compile_task_filter(query)
+            except TaskFilterError:
+                # A stored query that no longer validates matches nothing
+                predicate = literal(False)
+            is_member = exists().where(
+                SmartListMember.smart_list_id == list_id, SmartListMember.task_id == Task.id
+            )
+            columns.append(case((predicate, 1), else_=0))
+            columns.append(case((is_member, 1), else_=0))
+        rows = self.session.execute(
+            sa_select(*columns).where(Task.id.in_(task_ids), Task.deleted_at.is_(None))
+        ).all()
+
+        found = set()
+        to_add, to_remove = [], []
+        for row in rows:
+            task_id = row[0]
+            found.add(task_id)
+            for index, (list_id, _) in enumerate(lists):
+                matched, is_member = row[1 + 2 * index], row[2 + 2 * index]
+                if matched and not is_member:
+                    to_add.append({"smart_list_id": list_id, "task_id": task_id})
+                elif is_member and not matched:
+                    to_remove.append((list_id, task_id))
+
+        missing = [task_id for task_id in task_ids if task_id not in found]
+        if missing:
+            self.remove_tasks(missing)
+        if to_add:
+            self.session.execute(insert(SmartListMember), to_add)
+        if to_remove:
+            self.session.execute(
+                delete(SmartListMember).where(
+                    tuple_(SmartListMember.smart_list_id, SmartListMember.task_id).in_(to_remove)
+                )
+            )
+
+    def remove_tasks(self, task_ids):
+        """Drop tasks from every smart list. Does not commit.
+
+        task_ids may be a list or a SELECT of task ids.
+        """
+        self.session.execute(delete(SmartListMember).where(SmartListMember.task_id.in_(task_ids)))
+
+    def _is_stale(self, smart_list: SmartList) -> bool:
+        try:
+            granularity = filter_time_granularity(smart_list.query)
+        except TaskFilterError:
+            return False
+        now = datetime.utcnow()
+        if granularity == "day":
+            return smart_list.refreshed_at < datetime.combine(now.date(), datetime.min.time())
+        if granularity == "instant":
+            max_age = timedelta(seconds=settings.SMART_LIST_INSTANT_REFRESH_SECONDS)
+            return smart_list.refreshed_at < now - max_age
+        return False
+
+    def _rebuild(self, smart_list: SmartList) -> int:
+        self.session.execute(delete(SmartListMember).where(SmartListMember.smart_list_id == smart_list.id))
+        source = sa_select(literal(smart_list.id), Task.id).where(
+            Task.user_id == smart_list.user_id,
+            Task.deleted_at.is_(None),
+            compile_task_filter(smart_list.query),
+        )
+        result = self.session.execute(
+            insert(SmartListMember).from_select(["smart_list_id", "task_id"], source)
+        )
+        smart_list.refreshed_at = datetime.utcnow()
+        self.session.add(smart_list)
+        return result.rowcount
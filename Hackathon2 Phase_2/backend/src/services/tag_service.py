@@ -0,0 +1,144 @@
+from sqlmodel import Session, select
+from sqlalchemy import delete, event, insert, tuple_
+from typing import Dict, Iterable, List
+from config import settings
+from models.task_model import Tag, TaskTag
+from utils.lru_cache import LRUCache
+from utils.upsert import dialect_insert
+
+
+# Tag name -> id. Entries expire so tags deleted by another process stop
+# resolving within TAG_ID_CACHE_TTL_SECONDS; deletes in this process
+# invalidate immediately.
+tag_id_cache = LRUCache(settings.TAG_ID_CACHE_SIZE, settings.TAG_ID_CACHE_TTL_SECONDS, name="tag_ids")
+
+_PENDING_KEY = "pending_tag_ids"
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_tag_ids(session):
+    # Ids are only cached once the transaction that saw or created them
+    # commits, so a rollback can never leave an id for a missing row behind
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        tag_id_cache.set_many(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tag_ids(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def invalidate_tag(name: str):
+    """Forget the cached id of a tag, e.g. after it is deleted"""
+    tag_id_cache.invalidate(name)
+
+
+class TagService:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def resolve_ids(self, tag_names: Iterable[str]) -> Dict[str, int]:
+        """Map tag names to ids, creating the missing tags.
+
+        Costs nothing for cached names, otherwise one SELECT ... IN for the
+        rest and one INSERT ... ON CONFLICT DO NOTHING RETURNING for names
+        that do not exist yet. Does not commit.
+        """
+        names = list(dict.fromkeys(tag_names))
+        if not names:
+            return {}
+
+        tag_ids = tag_id_cache.get_many(names)
+        uncached = [name for name in names if name not in tag_ids]
+        if uncached:
+            found = dict(self.session.exec(select(Tag.name, Tag.id).where(Tag.name.in_(uncached))).all())
+            missing = [name for name in uncached if name not in found]
+            if missing:
+                found.update(self._insert_missing(missing))
+            tag_ids.update(found)
+            self.session.info.setdefault(_PENDING_KEY, {}).update(found)
+        return tag_ids
+
+    def link_tags(self, tag_names_by_task: Dict[int, List[str]]):
+        """Attach tags to tasks with one bulk TaskTag insert. Does not commit."""
+        tag_ids = self.resolve_ids(name for names in tag_names_by_task.values() for name in names)
+        rows = [
+            {"task_id": task_id, "tag_id": tag_ids[name]}
+            for task_id, names in tag_names_by_task.items()
+            for name in dict.fromkeys(names)
+        ]
+        if rows:
+            self.session.execute(insert(TaskTag), rows)
+
+    def get_tag_names(self, task_ids: List[int]) -> Dict[int, List[str]]:
+        """The tag names of each task, sorted; tasks without tags map to []"""
+        names: Dict[int, List[str]] = {task_id: [] for task_id in task_ids}
+        if not task_ids:
+            return names
+        rows = self.session.exec(
+            select(TaskTag.task_id, Tag.name)
+            .join(Tag, Tag.id == TaskTag.tag_id)
+            .where(TaskTag.task_id.in_(task_ids))
+            .order_by(TaskTag.task_id, Tag.name)
+        ).all()
+        for task_id, name in rows:
+            names[task_id].append(name)
+        return names
+
+    def replace_tags(self, tag_names_by_task: Dict[int, List[str]]) -> List[int]:
+        """Set the tags of tasks to the given names by diffing against the current links.
+
+        Only added links are inserted and only removed ones deleted, so an
+        unchanged tag set costs one SELECT and no writes. Returns the ids of
+        tasks whose tags changed. Does not commit.
+        """
+        if not tag_names_by_task:
+            return []
+        current: Dict[int, Dict[str, int]] = {task_id: {} for task_id in tag_names_by_task}
+        rows = self.session.exec(
+            select(TaskTag.task_id, Tag.name, Tag.id)
+            .join(Tag, Tag.id == TaskTag.tag_id)
+            .where(TaskTag.task_id.in_(list(tag_names_by_task)))
+        ).all()
+        for task_id, name, tag_id in rows:
+            current[task_id][name] = tag_id
+
+        added: Dict[int, List[str]] = {}
+        removed = []
+        for task_id, names in tag_names_by_task.items():
+            wanted = set(names)
+            have = current[task_id]
+            new_names = [name for name in dict.fromkeys(names) if name not in have]
+            if new_names:
+                added[task_id] = new_names
+            removed += [(task_id, tag_id) for name, tag_id in have.items() if name not in wanted]
+
+        if removed:
+            self.session.execute(
+                delete(TaskTag).where(tuple_(TaskTag.task_id, TaskTag.tag_id).in_(removed))
+            )
+        if added:
+            self.link_tags(added)
+        return list(dict.fromkeys(list(added) + [task_id for task_id, _ in removed]))
+
+    def _insert_missing(self, names: List[str]) -> Dict[str, int]:
+        table = Tag.__table__
+        statement = dialect_insert(self.session, table)
+        if statement is None:
+            tags = [Tag(name=name) for name in names]
+            self.session.add_all(tags)
+            self.session.flush()
+            return {tag.name: tag.id for tag in tags}
+
+        statement = (
+            statement.values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(table.c.name, table.c.id)
+        )
+        created = dict(self.session.execute(statement).all())
+        lost = [name for name in names if name not in created]
+        if lost:
+            # Another transaction created these between our SELECT and INSERT
+            created.update(self.session.exec(select(Tag.name, Tag.id).where(Tag.name.in_(lost))).all())
+        return created
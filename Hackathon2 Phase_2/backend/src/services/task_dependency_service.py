@@ -0,0 +1,194 @@
+from typing import Iterable, List, Optional, Set
+from sqlmodel import Session, select
+from sqlalchemy import delete, func, insert, update
+from models.task_model import Task
+from models.task_dependency_model import TaskDependency
+from models.user import User
+
+
+class TaskDependencyService:
+    """Blocked-by links between a user's tasks.
+
+    Each task keeps open_blocker_count, the number of its blockers that
+    are live and not completed, so "what can I work on now" is an indexed
+    read of open tasks at 0 rather than a graph evaluation. TaskService
+    calls shift_open_blockers() whenever tasks stop or start being open
+    (completion changes, deletes, restores), in the same transaction.
+
+    Link changes and those writes take the same per-user lock (the owner's
+    user row), so a link added while its blocker is being completed is
+    counted by exactly one of the two.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add_blocker(self, task_id: int, blocker_id: int, user_id: int) -> bool:
+        """Record that task_id is blocked by blocker_id. Does not commit.
+
+        Returns False when either task is not a live task of the user and
+        raises ValueError when the link would close a cycle. Adding an
+        existing link changes nothing.
+        """
+        if task_id == blocker_id:
+            raise ValueError("A task cannot block itself")
+
+        # Serialize dependency changes per user, so two concurrent links
+        # cannot each pass the cycle check and together form a cycle
+        self.lock_owners(user_ids=[user_id])
+
+        tasks = self.session.exec(
+            select(Task.id, Task.completed)
+            .where(Task.user_id == user_id, Task.deleted_at.is_(None), Task.id.in_([task_id, blocker_id]))
+        ).all()
+        if len(tasks) != 2:
+            return False
+        if self.session.get(TaskDependency, (task_id, blocker_id)) is not None:
+            return True
+        if self.creates_cycle(task_id, blocker_id):
+            raise ValueError("Blocker would create a dependency cycle")
+
+        self.session.execute(insert(TaskDependency).values(task_id=task_id, blocker_id=blocker_id))
+        blocker_open = not dict(tasks)[blocker_id]
+        if blocker_open:
+            self._add_to_count([task_id], 1)
+        return True
+
+    def remove_blocker(self, task_id: int, blocker_id: int, user_id: int) -> bool:
+        """Drop a blocked-by link; returns False if there was none. Does not commit."""
+        self.lock_owners(user_ids=[user_id])
+        blocker = select(Task.id).where(Task.id == blocker_id, Task.user_id == user_id)
+        removed = self.session.execute(
+            delete(TaskDependency)
+            .where(TaskDependency.task_id == task_id, TaskDependency.blocker_id.in_(blocker))
+            .returning(TaskDependency.blocker_id)
+        ).first()
+        if removed is None:
+            return False
+        blocker_open = self.session.exec(
+            select(Task.id).where(Task.id == blocker_id, Task.completed == False, Task.deleted_at.is_(None))
+        ).first()
+        if blocker_open is not None:
+            self._add_to_count([task_id], -1)
+        return True
+
+    def lock_owners(self, task_ids: Iterable[int] = (), user_ids: Iterable[int] = ()):
+        """Take the dependency lock of the given users and of the owners of task_ids. Does not commit.
+
+        TaskService takes it before changing whether tasks are open, ahead
+        of its task row locks, as add_blocker does. Users are locked in id
+        order, so writers locking several of them cannot deadlock.
+        """
+        task_ids, user_ids = list(task_ids), list(user_ids)
+        if not task_ids and not user_ids:
+            return
+        condition = User.id.in_(user_ids)
+        if task_ids:
+            condition = condition | User.id.in_(select(Task.user_id).where(Task.id.in_(task_ids)))
+        self.session.exec(select(User.id).where(condition).order_by(User.id).with_for_update()).all()
+
+    def creates_cycle(self, task_id: int, blocker_id: int) -> bool:
+        """Whether task_id is already, directly or not, a blocker of blocker_id.
+
+        A bidirectional search: one side walks from blocker_id to its
+        blockers, the other from task_id to its dependents, always
+        expanding the smaller frontier by one level per query, until they
+        meet or either side runs out. Only the part of the graph between
+        the two tasks is visited, not the user's whole graph.
+        """
+        up_seen, up_frontier = {blocker_id}, {blocker_id}
+        down_seen, down_frontier = {task_id}, {task_id}
+        while up_frontier and down_frontier:
+            if len(up_frontier) <= len(down_frontier):
+                step = set(self.session.exec(
+                    select(TaskDependency.blocker_id).where(TaskDependency.task_id.in_(up_frontier))
+                ).all())
+                if step & down_seen:
+                    return True
+                up_frontier = step - up_seen
+                up_seen |= up_frontier
+            else:
+                step = set(self.session.exec(
+                    select(TaskDependency.task_id).where(TaskDependency.blocker_id.in_(down_frontier))
+                ).all())
+                if step & up_seen:
+                    return True
+                down_frontier = step - down_seen
+                down_seen |= down_frontier
+        return False
+
+    def shift_open_blockers(self, opened: Iterable[int] = (), closed: Iterable[int] = ()):
+        """Adjust the counts of every task blocked by tasks that became open or stopped being open.
+
+        opened: tasks that were reopened or restored; closed: tasks that
+        were completed or deleted. A dependent blocked by several of them
+        is adjusted once, by the net difference. Does not commit.
+        """
+        opened, closed = set(opened), set(closed)
+        if not opened and not closed:
+            return
+
+        def links_from(blockers: Set[int]):
+            return (
+                select(func.count())
+                .where(TaskDependency.task_id == Task.id, TaskDependency.blocker_id.in_(blockers))
+                .scalar_subquery()
+            )
+
+        delta = 0
+        if opened:
+            delta = delta + links_from(opened)
+        if closed:
+            delta = delta - links_from(closed)
+        dependents = select(TaskDependency.task_id).where(TaskDependency.blocker_id.in_(opened | closed))
+        self.session.execute(
+            update(Task)
+            .where(Task.id.in_(dependents))
+            .values(open_blocker_count=Task.open_blocker_count + delta)
+            .execution_options(synchronize_session=False)
+        )
+
+    def blockers(self, task_id: int, user_id: int) -> List[Task]:
+        """Live blockers of a task, open ones first"""
+        return self.session.exec(
+            select(Task)
+            .join(TaskDependency, TaskDependency.blocker_id == Task.id)
+            .where(TaskDependency.task_id == task_id, Task.user_id == user_id, Task.deleted_at.is_(None))
+            .order_by(Task.completed, Task.rank, Task.id)
+        ).all()
+
+    def actionable(self, user_id: int, limit: int) -> List[Task]:
+        """Open tasks with no open blockers, in the manual order"""
+        return self.session.exec(
+            select(Task)
+            .where(Task.user_id == user_id, Task.deleted_at.is_(None),
+                   Task.open_blocker_count == 0, Task.completed == False)
+            .order_by(Task.rank, Task.id)
+            .limit(limit)
+        ).all()
+
+    def recount(self, user_id: Optional[int] = None) -> int:
+        """Recompute open_blocker_count from the links (of one user's tasks); returns how many changed. Does not commit."""
+        blocker = Task.__table__.alias("blocker")
+        actual = (
+            select(func.count())
+            .select_from(TaskDependency)
+            .join(blocker, blocker.c.id == TaskDependency.blocker_id)
+            .where(TaskDependency.task_id == Task.id, blocker.c.completed == False, blocker.c.deleted_at.is_(None))
+            .scalar_subquery()
+        )
+        statement = update(Task).where(Task.open_blocker_count != actual)
+        if user_id is not None:
+            statement = statement.where(Task.user_id == user_id)
+        result = self.session.execute(
+            statement.values(open_blocker_count=actual).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def _add_to_count(self, task_ids: List[int], delta: int):
+        self.session.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids))
+            .values(open_blocker_count=Task.open_blocker_count + delta)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,159 @@
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlmodel import Session, select
+from sqlalchemy import event, insert
+from config import settings
+from models.task_event_model import TaskEvent, TaskEventKindEnum
+from utils.metrics import metrics
+
+
+class TaskEventWriter:
+    """Inserts task events in batches from a background thread.
+
+    record_many() only appends to an in-memory buffer, so task writes never
+    wait on the activity log. The thread inserts up to batch_size events
+    per statement, as soon as that many are waiting or flush_seconds after
+    it last wrote. At most max_buffer events wait; beyond that new events
+    are dropped and counted, rather than blocking requests or growing
+    memory while the database is unreachable. close() writes what is left
+    and runs on application shutdown and at interpreter exit.
+    """
+
+    def __init__(self, batch_size: int, flush_seconds: float, max_buffer: int, name: str = "task_events"):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_buffer = max_buffer
+        self._name = name
+        self._cond = threading.Condition()
+        self._buffer: deque = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        metrics.gauge(f"{name}.buffered", lambda: len(self._buffer))
+
+    def record_many(self, events: List[dict]):
+        """Queue events (TaskEvent column values) for writing"""
+        if not events:
+            return
+        with self._cond:
+            if self._closed:
+                write_now, dropped = events, 0
+            else:
+                write_now = None
+                accepted = events[:max(self.max_buffer - len(self._buffer), 0)]
+                dropped = len(events) - len(accepted)
+                self._buffer.extend(accepted)
+                if self._thread is None:
+                    # Started on first use, so it runs in the process that
+                    # records (e.g. each forked server worker)
+                    self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+                if len(self._buffer) >= self.batch_size:
+                    self._cond.notify()
+        if dropped:
+            metrics.increment(f"{self._name}.dropped", dropped)
+        if write_now:
+            # After close() there is no thread left to hand them to
+            self._write(write_now)
+
+    def flush(self):
+        """Write every buffered event now, in the calling thread"""
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self, timeout: float = 10.0):
+        """Stop the thread once the buffer is written"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_seconds)
+                if self._closed and not self._buffer:
+                    return
+            batch = self._take()
+            if batch:
+                self._write(batch)
+
+    def _take(self) -> List[dict]:
+        with self._cond:
+            return [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+
+    def _write(self, batch: List[dict]):
+        from database import get_engine
+        started = time.perf_counter()
+        try:
+            with Session(get_engine()) as session:
+                session.execute(insert(TaskEvent), batch)
+                session.commit()
+        except Exception as e:
+            metrics.increment(f"{self._name}.write_errors")
+            metrics.increment(f"{self._name}.dropped", len(batch))
+            print(f"Error writing task events: {str(e)}")  # This would typically go to a logger
+            return
+        metrics.observe(f"{self._name}.batch", time.perf_counter() - started)
+        metrics.increment(f"{self._name}.written", len(batch))
+
+
+task_event_writer = TaskEventWriter(
+    settings.TASK_EVENT_BATCH_SIZE, settings.TASK_EVENT_FLUSH_SECONDS, settings.TASK_EVENT_BUFFER_SIZE
+)
+
+_PENDING_KEY = "pending_task_events"
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_task_events(session):
+    # Events reach the writer only once their transaction commits, so a
+    # rolled back write never shows up in a task's activity
+    task_event_writer.record_many(session.info.pop(_PENDING_KEY, None))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_task_events(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+class TaskEventService:
+    """The activity log of tasks: staged by TaskService writes, read page by page."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def stage(self, task_ids: List[int], user_id: int, kind: TaskEventKindEnum, changes: Optional[dict] = None):
+        """Record that user_id changed the tasks, once the current transaction commits"""
+        now = datetime.utcnow()
+        self.session.info.setdefault(_PENDING_KEY, []).extend(
+            {"task_id": task_id, "user_id": user_id, "kind": kind, "changes": changes, "created_at": now}
+            for task_id in task_ids
+        )
+
+    def get_activity(self, task_id: int, limit: int, before: Optional[int] = None) -> Tuple[List[TaskEvent], Optional[int]]:
+        """A page of a task's events, newest first, and the cursor of the next page (None on the last).
+
+        Keyset pagination on the event id: each page is one range read of
+        the (task_id, id) index, however deep the page.
+        """
+        statement = select(TaskEvent).where(TaskEvent.task_id == task_id)
+        if before is not None:
+            statement = statement.where(TaskEvent.id < before)
+        events = self.session.exec(statement.order_by(TaskEvent.id.desc()).limit(limit + 1)).all()
+        if len(events) > limit:
+            return events[:limit], events[limit - 1].id
+        return events, None
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List
+from sqlmodel import Session, select
+from sqlalchemy import select as sa_select
+from config import settings
+from models.task_model import Task, Tag, TaskTag
+
+
+# Column order of CSV exports; imports read the same layout
+EXPORT_COLUMNS = [
+    "id", "title", "description", "completed", "priority", "due_date",
+    "recurrence_pattern", "reminder_time", "created_at", "updated_at", "tags",
+]
+# Tags are stored in one CSV cell joined by this separator
+TAG_SEPARATOR = "|"
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)  # Enums
+
+
+class TaskExportService:
+    """Streams a user's tasks without materializing them.
+
+    Rows are read through a server-side cursor in batches of
+    EXPORT_BATCH_SIZE and each batch's tags are fetched with one join, so
+    memory use depends on the batch size, not on the size of the account.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def iter_batches(self, user_id: int, batch_size: int = None) -> Iterator[List[dict]]:
+        """Yield the user's tasks, oldest first, as lists of plain dicts"""
+        batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+        columns = [Task.__table__.c[name] for name in EXPORT_COLUMNS if name != "tags"]
+        result = self.session.execute(
+            sa_select(*columns)
+            .where(Task.user_id == user_id, Task.deleted_at.is_(None))
+            .order_by(Task.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in result.partitions():
+            rows = [{key: _plain(value) for key, value in row._mapping.items()} for row in partition]
+            tags = self._tag_names([row["id"] for row in rows])
+            for row in rows:
+                row["tags"] = tags.get(row["id"], [])
+            yield rows
+
+    def _tag_names(self, task_ids: List[int]) -> Dict[int, List[str]]:
+        names: Dict[int, List[str]] = {}
+        rows = self.session.exec(
+            select(TaskTag.task_id, Tag.name)
+            .join(Tag, Tag.id == TaskTag.tag_id)
+            .where(TaskTag.task_id.in_(task_ids))
+            .order_by(TaskTag.task_id, Tag.name)
+        ).all()
+        for task_id, name in rows:
+            names.setdefault(task_id, []).append(name)
+        return names
+
+
+def ndjson_chunks(batches: Iterable[List[dict]]) -> Iterator[str]:
+    """Serialize batches as newline-delimited JSON, one chunk per batch"""
+    for rows in batches:
+        yield "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def csv_chunks(batches: Iterable[List[dict]]) -> Iterator[str]:
+    """Serialize batches as CSV: the header row first, even with no tasks, then one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for rows in batches:
+        for row in rows:
+            writer.writerow([
+                TAG_SEPARATOR.join(row["tags"]) if name == "tags" else row[name]
+                for name in EXPORT_COLUMNS
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Compress a stream of text chunks into one gzip stream as it is produced"""
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
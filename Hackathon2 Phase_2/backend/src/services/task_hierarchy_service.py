@@ -0,0 +1,160 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlmodel import Session, select
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, union_all
+from models.task_model import Task
+from models.task_closure_model import TaskClosure
+
+
+# Guards rebuild() against parent_id cycles in damaged data
+_REBUILD_MAX_DEPTH = 1000
+
+_CLOSURE_COLUMNS = ["ancestor_id", "descendant_id", "depth"]
+
+
+class TaskHierarchyService:
+    """Subtasks, kept as parent_id plus the task_closure table.
+
+    TaskService calls link() for new subtasks and move_subtree() when a
+    task changes parent, in the same transaction as the task write, so
+    the closure always matches parent_id. Reads then need one indexed
+    query whatever the depth: a subtree is every row with the task as
+    ancestor, and its progress is an aggregate over those rows.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def live_task_ids(self, user_id: int, task_ids: Iterable[int]) -> Set[int]:
+        """Those of task_ids that are live tasks of the user, e.g. to check parents"""
+        task_ids = set(task_ids)
+        if not task_ids:
+            return set()
+        return set(self.session.exec(
+            select(Task.id).where(Task.user_id == user_id, Task.deleted_at.is_(None), Task.id.in_(task_ids))
+        ).all())
+
+    def link(self, children: List[Tuple[int, int]]):
+        """Add closure rows for new tasks given as (task_id, parent_id). Does not commit.
+
+        New tasks have no descendants yet, so each gets its parent at
+        depth 1 and the parent's ancestors one level further away.
+        """
+        if not children:
+            return
+        self.session.execute(
+            insert(TaskClosure),
+            [{"ancestor_id": parent_id, "descendant_id": task_id, "depth": 1} for task_id, parent_id in children],
+        )
+        by_parent: Dict[int, List[int]] = {}
+        for task_id, parent_id in children:
+            by_parent.setdefault(parent_id, []).append(task_id)
+        for parent_id, task_ids in by_parent.items():
+            self.session.execute(
+                insert(TaskClosure).from_select(
+                    _CLOSURE_COLUMNS,
+                    select(TaskClosure.ancestor_id, Task.id, TaskClosure.depth + 1)
+                    .join(Task, Task.id.in_(task_ids))
+                    .where(TaskClosure.descendant_id == parent_id)
+                )
+            )
+
+    def move_subtree(self, task_id: int, parent_id: Optional[int]):
+        """Re-link a task and its descendants under parent_id (None: top level). Does not commit.
+
+        Raises ValueError if parent_id is the task or one of its descendants.
+        """
+        if parent_id is not None and (parent_id == task_id or self.is_descendant(parent_id, task_id)):
+            raise ValueError("A task cannot be moved under itself or one of its subtasks")
+
+        subtree = select(TaskClosure.descendant_id).where(TaskClosure.ancestor_id == task_id)
+        old_ancestors = select(TaskClosure.ancestor_id).where(TaskClosure.descendant_id == task_id)
+        self.session.execute(
+            delete(TaskClosure).where(
+                TaskClosure.ancestor_id.in_(old_ancestors),
+                or_(TaskClosure.descendant_id == task_id, TaskClosure.descendant_id.in_(subtree)),
+            ).execution_options(synchronize_session=False)
+        )
+        if parent_id is None:
+            return
+
+        # Every new ancestor (the parent and its ancestors) over every
+        # member of the subtree (the task and its descendants)
+        ancestors = union_all(
+            select(TaskClosure.ancestor_id.label("node_id"), TaskClosure.depth.label("depth"))
+            .where(TaskClosure.descendant_id == parent_id),
+            select(literal(parent_id).label("node_id"), literal(0).label("depth")),
+        ).subquery()
+        members = union_all(
+            select(TaskClosure.descendant_id.label("node_id"), TaskClosure.depth.label("depth"))
+            .where(TaskClosure.ancestor_id == task_id),
+            select(literal(task_id).label("node_id"), literal(0).label("depth")),
+        ).subquery()
+        self.session.execute(
+            insert(TaskClosure).from_select(
+                _CLOSURE_COLUMNS,
+                select(ancestors.c.node_id, members.c.node_id, ancestors.c.depth + members.c.depth + 1)
+                .select_from(ancestors.join(members, literal(True)))
+            )
+        )
+
+    def is_descendant(self, task_id: int, ancestor_id: int) -> bool:
+        return self.session.get(TaskClosure, (ancestor_id, task_id)) is not None
+
+    def subtree(self, task_id: int, user_id: int) -> List[Tuple[Task, int]]:
+        """Live descendants of a task with their depth below it, level by level in manual order"""
+        return self.session.exec(
+            select(Task, TaskClosure.depth)
+            .join(TaskClosure, TaskClosure.descendant_id == Task.id)
+            .where(TaskClosure.ancestor_id == task_id, Task.user_id == user_id, Task.deleted_at.is_(None))
+            .order_by(TaskClosure.depth, Task.rank, Task.id)
+        ).all()
+
+    def progress(self, task: Task) -> dict:
+        """Completion rolled up over all live descendants of a task.
+
+        A task without subtasks counts only itself.
+        """
+        total, completed = self.session.exec(
+            select(func.count(), func.coalesce(func.sum(case((Task.completed == True, 1), else_=0)), 0))
+            .select_from(TaskClosure)
+            .join(Task, Task.id == TaskClosure.descendant_id)
+            .where(TaskClosure.ancestor_id == task.id, Task.deleted_at.is_(None))
+        ).one()
+        if not total:
+            total, completed = 1, int(task.completed)
+        return {
+            "task_id": task.id,
+            "total": total,
+            "completed": completed,
+            "percent": round(100 * completed / total, 1),
+        }
+
+    def rebuild(self, user_id: int) -> int:
+        """Recompute a user's closure rows from parent_id; returns how many were written. Does not commit."""
+        user_tasks = select(Task.id).where(Task.user_id == user_id)
+        self.session.execute(
+            delete(TaskClosure).where(TaskClosure.descendant_id.in_(user_tasks))
+            .execution_options(synchronize_session=False)
+        )
+
+        # Walk up from every subtask: (parent, task, 1), (grandparent, task, 2), ...
+        tree = (
+            select(Task.parent_id.label("ancestor_id"), Task.id.label("descendant_id"), literal(1).label("depth"))
+            .where(Task.user_id == user_id, Task.parent_id.is_not(None))
+            .cte("tree", recursive=True)
+        )
+        parent = Task.__table__.alias("parent")
+        tree = tree.union_all(
+            select(parent.c.parent_id, tree.c.descendant_id, tree.c.depth + 1)
+            .join(parent, and_(parent.c.id == tree.c.ancestor_id, parent.c.parent_id.is_not(None)))
+            .where(tree.c.depth < _REBUILD_MAX_DEPTH)
+        )
+        self.session.execute(
+            insert(TaskClosure).from_select(
+                _CLOSURE_COLUMNS, select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth)
+            )
+        )
+        # rowcount of INSERT ... SELECT is not reported by every driver
+        return self.session.exec(
+            select(func.count()).select_from(TaskClosure).where(TaskClosure.descendant_id.in_(user_tasks))
+        ).one()
@@ -0,0 +1,287 @@
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from types import SimpleNamespace
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from sqlmodel import Session, select
+from sqlalchemy import insert, text
+from config import settings
+from database import get_engine
+from models.task_model import Task, TaskCreate, TaskTag
+from models.task_event_model import TaskEventKindEnum
+from models.task_import_job_model import TaskImportJob, ImportStatusEnum
+from services.task_export_service import TAG_SEPARATOR
+from utils.membership_cache import get_list_ids
+from utils.metrics import metrics
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def parse_rows(source: TextIO, format: str) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, row dict) pairs, or (line number, error message) for unreadable rows.
+
+    Accepts the layouts written by GET /api/tasks/export: a "tags" list
+    (NDJSON) or a TAG_SEPARATOR-joined "tags" cell (CSV) is read as tag_names.
+    """
+    if format == "csv":
+        reader = csv.DictReader(source)
+        for row in reader:
+            row = {key: (value if value != "" else None) for key, value in row.items() if key}
+            tags = row.pop("tags", None)
+            if tags and "tag_names" not in row:
+                row["tag_names"] = tags.split(TAG_SEPARATOR)
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "Expected a JSON object"
+            continue
+        if "tag_names" not in row and isinstance(row.get("tags"), list):
+            row["tag_names"] = row.pop("tags")
+        yield line_number, row
+
+
+def _chunked(rows: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class TaskImportService:
+    """Loads large task files without going through create_task row by row.
+
+    Input is streamed and validated with TaskCreate in chunks of
+    IMPORT_CHUNK_SIZE rows. Each chunk is one transaction: tasks go in with
+    COPY on PostgreSQL and a batched INSERT elsewhere, tags are resolved in
+    bulk and linked with one multi-row insert. Invalid rows are skipped and
+    reported on the job.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def create_job(self, user_id: int, format: str) -> TaskImportJob:
+        job = TaskImportJob(user_id=user_id, format=format)
+        self.session.add(job)
+        self.session.commit()
+        self.session.refresh(job)
+        return job
+
+    def get_job(self, job_id: int, user_id: int) -> Optional[TaskImportJob]:
+        return self.session.exec(
+            select(TaskImportJob).where(TaskImportJob.id == job_id, TaskImportJob.user_id == user_id)
+        ).first()
+
+    def run(self, job: TaskImportJob, source: TextIO,
+            on_progress: Optional[Callable[[TaskImportJob], None]] = None) -> TaskImportJob:
+        """Import every row of source into the job's account, updating the job after each chunk"""
+        from services.analytics_service import AnalyticsService
+        from services.smart_list_service import SmartListService
+        from services.task_event_service import TaskEventService
+        from services.task_hierarchy_service import TaskHierarchyService
+        from services.task_service import invalidate_task_queries
+
+        job.status = ImportStatusEnum.running
+        job.started_at = datetime.utcnow()
+        self.session.add(job)
+        self.session.commit()
+
+        started = time.perf_counter()
+        errors = []
+        list_ids = get_list_ids(self.session, job.user_id)
+        try:
+            for chunk in _chunked(parse_rows(source, job.format), settings.IMPORT_CHUNK_SIZE):
+                valid = []
+                for line_number, row in chunk:
+                    try:
+                        if isinstance(row, str):
+                            raise ValueError(row)
+                        data = TaskCreate.model_validate(row)
+                        if data.list_id is not None and data.list_id not in list_ids:
+                            raise ValueError("Task list not found")
+                        valid.append((line_number, data))
+                    except ValidationError as e:
+                        errors.append({"line": line_number, "error": _format_validation_error(e)})
+                        job.rows_failed += 1
+                    except ValueError as e:
+                        errors.append({"line": line_number, "error": str(e)})
+                        job.rows_failed += 1
+
+                # Parents must be live tasks of the user: one query per chunk
+                parents = TaskHierarchyService(self.session).live_task_ids(
+                    job.user_id, (data.parent_id for _, data in valid if data.parent_id is not None)
+                )
+                for line_number, data in valid:
+                    if data.parent_id is not None and data.parent_id not in parents:
+                        errors.append({"line": line_number, "error": "Parent task not found"})
+                        job.rows_failed += 1
+                valid = [data for _, data in valid if data.parent_id is None or data.parent_id in parents]
+
+                tasks = self._load(valid, job.user_id)
+                AnalyticsService(self.session).record_created_many(
+                    (task, data.tag_names or []) for task, data in zip(tasks, valid)
+                )
+                # Published when the chunk commits, like a create through the API
+                events = TaskEventService(self.session)
+                for task, data in zip(tasks, valid):
+                    events.stage([task.id], job.user_id, TaskEventKindEnum.created,
+                                 data.model_dump(mode="json", exclude_none=True))
+
+                job.rows_read += len(chunk)
+                job.rows_imported += len(tasks)
+                job.errors = errors[:settings.IMPORT_MAX_ERRORS]
+                job.rows_per_second = round(job.rows_read / max(time.perf_counter() - started, 1e-6), 1)
+                self.session.add(job)
+                self.session.commit()
+                invalidate_task_queries(job.user_id, list_ids)
+                if on_progress:
+                    on_progress(job)
+
+            # Rebuilding each list once is cheaper than syncing every row
+            SmartListService(self.session).rebuild_user_lists(job.user_id)
+            job.status = ImportStatusEnum.completed
+        except Exception as e:
+            self.session.rollback()
+            job.status = ImportStatusEnum.failed
+            job.message = str(e)[:500]
+
+        job.finished_at = datetime.utcnow()
+        self.session.add(job)
+        self.session.commit()
+        self.session.refresh(job)
+        metrics.increment(f"task_import.{job.status.value}")
+        metrics.increment("task_import.rows", job.rows_imported)
+        if job.rows_per_second:
+            metrics.observe("task_import.rows_per_second", job.rows_per_second)
+        return job
+
+    def _load(self, tasks: List[TaskCreate], user_id: int) -> List[SimpleNamespace]:
+        """Insert validated tasks, their tag links and subtask closure rows. Does not commit.
+
+        Returns lightweight records (id, user_id, priority, created_at, ...)
+        of the inserted tasks.
+        """
+        if not tasks:
+            return []
+        from services.tag_service import TagService
+        from services.task_hierarchy_service import TaskHierarchyService
+        from services.task_rank_service import TaskRankService
+
+        # Plain dicts: building Task instances costs more than the insert itself
+        now = datetime.utcnow()
+        # Imported tasks go below the user's tasks, in file order
+        ranks = TaskRankService(self.session).new_ranks(user_id, len(tasks), append=True)
+        rows = [
+            {**data.dict(exclude={"tag_names"}), "user_id": user_id, "rank": rank,
+             "created_at": now, "updated_at": now}
+            for data, rank in zip(tasks, ranks)
+        ]
+        columns = list(rows[0])
+
+        if self._can_copy():
+            ids = self.session.execute(
+                text("SELECT nextval(pg_get_serial_sequence('task', 'id')) FROM generate_series(1, :n)"),
+                {"n": len(rows)},
+            ).scalars().all()
+            for row, task_id in zip(rows, ids):
+                row["id"] = task_id
+            self._copy(Task.__table__.name, ["id"] + columns, rows)
+        else:
+            ids = self.session.scalars(
+                insert(Task.__table__).returning(Task.__table__.c.id, sort_by_parameter_order=True), rows
+            ).all()
+            for row, task_id in zip(rows, ids):
+                row["id"] = task_id
+
+        tag_names_by_task = {row["id"]: data.tag_names for row, data in zip(rows, tasks) if data.tag_names}
+        if tag_names_by_task:
+            tag_ids = TagService(self.session).resolve_ids(
+                name for names in tag_names_by_task.values() for name in names
+            )
+            links = [
+                {"task_id": task_id, "tag_id": tag_ids[name]}
+                for task_id, names in tag_names_by_task.items()
+                for name in dict.fromkeys(names)
+            ]
+            if self._can_copy():
+                self._copy(TaskTag.__table__.name, ["task_id", "tag_id"], links)
+            else:
+                self.session.execute(insert(TaskTag.__table__), links)
+
+        # Parents were checked by the caller
+        TaskHierarchyService(self.session).link(
+            [(row["id"], row["parent_id"]) for row in rows if row["parent_id"] is not None]
+        )
+        return [SimpleNamespace(**row) for row in rows]
+
+    def _can_copy(self) -> bool:
+        connection = self.session.connection().connection.driver_connection
+        return self.session.get_bind().dialect.name == "postgresql" and hasattr(connection.cursor(), "copy_expert")
+
+    def _copy(self, table_name: str, columns: List[str], rows: List[dict]):
+        # In CSV COPY an unquoted empty field is NULL and a quoted one is an
+        # empty string, so every non-NULL value is quoted
+        def field(value):
+            if value is None:
+                return ""
+            value = getattr(value, "value", value)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            return '"' + str(value).replace('"', '""') + '"'
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(",".join(field(row[name]) for name in columns) + "\n")
+        buffer.seek(0)
+        quoted = ", ".join(f'"{name}"' for name in columns)
+        cursor = self.session.connection().connection.driver_connection.cursor()
+        cursor.copy_expert(f'COPY "{table_name}" ({quoted}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def open_import_source(path: str, compressed: bool = False) -> TextIO:
+    """Open an uploaded or local import file as text, decompressing gzip if asked"""
+    if compressed:
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def run_import_job(job_id: int, path: str, compressed: bool = False, remove: bool = True):
+    """Run an import job in its own session, e.g. as a background task after the upload request"""
+    with Session(get_engine()) as session:
+        job = session.get(TaskImportJob, job_id)
+        try:
+            with open_import_source(path, compressed) as source:
+                TaskImportService(session).run(job, source)
+        except Exception as e:
+            # Unreadable input (e.g. not gzip) fails the job rather than the worker
+            session.rollback()
+            job.status = ImportStatusEnum.failed
+            job.message = str(e)[:500]
+            job.finished_at = datetime.utcnow()
+            session.add(job)
+            session.commit()
+        finally:
+            if remove:
+                os.remove(path)
@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlmodel import Session, select
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from models.task_list_model import TaskList, TaskListMember, TaskListCreate
+from models.user import User
+from utils.membership_cache import get_list_ids, track_changed_members
+from utils.upsert import dialect_insert
+
+
+class TaskListService:
+    """Shared task lists and their members.
+
+    Tasks with a list_id are visible to every member of that list.
+    TaskService does not join memberships on each read: it filters with
+    list_id IN (the user's list ids), taken from utils.membership_cache,
+    which membership changes made here invalidate on commit.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_lists(self, user_id: int) -> List[TaskList]:
+        """Get all lists the user is a member of"""
+        list_ids = get_list_ids(self.session, user_id)
+        if not list_ids:
+            return []
+        return self.session.exec(select(TaskList).where(TaskList.id.in_(list_ids)).order_by(TaskList.id)).all()
+
+    def get_list(self, list_id: int, user_id: int) -> Optional[TaskList]:
+        """Get a list by its ID if the user is a member"""
+        if list_id not in get_list_ids(self.session, user_id):
+            return None
+        return self.session.get(TaskList, list_id)
+
+    def create_list(self, list_data: TaskListCreate, user_id: int) -> TaskList:
+        """Create a list owned by the user, who becomes its first member"""
+        task_list = TaskList(name=list_data.name, owner_id=user_id)
+        self.session.add(task_list)
+        self.session.flush()
+        self.session.add(TaskListMember(list_id=task_list.id, user_id=user_id))
+        self.session.commit()
+        self.session.refresh(task_list)
+        return task_list
+
+    def get_members(self, list_id: int, user_id: int) -> Optional[list]:
+        """Get the members of a list the user belongs to, oldest first"""
+        if not self.get_list(list_id, user_id):
+            return None
+        rows = self.session.exec(
+            select(TaskListMember.user_id, User.email, TaskListMember.created_at)
+            .join(User, User.id == TaskListMember.user_id)
+            .where(TaskListMember.list_id == list_id)
+            .order_by(TaskListMember.created_at, TaskListMember.user_id)
+        ).all()
+        return [{"user_id": member_id, "email": email, "created_at": created_at} for member_id, email, created_at in rows]
+
+    def add_member(self, list_id: int, user_id: int, email: str) -> Optional[TaskListMember]:
+        """Add the user with this email to a list; only the owner may.
+
+        Returns None if the list is not the user's own and raises ValueError
+        for an unknown email. Adding an existing member changes nothing.
+        """
+        task_list = self.get_list(list_id, user_id)
+        if not task_list or task_list.owner_id != user_id:
+            return None
+        member_id = self.session.exec(select(User.id).where(User.email == email)).first()
+        if member_id is None:
+            raise ValueError("No user with this email")
+
+        # INSERT ... ON CONFLICT DO NOTHING, so concurrent adds of the same
+        # member both succeed
+        if self._insert_member(list_id, member_id):
+            track_changed_members(self.session, [member_id])
+        self.session.commit()
+        return self.session.get(TaskListMember, (list_id, member_id))
+
+    def _insert_member(self, list_id: int, user_id: int) -> bool:
+        """Add a membership unless it exists; returns whether it was added. Does not commit."""
+        row = {"list_id": list_id, "user_id": user_id, "created_at": datetime.utcnow()}
+        statement = dialect_insert(self.session, TaskListMember.__table__)
+        if statement is not None:
+            result = self.session.execute(
+                statement.values(**row).on_conflict_do_nothing(index_elements=["list_id", "user_id"])
+            )
+            return result.rowcount == 1
+        try:
+            with self.session.begin_nested():
+                self.session.execute(insert(TaskListMember.__table__).values(**row))
+            return True
+        except IntegrityError:
+            return False
+
+    def remove_member(self, list_id: int, user_id: int, member_id: int) -> bool:
+        """Remove a member from a list: the owner may remove anyone else, members may leave.
+
+        Tasks the member created stay in the list. Raises ValueError if the
+        owner tries to leave their own list.
+        """
+        task_list = self.get_list(list_id, user_id)
+        if not task_list or (task_list.owner_id != user_id and member_id != user_id):
+            return False
+        if member_id == task_list.owner_id:
+            raise ValueError("The owner cannot leave the list")
+
+        member = self.session.get(TaskListMember, (list_id, member_id))
+        if member is None:
+            return False
+        self.session.delete(member)
+        self.session.commit()
+        return True
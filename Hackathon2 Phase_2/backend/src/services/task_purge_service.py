@@ -0,0 +1,95 @@
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlmodel import Session, select
+from sqlalchemy import delete, or_, update
+from config import settings
+from models.task_model import Task, TaskTag
+from models.task_closure_model import TaskClosure
+from models.task_dependency_model import TaskDependency
+from models.smart_list_model import SmartListMember
+from models.scheduled_reminder_model import ScheduledReminder
+from models.recurring_task_history_model import RecurringTaskHistory
+from utils.metrics import metrics
+
+
+class TaskPurgeService:
+    """Hard-deletes soft-deleted tasks once they can no longer be restored.
+
+    DELETE /api/tasks/{id} only sets deleted_at. Tasks deleted more than
+    TASK_DELETE_RETENTION_SECONDS ago are removed here together with their
+    dependent rows, TASK_PURGE_BATCH_SIZE tasks per transaction, so no
+    request waits on the cascade and locks are held briefly.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def purge(self, batch_size: Optional[int] = None, max_batches: Optional[int] = None,
+              older_than: Optional[datetime] = None) -> int:
+        """Purge expired deleted tasks in batches; returns how many tasks were removed"""
+        batch_size = batch_size or settings.TASK_PURGE_BATCH_SIZE
+        if older_than is None:
+            older_than = datetime.utcnow() - timedelta(seconds=settings.TASK_DELETE_RETENTION_SECONDS)
+
+        removed = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            task_ids = self.session.exec(
+                select(Task.id)
+                .where(Task.deleted_at.is_not(None), Task.deleted_at < older_than)
+                .order_by(Task.deleted_at)
+                .limit(batch_size)
+            ).all()
+            if not task_ids:
+                break
+
+            started = time.perf_counter()
+            removed += self._purge_batch(task_ids)
+            self.session.commit()
+            metrics.observe("task_purge.batch", time.perf_counter() - started)
+            batches += 1
+            if len(task_ids) < batch_size:
+                break
+
+        metrics.increment("task_purge.tasks", removed)
+        return removed
+
+    def _purge_batch(self, task_ids: List[int]) -> int:
+        """Delete a batch of tasks and every row referencing them. Does not commit."""
+        self.session.execute(delete(TaskTag).where(TaskTag.task_id.in_(task_ids)))
+        self.session.execute(delete(SmartListMember).where(SmartListMember.task_id.in_(task_ids)))
+        self.session.execute(delete(ScheduledReminder).where(ScheduledReminder.task_id.in_(task_ids)))
+        self.session.execute(
+            delete(RecurringTaskHistory).where(or_(
+                RecurringTaskHistory.parent_task_id.in_(task_ids),
+                RecurringTaskHistory.instance_task_id.in_(task_ids),
+            ))
+        )
+        self.session.execute(
+            delete(TaskClosure).where(or_(
+                TaskClosure.ancestor_id.in_(task_ids),
+                TaskClosure.descendant_id.in_(task_ids),
+            ))
+        )
+        # Deleted tasks were already taken out of their dependents' open
+        # blocker counts when they were deleted
+        self.session.execute(
+            delete(TaskDependency).where(or_(
+                TaskDependency.task_id.in_(task_ids),
+                TaskDependency.blocker_id.in_(task_ids),
+            ))
+        )
+        # Subtasks outside this batch (restored on their own, or in a later
+        # batch) no longer point at the purged parent
+        self.session.execute(
+            update(Task)
+            .where(Task.parent_id.in_(task_ids), Task.id.not_in(task_ids))
+            .values(parent_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        # deleted_at is checked again in case a task was restored meanwhile
+        result = self.session.execute(
+            delete(Task).where(Task.id.in_(task_ids), Task.deleted_at.is_not(None))
+        )
+        return result.rowcount
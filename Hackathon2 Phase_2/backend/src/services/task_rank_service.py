@@ -0,0 +1,138 @@
+from typing import List, Optional
+from sqlmodel import Session, select
+from sqlalchemy import bindparam, case, func, update
+from config import settings
+from database import get_engine
+from models.task_model import Task
+from utils.fractional_index import key_between, n_keys_between
+from utils.metrics import metrics
+
+
+# Length of the task.rank column; keys are rebalanced before reaching it
+RANK_COLUMN_LENGTH = 64
+
+
+class TaskRankService:
+    """Order keys for sort=manual.
+
+    Each task's rank is a fractional index (utils.fractional_index), so
+    placing a task between two others writes only that task. New tasks go
+    above the user's first task. Keys lengthen when tasks are repeatedly
+    placed into the same gap; once one is longer than TASK_RANK_MAX_LENGTH
+    the user's ranks are rebalanced into short, evenly spaced keys.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def new_ranks(self, user_id: int, count: int, append: bool = False) -> List[str]:
+        """Ranks for count new tasks, in order, above the user's tasks (or below with append)"""
+        if count <= 0:
+            return []
+        if append:
+            last = self.session.exec(
+                select(func.max(Task.rank)).where(Task.user_id == user_id, Task.deleted_at.is_(None))
+            ).first()
+            return n_keys_between(last, None, count)
+        first = self.session.exec(
+            select(func.min(Task.rank)).where(Task.user_id == user_id, Task.deleted_at.is_(None))
+        ).first()
+        return n_keys_between(None, first, count)
+
+    def rank_between(self, task_id: int, user_id: int,
+                     after_id: Optional[int], before_id: Optional[int]) -> Optional[str]:
+        """A rank placing the task right after after_id and/or right before before_id.
+
+        Returns None if the task does not exist. Raises ValueError for a
+        missing or misordered neighbour. Ranks that leave no gap (ties from
+        concurrent creates, or keys near the column length) are rebalanced
+        in the current transaction first.
+        """
+        if after_id is None and before_id is None:
+            raise ValueError("Either before or after is required")
+        if task_id in (after_id, before_id):
+            raise ValueError("A task cannot be moved next to itself")
+
+        for attempt in range(2):
+            ids = {task_id, after_id, before_id} - {None}
+            ranks = dict(self.session.exec(
+                select(Task.id, Task.rank)
+                .where(Task.user_id == user_id, Task.deleted_at.is_(None), Task.id.in_(ids))
+            ).all())
+            if task_id not in ranks:
+                return None
+            for neighbour_id in (after_id, before_id):
+                if neighbour_id is not None and neighbour_id not in ranks:
+                    raise ValueError(f"Task {neighbour_id} not found")
+
+            lower = ranks[after_id] if after_id is not None else None
+            upper = ranks[before_id] if before_id is not None else None
+            gap = (after_id is None or lower is not None) and (before_id is None or upper is not None)
+            if gap and before_id is None:
+                upper = self._adjacent(user_id, task_id, lower, above=False)
+            elif gap and after_id is None:
+                lower = self._adjacent(user_id, task_id, upper, above=True)
+            gap = gap and (lower is None or upper is None or lower < upper)
+
+            if gap:
+                rank = key_between(lower, upper)
+                if len(rank) < RANK_COLUMN_LENGTH:
+                    return rank
+            if attempt == 0:
+                self.rebalance(user_id)
+
+        raise ValueError("after must come before before in the current order")
+
+    def needs_rebalance(self, rank: Optional[str]) -> bool:
+        return rank is not None and len(rank) > settings.TASK_RANK_MAX_LENGTH
+
+    def rebalance(self, user_id: int) -> int:
+        """Rewrite the user's ranks as short evenly spaced keys, keeping their order.
+
+        Tasks without a rank are placed first. Deleted tasks keep theirs, so
+        a restored task may tie with a neighbour until the next move there.
+        Only ranks that change are written, and versions are not bumped: the
+        order of the tasks stays the same. Does not commit; returns the
+        number of tasks rewritten.
+        """
+        rows = self.session.exec(
+            select(Task.id, Task.rank)
+            .where(Task.user_id == user_id, Task.deleted_at.is_(None))
+            .order_by(case((Task.rank.is_(None), 0), else_=1), Task.rank, Task.id)
+        ).all()
+        ranks = n_keys_between(None, None, len(rows))
+        changed = [
+            {"task_id": task_id, "new_rank": rank}
+            for (task_id, current), rank in zip(rows, ranks) if current != rank
+        ]
+        if changed:
+            self.session.execute(
+                update(Task.__table__)
+                .where(Task.__table__.c.id == bindparam("task_id"))
+                .values(rank=bindparam("new_rank")),
+                changed,
+            )
+        metrics.increment("task_rank.rebalanced")
+        metrics.increment("task_rank.rebalanced_rows", len(changed))
+        return len(changed)
+
+    def _adjacent(self, user_id: int, task_id: int, rank: str, above: bool) -> Optional[str]:
+        """The rank right above (or below) rank among the user's other tasks"""
+        if above:
+            statement = select(func.max(Task.rank)).where(Task.rank < rank)
+        else:
+            statement = select(func.min(Task.rank)).where(Task.rank > rank)
+        return self.session.exec(
+            statement.where(Task.user_id == user_id, Task.deleted_at.is_(None), Task.id != task_id)
+        ).first()
+
+
+def rebalance_user_ranks(user_id: int) -> int:
+    """Rebalance one user's ranks in its own session, e.g. as a background task after a move"""
+    from services.task_service import invalidate_task_queries
+
+    with Session(get_engine()) as session:
+        count = TaskRankService(session).rebalance(user_id)
+        session.commit()
+    invalidate_task_queries(user_id)
+    return count
@@ -1,8 +1,57 @@
 from sqlmodel import Session, select
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
+import itertools
+from fastapi.encoders import jsonable_encoder
+from config import settings
+from database import commit_without_expiring
 from models.task_model import Task, TaskCreate, TaskUpdate, RecurrencePatternEnum
+from models.task_event_model import TaskEventKindEnum
 from models.user import User
+from utils.lru_cache import LRUCache
+from utils.membership_cache import get_list_ids
+from utils.single_flight import SingleFlight
+
+
+# Identical concurrent task list queries (e.g. several open tabs refetching
+# on focus) share one database round-trip
+_task_queries = SingleFlight("task_queries")
+
+# Bumped after every committed task write so that callers arriving after a
+# write never join a query that started before it. A write also bumps the
+# writer's shared lists, which every member's queries depend on. Only the
+# most recently written users and lists are remembered; the others are
+# taken to be at the latest generation, which is at least their own.
+_write_generation = itertools.count(1)
+_latest_generation = 0
+_user_generations = LRUCache(settings.TASK_QUERY_GENERATION_CACHE_SIZE)
+_list_generations = LRUCache(settings.TASK_QUERY_GENERATION_CACHE_SIZE)
+
+
+class VersionConflictError(Exception):
+    """A conditional write found the task at a different version than expected."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Task is at version {current_version}")
+        self.current_version = current_version
+
+
+def invalidate_task_queries(user_id: int, list_ids: Iterable[int] = ()):
+    """Stop later callers from joining queries that started before a write"""
+    global _latest_generation
+    generation = next(_write_generation)
+    # Raised first, so it is never behind a remembered generation
+    _latest_generation = max(_latest_generation, generation)
+    _user_generations.set(user_id, generation)
+    _list_generations.set_many({list_id: generation for list_id in list_ids})
+
+
+def _changes(before: dict, values: dict) -> dict:
+    """The fields values actually changes, as {field: {"old": ..., "new": ...}} in JSON form"""
+    return jsonable_encoder({
+        name: {"old": before[name], "new": value}
+        for name, value in values.items() if name in before and before[name] != value
+    })
 
 
 class TaskService:
@@ -11,46 +60,120 @@ class TaskService:
 
     def create_task(self, task_data: TaskCreate, user_id: int) -> Task:
         """Create a new task for a specific user"""
-        # Process tags if provided
-        tag_names = getattr(task_data, 'tag_names', [])
-
         # Create the task with user_id
         task_dict = task_data.dict()
         # Remove tag_names from the dict as it's not a field in the Task model
         tag_names = task_dict.pop('tag_names', [])
+        parent_id = task_dict.get('parent_id')
+        if parent_id is not None and not self._hierarchy().live_task_ids(user_id, [parent_id]):
+            raise ValueError("Parent task not found")
+        if task_dict.get('list_id') is not None and task_dict['list_id'] not in get_list_ids(self.session, user_id):
+            raise ValueError("Task list not found")
 
-        task = Task(**task_dict, user_id=user_id)
-        self.session.add(task)
-        self.session.flush()  # Get the task ID before associating tags
+        # INSERT ... RETURNING gives back the ID and defaults in one round-trip
+        task = self._insert_tasks([task_dict], user_id)[0]
+        if parent_id is not None:
+            self._hierarchy().link([(task.id, parent_id)])
 
         # Associate tags with the task if provided
         if tag_names:
-            from models.task_model import Tag, TaskTag
-            for tag_name in tag_names:
-                # Get or create tag
-                tag_stmt = select(Tag).where(Tag.name == tag_name)
-                tag_result = self.session.exec(tag_stmt).first()
-
-                if not tag_result:
-                    tag_result = Tag(name=tag_name)
-                    self.session.add(tag_result)
-                    self.session.flush()
-
-                # Create the association
-                task_tag = TaskTag(task_id=task.id, tag_id=tag_result.id)
-                self.session.add(task_tag)
-
-        self.session.commit()
-        self.session.refresh(task)
+            self._tags().link_tags({task.id: tag_names})
+
+        self._sync_smart_lists(task.id, user_id)
+        self._analytics().record_created(task, tag_names or [])
+        self._events().stage([task.id], user_id, TaskEventKindEnum.created,
+                             task_data.model_dump(mode="json", exclude_none=True))
+
+        self._commit(user_id)
         return task
 
-    def get_task_by_id(self, task_id: int, user_id: int) -> Optional[Task]:
-        """Get a task by its ID for a specific user"""
-        statement = select(Task).where(Task.id == task_id, Task.user_id == user_id)
+    def get_task_by_id(self, task_id: int, user_id: int, include_deleted: bool = False) -> Optional[Task]:
+        """Get a task by its ID for a specific user; deleted tasks (not yet purged) only with include_deleted"""
+        statement = select(Task).where(Task.id == task_id, self._visible(user_id))
+        if not include_deleted:
+            statement = statement.where(Task.deleted_at.is_(None))
         task = self.session.exec(statement).first()
         return task
 
     def get_all_tasks(
+        self,
+        user_id: int,
+        search: Optional[str] = None,
+        priority: Optional[str] = None,
+        completed: Optional[bool] = None,
+        tag: Optional[str] = None,
+        due_status: Optional[str] = None,
+        sort: Optional[str] = "created_at",
+        order: Optional[str] = "desc",
+        q: Optional[str] = None,
+        list_id: Optional[int] = None
+    ) -> List[Task]:
+        """Get all tasks visible to a specific user, coalescing identical concurrent queries"""
+        params = dict(search=search, priority=priority, completed=completed, tag=tag,
+                      due_status=due_status, sort=sort, order=order, q=q, list_id=list_id)
+        if not settings.TASK_QUERY_COALESCING:
+            return self._query_tasks(user_id, **params)
+
+        key = self._task_query_key(user_id, params)
+        tasks = _task_queries.do(key, lambda: self._query_detached(user_id, params))
+        return list(tasks)
+
+    async def get_all_tasks_async(self, user_id: int, **params) -> List[Task]:
+        """Async variant of get_all_tasks for routes running on the event loop.
+
+        Building the key looks up the user's shared lists, which may query
+        the database, and the query itself is blocking: both run in the
+        threadpool. Followers of an in-flight query (sync or async) are
+        awaited without occupying a thread.
+        """
+        from fastapi.concurrency import run_in_threadpool
+        if not settings.TASK_QUERY_COALESCING:
+            return await run_in_threadpool(self._query_tasks, user_id, **params)
+
+        key = await run_in_threadpool(self._task_query_key, user_id, params)
+        tasks = await _task_queries.do_async(key, lambda: self._query_detached(user_id, params))
+        return list(tasks)
+
+    def _task_query_key(self, user_id: int, params: dict) -> tuple:
+        """Build the coalescing key from the user and normalized query parameters"""
+        from utils.task_filter import normalize_filter
+        search = params.get("search")
+        q = params.get("q")
+        priority = params.get("priority")
+        list_ids = get_list_ids(self.session, user_id)
+        user_generation = _user_generations.get(user_id)
+        list_generations = _list_generations.get_many(list_ids)
+        known = [user_generation or 0, *list_generations.values()]
+        if user_generation is None or len(list_generations) < len(list_ids):
+            # Read after the misses, so it is no older than a forgotten entry
+            known.append(_latest_generation)
+        generation = max(known)
+        return (
+            user_id,
+            list_ids,
+            generation,
+            search.strip() if search and search.strip() else None,
+            getattr(priority, "value", priority),
+            params.get("completed"),
+            params.get("tag"),
+            params.get("due_status"),
+            params.get("sort") or "created_at",
+            params.get("order") or "desc",
+            normalize_filter(q) if q and q.strip() else None,
+            params.get("list_id"),
+        )
+
+    def _query_detached(self, user_id: int, params: dict) -> List[Task]:
+        """Run the task query and detach the rows so other requests can share them"""
+        tasks = self._query_tasks(user_id, **params)
+        for task in tasks:
+            self.session.expunge(task)
+        return tasks
+
+    def _invalidate_task_queries(self, user_id: int):
+        invalidate_task_queries(user_id, get_list_ids(self.session, user_id))
+
+    def _query_tasks(
         self, 
         user_id: int,
         search: Optional[str] = None, 
@@ -59,10 +182,21 @@ class TaskService:
         tag: Optional[str] = None,
         due_status: Optional[str] = None,  # overdue, due_today, upcoming
         sort: Optional[str] = "created_at",
-        order: Optional[str] = "desc"
+        order: Optional[str] = "desc",
+        q: Optional[str] = None,  # filter expression, see utils.task_filter
+        limit: Optional[int] = None,
+        list_id: Optional[int] = None  # only the tasks of this shared list
     ) -> List[Task]:
-        """Get all tasks for a specific user with optional filtering, searching, and sorting"""
-        statement = select(Task).where(Task.user_id == user_id)
+        """Get all tasks visible to a specific user with optional filtering, searching, and sorting"""
+        statement = select(Task).where(self._visible(user_id), Task.deleted_at.is_(None))
+        if list_id is not None:
+            statement = statement.where(Task.list_id == list_id)
+
+        # Compile the filter expression before the query runs so that
+        # invalid expressions surface as errors instead of empty results
+        if q and q.strip():
+            from utils.task_filter import compile_task_filter
+            statement = statement.where(compile_task_filter(q))
         
         # Apply filters
         if search and search.strip():  # Check if search is not None and not just whitespace
@@ -122,6 +256,12 @@ class TaskService:
                 statement = statement.order_by(desc(Task.due_date))
             else:
                 statement = statement.order_by(Task.due_date)
+        elif sort == "manual":
+            # The user's own order, top to bottom; order does not apply
+            statement = statement.order_by(Task.rank, Task.id)
+
+        if limit:
+            statement = statement.limit(limit)
 
         # Execute query
         try:
@@ -132,74 +272,239 @@ class TaskService:
             return []
         return tasks
 
-    def update_task(self, task_id: int, user_id: int, task_data: TaskUpdate) -> Optional[Task]:
-        """Update a task for a specific user"""
-        task = self.session.exec(
-            select(Task).where(Task.id == task_id, Task.user_id == user_id)
-        ).first()
+    def update_task(self, task_id: int, user_id: int, task_data: TaskUpdate,
+                    expected_versions: Optional[List[int]] = None) -> Optional[Task]:
+        """Update a task for a specific user.
 
-        if not task:
-            return None
+        With expected_versions (from If-Match) the write only applies if the
+        task is at one of those versions; otherwise VersionConflictError is
+        raised. Every write bumps the version.
+        """
+        from sqlalchemy import update
 
         # Update fields that are provided
         update_data = task_data.dict(exclude_unset=True)
         tag_names = update_data.pop('tag_names', None)
+        conditions = self._write_conditions(task_id, user_id, expected_versions)
+        if 'completed' in update_data:
+            self._dependencies().lock_owners([task_id])
+        before = self._read_before([task_id], user_id, update_data)
+        flipped = self._completion_flips(before, update_data)
+        tags_before = self._tags().get_tag_names([task_id]) if tag_names is not None else {}
+
+        # The ownership check, version check and write are one UPDATE ... RETURNING
+        if update_data:
+            statement = (
+                update(Task)
+                .where(*conditions)
+                .values(**update_data, version=Task.version + 1)
+                .returning(Task)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            statement = select(Task).where(*conditions)
+        task = self.session.scalars(statement, execution_options={"populate_existing": True}).first()
 
-        for field, value in update_data.items():
-            setattr(task, field, value)
+        if not task:
+            return self._missing_or_conflict(task_id, user_id)
 
         # Handle tag updates if provided
+        changed = []
         if tag_names is not None:
-            from models.task_model import Tag, TaskTag
-            # Remove existing tags
-            from sqlalchemy import delete
-            stmt_delete = delete(TaskTag).where(TaskTag.task_id == task_id)
-            self.session.execute(stmt_delete)
-
-            # Add new tags
-            for tag_name in tag_names:
-                # Get or create tag
-                tag_stmt = select(Tag).where(Tag.name == tag_name)
-                tag_result = self.session.exec(tag_stmt).first()
-
-                if not tag_result:
-                    tag_result = Tag(name=tag_name)
-                    self.session.add(tag_result)
-                    self.session.flush()
-
-                # Create the association
-                task_tag = TaskTag(task_id=task.id, tag_id=tag_result.id)
-                self.session.add(task_tag)
-
-        self.session.add(task)
-        self.session.commit()
-        self.session.refresh(task)
+            # Only the difference from the current tags is written
+            changed = self._tags().replace_tags({task.id: tag_names})
+            if changed and not update_data:
+                # A tag-only change is still a write: bump the version
+                # only if nobody else wrote the task since it was read
+                seen_version = task.version
+                # Expired, the instance is repopulated from the RETURNING row
+                self.session.expire(task)
+                task = self.session.scalars(
+                    update(Task)
+                    .where(Task.id == task_id, Task.version == seen_version)
+                    .values(version=Task.version + 1)
+                    .returning(Task)
+                    .execution_options(synchronize_session=False)
+                ).first()
+                if not task:
+                    return self._missing_or_conflict(task_id, user_id)
+
+        self._shift_open_blockers(flipped, update_data.get('completed'))
+        self._sync_smart_lists(task.id, task.user_id)
+        if flipped:
+            self._analytics().record_toggled(task)
+        changes = _changes(before.get(task.id, {}), update_data)
+        if changed:
+            changes.update(_changes({"tag_names": tags_before[task.id]}, {"tag_names": sorted(set(tag_names))}))
+        if changes:
+            self._events().stage([task.id], user_id, TaskEventKindEnum.updated, changes)
+
+        self._commit(user_id)
         return task
 
+    def _write_conditions(self, task_id: int, user_id: int, expected_versions: Optional[List[int]],
+                          shared: bool = True) -> list:
+        """Conditions of a single-task write: the task is live and visible to the user (owned, unless shared)"""
+        access = self._visible(user_id) if shared else Task.user_id == user_id
+        conditions = [Task.id == task_id, access, Task.deleted_at.is_(None)]
+        if expected_versions is not None:
+            conditions.append(Task.version.in_(expected_versions))
+        return conditions
+
+    def _missing_or_conflict(self, task_id: int, user_id: int, shared: bool = True) -> None:
+        """After a conditional write matched nothing, tell a missing task from a version conflict"""
+        self.session.rollback()
+        access = self._visible(user_id) if shared else Task.user_id == user_id
+        current_version = self.session.exec(
+            select(Task.version).where(Task.id == task_id, access, Task.deleted_at.is_(None))
+        ).first()
+        if current_version is not None:
+            raise VersionConflictError(current_version)
+        return None
+
     def delete_task(self, task_id: int, user_id: int) -> bool:
-        """Delete a task for a specific user"""
-        task = self.session.exec(
-            select(Task).where(Task.id == task_id, Task.user_id == user_id)
+        """Delete a task for a specific user.
+
+        The task is only marked deleted; it can be restored until
+        TaskPurgeService removes it and its dependent rows.
+        """
+        deleted = self._delete_tasks([task_id], user_id)
+        if not deleted:
+            self.session.rollback()
+            return False
+
+        self._commit(user_id)
+        return True
+
+    def restore_task(self, task_id: int, user_id: int) -> Optional[Task]:
+        """Undo the deletion of a task within TASK_DELETE_RETENTION_SECONDS.
+
+        Subtasks deleted together with it are restored too. Raises
+        ValueError for a subtask whose parent is still deleted: it would
+        come back under a task that is not there.
+        """
+        from datetime import timedelta
+        from sqlalchemy import or_, update
+        from sqlalchemy.orm import aliased
+        from models.task_closure_model import TaskClosure
+
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.TASK_DELETE_RETENTION_SECONDS)
+        deleted_at = (
+            select(Task.deleted_at)
+            .where(Task.id == task_id, self._visible(user_id), Task.deleted_at >= cutoff)
+            .scalar_subquery()
+        )
+        parent = aliased(Task)
+        parent_deleted = self.session.exec(
+            select(parent.id)
+            .join(Task, Task.parent_id == parent.id)
+            .where(Task.id == task_id, self._visible(user_id), parent.deleted_at.is_not(None))
+        ).first()
+        if parent_deleted is not None:
+            raise ValueError("Restore the parent task first")
+
+        subtasks = select(TaskClosure.descendant_id).where(TaskClosure.ancestor_id == task_id)
+        self._dependencies().lock_owners([task_id])
+        restored = self.session.scalars(
+            update(Task)
+            .where(self._visible(user_id), Task.deleted_at == deleted_at,
+                   or_(Task.id == task_id, Task.id.in_(subtasks)))
+            .values(deleted_at=None, version=Task.version + 1)
+            .returning(Task)
+            .execution_options(synchronize_session=False),
+            execution_options={"populate_existing": True}
+        ).all()
+        task = next((restored_task for restored_task in restored if restored_task.id == task_id), None)
+        if not task:
+            self.session.rollback()
+            return None
+
+        self._dependencies().shift_open_blockers(
+            opened=[restored_task.id for restored_task in restored if not restored_task.completed]
+        )
+        self._events().stage([restored_task.id for restored_task in restored], user_id, TaskEventKindEnum.restored)
+        from services.smart_list_service import SmartListService
+        SmartListService(self.session).sync_tasks([restored_task.id for restored_task in restored], task.user_id)
+        self._commit(user_id)
+        return task
+
+    def reparent_task(self, task_id: int, user_id: int, parent_id: Optional[int],
+                      expected_versions: Optional[List[int]] = None) -> Optional[Task]:
+        """Make a task, with its whole subtree, a subtask of parent_id (None: top level).
+
+        Raises ValueError for a missing parent or one inside the subtree.
+        expected_versions works as in update_task.
+        """
+        from sqlalchemy import update
+
+        if parent_id is not None and not self._hierarchy().live_task_ids(user_id, [parent_id]):
+            raise ValueError("Parent task not found")
+
+        task = self.session.scalars(
+            update(Task)
+            .where(*self._write_conditions(task_id, user_id, expected_versions, shared=False))
+            .values(parent_id=parent_id, version=Task.version + 1)
+            .returning(Task)
+            .execution_options(synchronize_session=False),
+            execution_options={"populate_existing": True}
         ).first()
-        
         if not task:
+            return self._missing_or_conflict(task_id, user_id, shared=False)
+
+        try:
+            self._hierarchy().move_subtree(task_id, parent_id)
+        except ValueError:
+            self.session.rollback()
+            raise
+
+        self._events().stage([task_id], user_id, TaskEventKindEnum.updated, {"parent_id": parent_id})
+        self._commit(user_id)
+        return task
+
+    def add_blocker(self, task_id: int, blocker_id: int, user_id: int) -> bool:
+        """Make task_id wait for blocker_id; False if either task is missing, ValueError on a cycle"""
+        try:
+            added = self._dependencies().add_blocker(task_id, blocker_id, user_id)
+        except ValueError:
+            self.session.rollback()
+            raise
+        if not added:
+            self.session.rollback()
             return False
+        self._commit(user_id)
+        return True
 
-        self.session.delete(task)
-        self.session.commit()
+    def remove_blocker(self, task_id: int, blocker_id: int, user_id: int) -> bool:
+        """Drop a blocked-by link; False if there was none"""
+        if not self._dependencies().remove_blocker(task_id, blocker_id, user_id):
+            self.session.rollback()
+            return False
+        self._commit(user_id)
         return True
 
-    def toggle_task_completion(self, task_id: int, user_id: int) -> Optional[Task]:
-        """Toggle the completion status of a task for a specific user"""
+    def toggle_task_completion(self, task_id: int, user_id: int,
+                               expected_versions: Optional[List[int]] = None) -> Optional[Task]:
+        """Toggle the completion status of a task for a specific user.
+
+        expected_versions works as in update_task.
+        """
+        from sqlalchemy import update, not_
         try:
-            task = self.session.exec(
-                select(Task).where(Task.id == task_id, Task.user_id == user_id)
+            self._dependencies().lock_owners([task_id])
+            # Flipping in SQL keeps concurrent toggles from losing updates
+            task = self.session.scalars(
+                update(Task)
+                .where(*self._write_conditions(task_id, user_id, expected_versions))
+                .values(completed=not_(Task.completed), version=Task.version + 1)
+                .returning(Task)
+                .execution_options(synchronize_session=False),
+                execution_options={"populate_existing": True}
             ).first()
 
             if not task:
-                return None
+                return self._missing_or_conflict(task_id, user_id)
 
-            task.completed = not task.completed
+            self._shift_open_blockers([task.id], task.completed)
 
             # If this is a recurring task, create the next occurrence
             if task.recurrence_pattern != RecurrencePatternEnum.none:
@@ -210,15 +515,404 @@ class TaskService:
                     print(f"Warning: Failed to create next occurrence for recurring task {task.id}: {str(recurring_error)}")
                     # Continue with the toggle even if recurring task creation fails
 
-            self.session.add(task)
-            self.session.commit()
-            self.session.refresh(task)
+            self._sync_smart_lists(task.id, task.user_id)
+            self._analytics().record_toggled(task)
+            self._events().stage([task.id], user_id, TaskEventKindEnum.toggled, {"completed": task.completed})
+
+            self._commit(user_id)
             return task
         except Exception as e:
             # Rollback the transaction in case of error
             self.session.rollback()
             raise e
 
+    def move_task(self, task_id: int, user_id: int, after_id: Optional[int] = None,
+                  before_id: Optional[int] = None, expected_versions: Optional[List[int]] = None) -> Optional[Task]:
+        """Place a task right after after_id and/or right before before_id in the manual order.
+
+        Only the moved task is written: it gets a rank between its new
+        neighbours. expected_versions works as in update_task.
+        """
+        from sqlalchemy import update
+
+        rank = self._ranks().rank_between(task_id, user_id, after_id, before_id)
+        if rank is None:
+            return None
+
+        task = self.session.scalars(
+            update(Task)
+            .where(*self._write_conditions(task_id, user_id, expected_versions, shared=False))
+            .values(rank=rank, version=Task.version + 1)
+            .returning(Task)
+            .execution_options(synchronize_session=False),
+            execution_options={"populate_existing": True}
+        ).first()
+        if not task:
+            return self._missing_or_conflict(task_id, user_id, shared=False)
+
+        self._commit(user_id)
+        return task
+
+    def apply_bulk(self, operations: list, user_id: int, atomic: bool = False) -> dict:
+        """Apply a batch of create/update/delete/toggle operations in one transaction.
+
+        Operations are validated and ownership-checked up front with a single
+        query. Creates become one INSERT ... RETURNING, updates with the same
+        payload share one UPDATE keyed by (user_id, id IN ...), and deletes
+        and toggles are one statement each. In atomic mode nothing is written
+        if any operation fails validation.
+        """
+        from pydantic import ValidationError
+        from schemas.bulk import BulkOpEnum
+
+        results = [None] * len(operations)
+        creates, updates, deletes, toggles = [], [], [], []
+        seen_ids = set()
+
+        def fail(index, status, message, task_id=None):
+            results[index] = {"index": index, "op": operations[index].op, "status": status,
+                              "id": task_id, "error": message}
+
+        for index, operation in enumerate(operations):
+            if operation.op == BulkOpEnum.create:
+                try:
+                    creates.append((index, TaskCreate.model_validate(operation.data or {})))
+                except ValidationError as e:
+                    fail(index, 422, str(e))
+                continue
+
+            if operation.id is None:
+                fail(index, 400, "id is required")
+                continue
+            if operation.id in seen_ids:
+                fail(index, 409, "Task appears more than once in this batch", operation.id)
+                continue
+            seen_ids.add(operation.id)
+
+            if operation.op == BulkOpEnum.update:
+                try:
+                    updates.append((index, operation.id, TaskUpdate.model_validate(operation.data or {})))
+                except ValidationError as e:
+                    fail(index, 422, str(e), operation.id)
+            elif operation.op == BulkOpEnum.delete:
+                deletes.append((index, operation.id))
+            else:
+                toggles.append((index, operation.id))
+
+        # One access check for every referenced task, one ownership check
+        # for parents (subtasks stay within the user's own tasks)
+        visible, owned = set(), set()
+        if seen_ids:
+            visible = set(self.session.exec(
+                select(Task.id).where(self._visible(user_id), Task.deleted_at.is_(None), Task.id.in_(seen_ids))
+            ).all())
+        parent_ids = {data.parent_id for _, data in creates if data.parent_id is not None}
+        if parent_ids:
+            owned = self._hierarchy().live_task_ids(user_id, parent_ids)
+        list_ids = get_list_ids(self.session, user_id)
+        for entry in list(creates):
+            index, data = entry
+            if data.parent_id is not None and data.parent_id not in owned:
+                fail(index, 404, "Parent task not found")
+                creates.remove(entry)
+            elif data.list_id is not None and data.list_id not in list_ids:
+                fail(index, 404, "Task list not found")
+                creates.remove(entry)
+        for pending in (updates, deletes, toggles):
+            for entry in list(pending):
+                index, task_id = entry[0], entry[1]
+                if task_id not in visible:
+                    fail(index, 404, "Task not found", task_id)
+                    pending.remove(entry)
+
+        if atomic and any(result is not None for result in results):
+            for index, result in enumerate(results):
+                if result is None:
+                    fail(index, 424, "Not applied because another operation in the batch failed",
+                         operations[index].id)
+            return {"committed": False, "results": results}
+
+        try:
+            created = self._bulk_create(creates, user_id)
+            updated_ids, flipped_ids, update_changes = self._bulk_update(updates, user_id)
+            toggled_ids = self._bulk_toggle([task_id for _, task_id in toggles], user_id)
+            deleted_ids = [task_id for _, task_id in deletes]
+            if deleted_ids:
+                self._delete_tasks(deleted_ids, user_id)
+
+            written_ids = [task.id for _, task in created] + updated_ids + toggled_ids
+            tasks_by_id = {}
+            if written_ids:
+                tasks_by_id = {
+                    task.id: task for task in self.session.exec(
+                        select(Task).where(Task.id.in_(written_ids)).execution_options(populate_existing=True)
+                    ).all()
+                }
+                # Smart lists are personal: each task is matched against its owner's
+                by_owner = {}
+                for task in tasks_by_id.values():
+                    by_owner.setdefault(task.user_id, []).append(task.id)
+                from services.smart_list_service import SmartListService
+                for owner_id, owner_task_ids in by_owner.items():
+                    SmartListService(self.session).sync_tasks(owner_task_ids, owner_id)
+
+            analytics = self._analytics()
+            analytics.record_created_many([(task, data.tag_names or []) for (_, data), (_, task) in zip(creates, created)])
+            toggled_tasks = [tasks_by_id[task_id] for task_id in toggled_ids]
+            analytics.record_toggled_many(toggled_tasks + [tasks_by_id[task_id] for task_id in flipped_ids])
+
+            events = self._events()
+            for (_, data), (_, task) in zip(creates, created):
+                events.stage([task.id], user_id, TaskEventKindEnum.created,
+                             data.model_dump(mode="json", exclude_none=True))
+            for task_id, changes in update_changes.items():
+                events.stage([task_id], user_id, TaskEventKindEnum.updated, changes)
+            for task in toggled_tasks:
+                events.stage([task.id], user_id, TaskEventKindEnum.toggled, {"completed": task.completed})
+
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        self._invalidate_task_queries(user_id)
+
+        # Commit expired the loaded rows; reload them all with one query
+        if written_ids:
+            tasks_by_id = {
+                task.id: task for task in self.session.exec(
+                    select(Task).where(Task.id.in_(written_ids))
+                ).all()
+            }
+
+        for index, task in created:
+            results[index] = {"index": index, "op": operations[index].op, "status": 201,
+                              "id": task.id, "task": tasks_by_id[task.id]}
+        for index, task_id, _ in updates:
+            results[index] = {"index": index, "op": operations[index].op, "status": 200,
+                              "id": task_id, "task": tasks_by_id[task_id]}
+        for index, task_id in toggles:
+            results[index] = {"index": index, "op": operations[index].op, "status": 200,
+                              "id": task_id, "task": tasks_by_id[task_id]}
+        for index, task_id in deletes:
+            results[index] = {"index": index, "op": operations[index].op, "status": 204, "id": task_id}
+
+        for task in toggled_tasks:
+            if task.completed and task.recurrence_pattern != RecurrencePatternEnum.none:
+                try:
+                    self._create_next_occurrence(task)
+                except Exception as recurring_error:
+                    print(f"Warning: Failed to create next occurrence for recurring task {task.id}: {str(recurring_error)}")
+
+        return {"committed": True, "results": results}
+
+    def _bulk_create(self, creates: list, user_id: int) -> list:
+        """Insert all new tasks with one INSERT ... RETURNING; returns [(index, task)]"""
+        if not creates:
+            return []
+        tasks = self._insert_tasks([data.dict(exclude={"tag_names"}) for _, data in creates], user_id)
+        self._tags().link_tags({
+            task.id: data.tag_names for (_, data), task in zip(creates, tasks) if data.tag_names
+        })
+        self._hierarchy().link([
+            (task.id, data.parent_id) for (_, data), task in zip(creates, tasks) if data.parent_id is not None
+        ])
+        return [(index, task) for (index, _), task in zip(creates, tasks)]
+
+    def _bulk_update(self, updates: list, user_id: int) -> Tuple[List[int], List[int], Dict[int, dict]]:
+        """Apply updates with one UPDATE per distinct payload.
+
+        Returns the updated ids, those whose completion the update changed
+        and the changes of each task that changed (see _changes).
+        """
+        if not updates:
+            return [], [], {}
+        from sqlalchemy import update
+
+        groups = {}
+        tag_changes = {}
+        for _, task_id, data in updates:
+            values = data.dict(exclude_unset=True)
+            tag_names = values.pop("tag_names", None)
+            if tag_names is not None:
+                tag_changes[task_id] = tag_names
+            if values:
+                groups.setdefault(tuple(sorted(values.items())), []).append(task_id)
+
+        flipped_ids = []
+        changes_by_task: Dict[int, dict] = {}
+        self._dependencies().lock_owners(
+            task_id for values, task_ids in groups.items() if "completed" in dict(values) for task_id in task_ids
+        )
+        for values, task_ids in groups.items():
+            values_dict = dict(values)
+            before = self._read_before(task_ids, user_id, values_dict)
+            flipped = self._completion_flips(before, values_dict)
+            flipped_ids += flipped
+            for task_id, old in before.items():
+                changes = _changes(old, values_dict)
+                if changes:
+                    changes_by_task.setdefault(task_id, {}).update(changes)
+            self.session.execute(
+                update(Task)
+                .where(self._visible(user_id), Task.id.in_(task_ids))
+                .values({**values_dict, "version": Task.version + 1})
+                .execution_options(synchronize_session=False)
+            )
+            self._shift_open_blockers(flipped, values_dict.get("completed"))
+
+        tags_before = self._tags().get_tag_names(list(tag_changes))
+        changed = self._tags().replace_tags(tag_changes)
+        for task_id in changed:
+            changes_by_task.setdefault(task_id, {}).update(
+                _changes({"tag_names": tags_before[task_id]}, {"tag_names": sorted(set(tag_changes[task_id]))})
+            )
+        bumped = {task_id for task_ids in groups.values() for task_id in task_ids}
+        tag_only = [task_id for task_id in changed if task_id not in bumped]
+        if tag_only:
+            self.session.execute(
+                update(Task)
+                .where(self._visible(user_id), Task.id.in_(tag_only))
+                .values(version=Task.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+        return [task_id for _, task_id, _ in updates], flipped_ids, changes_by_task
+
+    def _bulk_toggle(self, task_ids: List[int], user_id: int) -> List[int]:
+        """Flip completion of all given tasks in one set-based UPDATE"""
+        if not task_ids:
+            return []
+        from sqlalchemy import update, not_
+        self._dependencies().lock_owners(task_ids)
+        toggled = self.session.execute(
+            update(Task)
+            .where(self._visible(user_id), Task.id.in_(task_ids))
+            .values(completed=not_(Task.completed), version=Task.version + 1)
+            .returning(Task.id, Task.completed)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self._dependencies().shift_open_blockers(
+            opened=[task_id for task_id, completed in toggled if not completed],
+            closed=[task_id for task_id, completed in toggled if completed],
+        )
+        return task_ids
+
+    def _delete_tasks(self, task_ids: List[int], user_id: int) -> List[int]:
+        """Soft-delete owned tasks and their subtasks with one UPDATE; returns the ids that were deleted.
+
+        Tag, smart list and reminder rows are left for TaskPurgeService:
+        every read path skips tasks with deleted_at set. A subtree is
+        deleted with one timestamp, so restoring its root restores it all.
+        """
+        from sqlalchemy import or_, update
+        from models.task_closure_model import TaskClosure
+        subtasks = select(TaskClosure.descendant_id).where(TaskClosure.ancestor_id.in_(task_ids))
+        # Subtasks have the same owner as their root
+        self._dependencies().lock_owners(task_ids)
+        deleted = self.session.execute(
+            update(Task)
+            .where(self._visible(user_id), Task.deleted_at.is_(None),
+                   or_(Task.id.in_(task_ids), Task.id.in_(subtasks)))
+            .values(deleted_at=datetime.utcnow(), version=Task.version + 1)
+            .returning(Task.id, Task.completed)
+            .execution_options(synchronize_session=False)
+        ).all()
+        # Deleted tasks no longer block anything
+        self._dependencies().shift_open_blockers(closed=[task_id for task_id, completed in deleted if not completed])
+        deleted_ids = [task_id for task_id, _ in deleted]
+        self._events().stage(deleted_ids, user_id, TaskEventKindEnum.deleted)
+        return deleted_ids
+
+    def _insert_tasks(self, task_dicts: List[dict], user_id: int) -> List[Task]:
+        """Insert tasks with one INSERT ... RETURNING, in input order"""
+        from sqlalchemy import insert
+        columns = [column.name for column in Task.__table__.columns if column.name != "id"]
+        rows = []
+        ranks = self._ranks().new_ranks(user_id, len(task_dicts))
+        for task_dict, rank in zip(task_dicts, ranks):
+            # Build through the model so field defaults (created_at, ...) apply
+            task = Task(**task_dict, user_id=user_id, rank=rank)
+            rows.append({name: getattr(task, name) for name in columns})
+        return self.session.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True), rows
+        ).all()
+
+    def _commit(self, user_id: int):
+        """Commit without expiring loaded objects, so returning them needs no refresh SELECT"""
+        commit_without_expiring(self.session)
+        self._invalidate_task_queries(user_id)
+
+    def _visible(self, user_id: int):
+        """Tasks the user may read and write: their personal tasks and those of their shared lists.
+
+        List ids come from the membership cache, so this adds no join or
+        query. For users in no list it stays a filter on user_id alone,
+        served by the same (user_id, ...) indexes as before.
+        """
+        from sqlalchemy import and_, or_
+        personal = and_(Task.user_id == user_id, Task.list_id.is_(None))
+        list_ids = get_list_ids(self.session, user_id)
+        if not list_ids:
+            return personal
+        return or_(personal, Task.list_id.in_(list_ids))
+
+    def _read_before(self, task_ids: List[int], user_id: int, values: dict) -> Dict[int, dict]:
+        """The current values of the fields an update will set, by task id.
+
+        Read before the update, with the rows locked, since afterwards the
+        old state is gone. Tasks the user cannot write are left out.
+        """
+        if not values:
+            return {}
+        names = list(values)
+        rows = self.session.exec(
+            select(Task.id, *(getattr(Task, name) for name in names))
+            .where(self._visible(user_id), Task.id.in_(task_ids), Task.deleted_at.is_(None))
+            .with_for_update()
+        ).all()
+        return {row[0]: dict(zip(names, row[1:])) for row in rows}
+
+    def _completion_flips(self, before: Dict[int, dict], values: dict) -> List[int]:
+        """Those of the tasks read by _read_before whose completion setting values changes"""
+        if "completed" not in values:
+            return []
+        return [task_id for task_id, old in before.items() if old["completed"] != values["completed"]]
+
+    def _shift_open_blockers(self, task_ids: List[int], completed: bool):
+        """Update the tasks blocked by task_ids, which were just completed (or reopened)"""
+        if completed:
+            self._dependencies().shift_open_blockers(closed=task_ids)
+        else:
+            self._dependencies().shift_open_blockers(opened=task_ids)
+
+    def _events(self):
+        from services.task_event_service import TaskEventService
+        return TaskEventService(self.session)
+
+    def _dependencies(self):
+        from services.task_dependency_service import TaskDependencyService
+        return TaskDependencyService(self.session)
+
+    def _hierarchy(self):
+        from services.task_hierarchy_service import TaskHierarchyService
+        return TaskHierarchyService(self.session)
+
+    def _ranks(self):
+        from services.task_rank_service import TaskRankService
+        return TaskRankService(self.session)
+
+    def _tags(self):
+        from services.tag_service import TagService
+        return TagService(self.session)
+
+    def _sync_smart_lists(self, task_id: int, user_id: int):
+        """Update the materialized smart list membership for a written task"""
+        from services.smart_list_service import SmartListService
+        SmartListService(self.session).sync_task(task_id, user_id)
+
+    def _analytics(self):
+        from services.analytics_service import AnalyticsService
+        return AnalyticsService(self.session)
+
     def _create_next_occurrence(self, task: Task):
         """Create the next occurrence of a recurring task"""
         from workers.recurring_task_worker import create_recurring_task_instance
@@ -226,13 +920,58 @@ class TaskService:
         # Schedule the creation of the next occurrence in the background
         create_recurring_task_instance.delay(task.id)
 
+    def get_task_page(self, user_id: int, limit: int) -> List[Task]:
+        """Get the first page of a user's tasks in this session, newest first"""
+        return self._query_tasks(user_id, limit=limit)
+
+    def get_task_counts(self, user_id: int) -> dict:
+        """Count a user's tasks by status in a single aggregate query"""
+        from sqlalchemy import and_, case, func
+        now = datetime.utcnow()
+        today_start = datetime.combine(now.date(), datetime.min.time())
+        today_end = datetime.combine(now.date(), datetime.max.time())
+        open_task = Task.completed == False
+
+        def count_where(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        total, completed, overdue, due_today = self.session.exec(
+            select(
+                func.count(Task.id),
+                count_where(Task.completed == True),
+                count_where(and_(open_task, Task.due_date < now)),
+                count_where(and_(open_task, Task.due_date >= today_start, Task.due_date <= today_end)),
+            ).where(self._visible(user_id), Task.deleted_at.is_(None))
+        ).one()
+        return {
+            "total": total,
+            "completed": completed,
+            "open": total - completed,
+            "overdue": overdue,
+            "due_today": due_today,
+        }
+
+    def get_upcoming_reminders(self, user_id: int, limit: int):
+        """Get a user's untriggered reminders, soonest first"""
+        from models.scheduled_reminder_model import ScheduledReminder
+        return self.session.exec(
+            select(ScheduledReminder)
+            .join(Task, Task.id == ScheduledReminder.task_id)
+            .where(Task.user_id == user_id, Task.deleted_at.is_(None), ScheduledReminder.triggered == False)
+            .order_by(ScheduledReminder.scheduled_time)
+            .limit(limit)
+        ).all()
+
     def get_pending_reminders(self):
         """Get all pending reminders that should have been triggered"""
         from models.scheduled_reminder_model import ScheduledReminder
         pending_reminders = self.session.exec(
-            select(ScheduledReminder).where(
+            select(ScheduledReminder)
+            .join(Task, Task.id == ScheduledReminder.task_id)
+            .where(
                 ScheduledReminder.scheduled_time < datetime.utcnow(),
-                ScheduledReminder.triggered == False
+                ScheduledReminder.triggered == False,
+                Task.deleted_at.is_(None)
             )
         ).all()
         return pending_reminders
\ No newline at end of file
@@ -0,0 +1,72 @@
+import hashlib
+import time
+from typing import Optional
+from sqlmodel import Session
+from sqlalchemy import event
+from config import settings
+from models.user import User
+from utils.lru_cache import LRUCache
+
+
+# Access token digest -> user id, kept until the token's exp. A token is
+# only verified (signature and claims) the first time it is seen.
+principal_cache = LRUCache(settings.AUTH_PRINCIPAL_CACHE_SIZE, name="auth_principals")
+
+# User id -> column values. Entries expire so that a user deleted or
+# changed by another process stops authenticating within
+# AUTH_USER_CACHE_TTL_SECONDS; changes in this process invalidate on commit.
+user_cache = LRUCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS, name="auth_users")
+
+_CHANGED_KEY = "changed_user_ids"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _track_changed_user(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop(_CHANGED_KEY, ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def invalidate_user(user_id: int):
+    """Forget a cached user, e.g. after it is changed or deleted outside the ORM"""
+    user_cache.invalidate(user_id)
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def get_cached_principal(token: str) -> Optional[int]:
+    """The user id of an already verified, unexpired token"""
+    return principal_cache.get(token_digest(token))
+
+
+def cache_principal(token: str, user_id: int, expires_at: float):
+    """Remember a verified token until its exp (a Unix timestamp)"""
+    ttl = expires_at - time.time()
+    if ttl > 0:
+        principal_cache.set(token_digest(token), user_id, ttl)
+
+
+def load_user(session: Session, user_id: int) -> Optional[User]:
+    """Get a user through the cache, reading the row only on a miss"""
+    values = user_cache.get(user_id)
+    if values is not None:
+        # A fresh instance per request: cached state is never shared or mutated
+        return User(**values)
+    user = session.get(User, user_id)
+    if user is not None:
+        user_cache.set(user_id, {column.name: getattr(user, column.name) for column in User.__table__.columns})
+    return user
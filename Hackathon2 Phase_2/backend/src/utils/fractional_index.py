@@ -0,0 +1,160 @@
+"""Order keys for manual ordering.
+
+Keys are strings that sort by plain byte comparison; a key can always be
+generated between any two others, so moving an item rewrites only that
+item. A key is an integer part (a head character giving its length,
+followed by base-62 digits) and an optional fraction. Appending and
+prepending step the integer part, so keys stay short; repeated inserts
+between the same two neighbours lengthen the fraction, which a rebalance
+(generating fresh keys with n_keys_between) undoes.
+"""
+from typing import List, Optional
+
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_ZERO = DIGITS[0]
+_SMALLEST_INTEGER = "A" + _ZERO * 26
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """A fraction strictly between fractions a and b (b None means 1)"""
+    if b is not None:
+        # Keep the common prefix, padding a with zeros
+        n = 0
+        while (a[n] if n < len(a) else _ZERO) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head: {head!r}")
+
+
+def _split(key: str):
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid order key: {key!r}")
+    return key[:length], key[length:]
+
+
+def validate_key(key: str):
+    """Raise ValueError unless key is a well-formed order key"""
+    if not key or key == _SMALLEST_INTEGER:
+        raise ValueError(f"Invalid order key: {key!r}")
+    _, fraction = _split(key)
+    if fraction.endswith(_ZERO) or any(c not in DIGITS for c in key[1:]):
+        raise ValueError(f"Invalid order key: {key!r}")
+
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) + 1
+        if d < len(DIGITS):
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = _ZERO
+    # Carried out of every digit: move to the next integer length
+    if head == "Z":
+        return "a" + _ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(_ZERO)
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """A key sorting after a and before b; None means unbounded on that side"""
+    if a is not None:
+        validate_key(a)
+    if b is not None:
+        validate_key(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Order keys out of order: {a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a" + _ZERO
+        integer_b, fraction_b = _split(b)
+        if integer_b == _SMALLEST_INTEGER:
+            return integer_b + _midpoint("", fraction_b)
+        if integer_b < b:
+            return integer_b
+        decremented = _decrement(integer_b)
+        if decremented is None:
+            raise ValueError("Cannot generate a key before the smallest key")
+        return decremented
+
+    integer_a, fraction_a = _split(a)
+    if b is None:
+        incremented = _increment(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if incremented is None else incremented
+
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    incremented = _increment(integer_a)
+    if incremented is None:
+        raise ValueError("Cannot generate a key after the largest key")
+    if incremented < b:
+        return incremented
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def n_keys_between(a: Optional[str], b: Optional[str], n: int) -> List[str]:
+    """n ascending keys between a and b, as short as the gap allows"""
+    if n <= 0:
+        return []
+    if n == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, b)]
+        for _ in range(n - 1):
+            keys.append(key_between(keys[-1], b))
+        return keys
+    if a is None:
+        keys = [key_between(a, b)]
+        for _ in range(n - 1):
+            keys.append(key_between(a, keys[-1]))
+        keys.reverse()
+        return keys
+    middle = n // 2
+    key = key_between(a, b)
+    return n_keys_between(a, key, middle) + [key] + n_keys_between(key, b, n - middle - 1)
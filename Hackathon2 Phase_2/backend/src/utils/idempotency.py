@@ -0,0 +1,371 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from sqlmodel import Session
+from sqlalchemy import delete, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from config import settings
+from models.idempotency_key_model import IdempotencyKey
+from utils.metrics import metrics
+from utils.upsert import dialect_insert
+
+
+CLAIMED = "claimed"
+COMPLETED = "completed"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+MAX_KEY_LENGTH = 255
+
+# Recomputed when a stored response is replayed
+_UNSTORED_HEADERS = {"content-length", "content-type"}
+
+# Besides the scheduled purge (workers.purge_worker), expired keys are
+# purged opportunistically by claim(), at most once per interval
+_PURGE_INTERVAL_SECONDS = 300
+_PURGE_BATCH_SIZE = 1000
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: Any
+    headers: Optional[Dict[str, str]] = None
+
+
+class IdempotencyStore:
+    """Where claims and finished responses of Idempotency-Key requests are kept.
+
+    claim() returns (CLAIMED, None) when the caller should run the request,
+    (COMPLETED, response) to replay, (IN_PROGRESS, None) while another
+    request with the key runs, and (MISMATCH, None) when the key was used
+    for a different request.
+    """
+
+    def claim(self, session: Session, user_id: int, key: str, fingerprint: str) -> Tuple[str, Optional[StoredResponse]]:
+        raise NotImplementedError
+
+    def complete(self, session: Session, user_id: int, key: str, response: StoredResponse):
+        raise NotImplementedError
+
+    def release(self, session: Session, user_id: int, key: str):
+        """Drop an unfinished claim so a retry can run the request again"""
+        raise NotImplementedError
+
+    def purge_expired(self, session: Session, batch_size: int = _PURGE_BATCH_SIZE) -> int:
+        raise NotImplementedError
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Keeps keys in the idempotency_key table, shared by every worker process.
+
+    Each call commits, so a claim is visible to concurrent duplicates
+    before the request it guards starts.
+    """
+
+    def __init__(self):
+        self._last_purge = 0.0
+
+    def claim(self, session, user_id, key, fingerprint):
+        now = datetime.utcnow()
+        self._maybe_purge(session)
+        table = IdempotencyKey.__table__
+        where_key = (table.c.user_id == user_id, table.c.key == key)
+
+        for _ in range(2):
+            if self._insert_claim(session, user_id, key, fingerprint, now):
+                session.commit()
+                return CLAIMED, None
+
+            existing = session.execute(select(table).where(*where_key)).first()
+            if existing is None:
+                continue
+            if existing.expires_at <= now:
+                session.execute(delete(table).where(*where_key, table.c.expires_at <= now))
+                continue
+            if existing.fingerprint != fingerprint:
+                session.commit()
+                return MISMATCH, None
+            if existing.status == COMPLETED:
+                session.commit()
+                return COMPLETED, StoredResponse(
+                    existing.response_status, existing.response_body, existing.response_headers
+                )
+
+            stale_before = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+            if existing.created_at < stale_before:
+                # The request holding the claim died without releasing it
+                result = session.execute(
+                    update(table)
+                    .where(*where_key, table.c.status == IN_PROGRESS, table.c.created_at == existing.created_at)
+                    .values(created_at=now)
+                )
+                session.commit()
+                return (CLAIMED, None) if result.rowcount == 1 else (IN_PROGRESS, None)
+            break
+
+        session.commit()
+        return IN_PROGRESS, None
+
+    def complete(self, session, user_id, key, response):
+        table = IdempotencyKey.__table__
+        session.execute(
+            update(table)
+            .where(table.c.user_id == user_id, table.c.key == key)
+            .values(
+                status=COMPLETED,
+                response_status=response.status_code,
+                response_body=response.body,
+                response_headers=response.headers,
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+            )
+        )
+        session.commit()
+
+    def release(self, session, user_id, key):
+        table = IdempotencyKey.__table__
+        session.execute(
+            delete(table).where(table.c.user_id == user_id, table.c.key == key, table.c.status == IN_PROGRESS)
+        )
+        session.commit()
+
+    def purge_expired(self, session, batch_size=_PURGE_BATCH_SIZE):
+        """Delete expired keys in batches; returns how many were removed"""
+        table = IdempotencyKey.__table__
+        removed = 0
+        while True:
+            batch = (
+                select(table.c.user_id, table.c.key)
+                .where(table.c.expires_at <= datetime.utcnow())
+                .limit(batch_size)
+            )
+            result = session.execute(delete(table).where(tuple_(table.c.user_id, table.c.key).in_(batch)))
+            session.commit()
+            removed += result.rowcount
+            if result.rowcount < batch_size:
+                return removed
+
+    def _insert_claim(self, session, user_id, key, fingerprint, now) -> bool:
+        row = {
+            "user_id": user_id,
+            "key": key,
+            "fingerprint": fingerprint,
+            "status": IN_PROGRESS,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        }
+        statement = dialect_insert(session, IdempotencyKey.__table__)
+        if statement is not None:
+            result = session.execute(statement.values(**row).on_conflict_do_nothing(index_elements=["user_id", "key"]))
+            return result.rowcount == 1
+        try:
+            with session.begin_nested():
+                session.execute(insert(IdempotencyKey.__table__).values(**row))
+            return True
+        except IntegrityError:
+            return False
+
+    def _maybe_purge(self, session):
+        if time.monotonic() - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        table = IdempotencyKey.__table__
+        batch = (
+            select(table.c.user_id, table.c.key)
+            .where(table.c.expires_at <= datetime.utcnow())
+            .limit(_PURGE_BATCH_SIZE)
+        )
+        session.execute(delete(table).where(tuple_(table.c.user_id, table.c.key).in_(batch)))
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Keeps keys in this process only; for single-process deployments and tests.
+
+    The scheduled purge runs in another process, so claim() sweeps out
+    expired entries itself every _PURGE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[int, str], dict] = {}
+        self._last_purge = time.monotonic()
+
+    def claim(self, session, user_id, key, fingerprint):
+        now = time.monotonic()
+        if now - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            self.purge_expired(session)
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry and entry["expires_at"] <= now:
+                entry = None
+            stale = entry and entry["status"] == IN_PROGRESS and entry["claimed_at"] < now - settings.IDEMPOTENCY_LOCK_SECONDS
+            if entry is None or stale:
+                self._entries[(user_id, key)] = {
+                    "fingerprint": fingerprint,
+                    "status": IN_PROGRESS,
+                    "claimed_at": now,
+                    "expires_at": now + settings.IDEMPOTENCY_TTL_SECONDS,
+                    "response": None,
+                }
+                return CLAIMED, None
+            if entry["fingerprint"] != fingerprint:
+                return MISMATCH, None
+            if entry["status"] == COMPLETED:
+                return COMPLETED, entry["response"]
+            return IN_PROGRESS, None
+
+    def complete(self, session, user_id, key, response):
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry:
+                entry.update(status=COMPLETED, response=response,
+                             expires_at=time.monotonic() + settings.IDEMPOTENCY_TTL_SECONDS)
+
+    def release(self, session, user_id, key):
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry and entry["status"] == IN_PROGRESS:
+                del self._entries[(user_id, key)]
+
+    def purge_expired(self, session, batch_size=_PURGE_BATCH_SIZE):
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, entry in self._entries.items() if entry["expires_at"] <= now]
+            for k in expired:
+                del self._entries[k]
+        return len(expired)
+
+
+_stores = {"database": DatabaseIdempotencyStore, "memory": MemoryIdempotencyStore}
+_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """The store selected by IDEMPOTENCY_STORE, created on first use"""
+    global _store
+    if _store is None:
+        _store = _stores[settings.IDEMPOTENCY_STORE]()
+    return _store
+
+
+# Duplicates in this process are woken as soon as the first request
+# finishes; duplicates in other processes notice on their next poll
+_events_lock = threading.Lock()
+_events: Dict[Tuple[int, str], threading.Event] = {}
+
+
+def _event(user_id: int, key: str) -> threading.Event:
+    with _events_lock:
+        return _events.setdefault((user_id, key), threading.Event())
+
+
+def _notify(user_id: int, key: str):
+    with _events_lock:
+        event = _events.pop((user_id, key), None)
+    if event:
+        event.set()
+
+
+def request_fingerprint(route: str, payload: Any = None) -> str:
+    """Identify a request by its route and payload, so a key reused for another request is caught"""
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{route}\n{encoded}".encode("utf-8")).hexdigest()
+
+
+def _replay(response: StoredResponse) -> JSONResponse:
+    metrics.increment("idempotency.replayed")
+    return JSONResponse(
+        status_code=response.status_code,
+        content=response.body,
+        headers={**(response.headers or {}), "Idempotent-Replayed": "true"},
+    )
+
+
+def run_idempotent(
+    session: Session,
+    user_id: int,
+    key: Optional[str],
+    fingerprint: str,
+    handler: Callable[[], Any],
+    status_code: int = 200,
+) -> Any:
+    """Run handler at most once per (user, Idempotency-Key).
+
+    Without a key the handler simply runs. The first request with a key
+    runs the handler and stores its response (including 4xx errors);
+    retries get that response back with an Idempotent-Replayed header.
+    A duplicate arriving while the first is still running waits up to
+    IDEMPOTENCY_WAIT_SECONDS for it. Unexpected failures release the key
+    so the request can be retried.
+    """
+    if key is None:
+        return handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+
+    store = get_idempotency_store()
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    waited = False
+    try:
+        while True:
+            state, stored = store.claim(session, user_id, key, fingerprint)
+            if state == CLAIMED:
+                break
+            if state == COMPLETED:
+                return _replay(stored)
+            if state == MISMATCH:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                metrics.increment("idempotency.wait_timeouts")
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            if not waited:
+                metrics.increment("idempotency.waited")
+                waited = True
+            _event(user_id, key).wait(min(remaining, 0.1))
+    finally:
+        if waited:
+            # The first request may have run in another process, or
+            # notified before this one created its event: drop the event
+            # here so it does not stay in _events
+            _notify(user_id, key)
+
+    try:
+        result = handler()
+    except HTTPException as e:
+        session.rollback()
+        if e.status_code >= 500:
+            store.release(session, user_id, key)
+        else:
+            store.complete(session, user_id, key, StoredResponse(e.status_code, {"detail": e.detail}, e.headers))
+        _notify(user_id, key)
+        raise
+    except Exception:
+        session.rollback()
+        store.release(session, user_id, key)
+        _notify(user_id, key)
+        raise
+
+    # Serialize before storing: completing the key commits the session,
+    # which would expire the handler's objects
+    if isinstance(result, Response):
+        body = json.loads(result.body) if result.body else None
+        headers = {
+            name: value for name, value in result.headers.items()
+            if name.lower() not in _UNSTORED_HEADERS
+        }
+        response = StoredResponse(result.status_code, body, headers or None)
+    else:
+        response = StoredResponse(status_code, jsonable_encoder(result))
+    store.complete(session, user_id, key, response)
+    _notify(user_id, key)
+    return JSONResponse(status_code=response.status_code, content=response.body, headers=response.headers)
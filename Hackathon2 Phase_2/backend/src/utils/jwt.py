@@ -1,11 +1,31 @@
+import secrets
+import time
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from sqlmodel import Session
 from models.user import User
 from models.refresh_token import RefreshToken
-from utils.security_fixed import verify_password
+from utils.password_hasher import HashQueueFullError, get_password_hasher
+from utils.security_fixed import needs_update
 from config import settings
+from utils.metrics import metrics
+
+
+# Parsed key objects by (secret, algorithm), so the key is not rebuilt
+# from the secret on every encode and decode
+_signing_keys = {}
+
+REFRESH_TOKEN_TYPE = "refresh"
+
+
+def signing_key():
+    """The key object for SECRET_KEY and JWT_ALGORITHM, built once"""
+    params = (settings.SECRET_KEY, settings.JWT_ALGORITHM)
+    key = _signing_keys.get(params)
+    if key is None:
+        key = _signing_keys[params] = jwk.construct(*params)
+    return key
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -17,7 +37,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, signing_key(), algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
@@ -29,24 +49,41 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    # The type keeps access tokens from being used to refresh; the jti makes
+    # every token (and so its stored digest) unique, even within one second
+    to_encode.update({"exp": expire, "type": REFRESH_TOKEN_TYPE, "jti": secrets.token_hex(16)})
+    encoded_jwt = jwt.encode(to_encode, signing_key(), algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
 def verify_token(token: str) -> Optional[dict]:
     """Verify a token and return the payload if valid."""
+    started = time.perf_counter()
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = jwt.decode(token, signing_key(), algorithms=[settings.JWT_ALGORITHM])
         return payload
     except JWTError:
+        metrics.increment("auth.token_invalid")
         return None
+    finally:
+        metrics.observe("auth.token_verify", time.perf_counter() - started)
 
 
 def authenticate_user(session: Session, email: str, password: str) -> Optional[User]:
     """Authenticate a user by email and password."""
     from sqlmodel import select
     user = session.exec(select(User).where(User.email == email)).first()
-    if not user or not verify_password(password, user.hashed_password):
+    hasher = get_password_hasher()
+    if not user or not hasher.verify(password, user.hashed_password):
         return None
+
+    if needs_update(user.hashed_password):
+        # The hash predates the configured cost: redo it now that the
+        # password is known. Committed by the caller with the login.
+        try:
+            user.hashed_password = hasher.hash(password)
+            session.add(user)
+            metrics.increment("password_hash.rehashed")
+        except HashQueueFullError:
+            pass  # Try again on a later login
     return user
\ No newline at end of file
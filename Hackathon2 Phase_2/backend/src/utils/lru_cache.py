@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from utils.metrics import metrics
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with optional per-entry expiry.
+
+    When a name is given, hits and misses are counted in the metrics
+    registry and the hit rate is exposed as a gauge.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, expires_at)
+        self._hits_metric = self._misses_metric = None
+        if name:
+            self._hits_metric = f"cache.{name}.hits"
+            self._misses_metric = f"cache.{name}.misses"
+            metrics.gauge(f"cache.{name}.hit_rate", self.hit_rate)
+            metrics.gauge(f"cache.{name}.size", lambda: len(self._entries))
+
+    def hit_rate(self) -> float:
+        if not self._hits_metric:
+            return 0.0
+        hits = metrics.counter(self._hits_metric)
+        total = hits + metrics.counter(self._misses_metric)
+        return round(hits / total, 4) if total else 0.0
+
+    def _record(self, hits: int, misses: int):
+        if self._hits_metric:
+            if hits:
+                metrics.increment(self._hits_metric, hits)
+            if misses:
+                metrics.increment(self._misses_metric, misses)
+
+    def _lookup(self, key: Hashable, now: float) -> Any:
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+        self._record(value is not _MISSING, value is _MISSING)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Return the cached subset of keys"""
+        found = {}
+        misses = 0
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                value = self._lookup(key, now)
+                if value is _MISSING:
+                    misses += 1
+                else:
+                    found[key] = value
+        self._record(len(found), misses)
+        return found
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        self.set_many({key: value}, ttl_seconds)
+
+    def set_many(self, mapping: Dict[Hashable, Any], ttl_seconds: Optional[float] = None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            for key, value in mapping.items():
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]):
+        """Drop every entry for which predicate(key, value) is true"""
+        with self._lock:
+            for key in [k for k, (v, _) in self._entries.items() if predicate(k, v)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,56 @@
+from typing import Iterable, Tuple
+from sqlmodel import Session, select
+from sqlalchemy import event
+from config import settings
+from models.task_list_model import TaskListMember
+from utils.lru_cache import LRUCache
+
+
+# User id -> sorted tuple of list ids. Users in no list are cached too (as
+# an empty tuple), so personal task reads never query memberships.
+membership_cache = LRUCache(
+    settings.TASK_LIST_MEMBERSHIP_CACHE_SIZE, settings.TASK_LIST_MEMBERSHIP_CACHE_TTL_SECONDS,
+    name="task_list_memberships"
+)
+
+_CHANGED_KEY = "changed_member_ids"
+
+
+@event.listens_for(TaskListMember, "after_insert")
+@event.listens_for(TaskListMember, "after_delete")
+def _track_changed_member(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        track_changed_members(session, [target.user_id])
+
+
+def track_changed_members(session: Session, user_ids: Iterable[int]):
+    """Forget the users' cached memberships once the session commits, e.g. after a Core insert"""
+    session.info.setdefault(_CHANGED_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_members(session):
+    invalidate_memberships(session.info.pop(_CHANGED_KEY, ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_members(session):
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def invalidate_memberships(user_ids: Iterable[int]):
+    """Forget cached memberships, e.g. after they are changed outside the ORM"""
+    for user_id in user_ids:
+        membership_cache.invalidate(user_id)
+
+
+def get_list_ids(session: Session, user_id: int) -> Tuple[int, ...]:
+    """Ids of the shared task lists a user belongs to, reading them only on a miss"""
+    list_ids = membership_cache.get(user_id)
+    if list_ids is None:
+        list_ids = tuple(session.exec(
+            select(TaskListMember.list_id).where(TaskListMember.user_id == user_id).order_by(TaskListMember.list_id)
+        ).all())
+        membership_cache.set(user_id, list_ids)
+    return list_ids
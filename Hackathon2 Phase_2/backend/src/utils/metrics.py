@@ -0,0 +1,60 @@
+import threading
+from typing import Callable, Dict
+
+
+class MetricsRegistry:
+    """Minimal in-process metrics: counters, timers and computed gauges.
+
+    Values are per worker process and are exposed through GET /api/metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timers: Dict[str, list] = {}  # name -> [count, total_seconds, max_seconds]
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def increment(self, name: str, value: float = 1):
+        """Add to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        """Record one duration for a timer"""
+        with self._lock:
+            timer = self._timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def gauge(self, name: str, fn: Callable[[], float]):
+        """Register a value computed when metrics are read"""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """Return all metrics as a JSON-serializable dict"""
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {
+                name: {
+                    "count": count,
+                    "total_seconds": round(total, 6),
+                    "avg_seconds": round(total / count, 6) if count else 0.0,
+                    "max_seconds": round(maximum, 6),
+                }
+                for name, (count, total, maximum) in self._timers.items()
+            }
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "timers": timers,
+            "gauges": {name: fn() for name, fn in gauges.items()},
+        }
+
+
+metrics = MetricsRegistry()
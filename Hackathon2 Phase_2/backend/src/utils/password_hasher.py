@@ -0,0 +1,100 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from config import settings
+from utils.metrics import metrics
+from utils.security_fixed import get_password_hash, verify_password
+
+
+class HashQueueFullError(Exception):
+    """Password hashing is saturated; the caller should retry after retry_after seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs password hashing on its own bounded thread pool.
+
+    Hashing is deliberately slow, so a burst of logins must not occupy the
+    threads that serve every other route. At most `workers` hashes run at
+    once and at most `queue_size` more wait; further calls fail at once
+    with HashQueueFullError instead of queueing. The request thread waits
+    for its own hash, so at most workers + queue_size request threads are
+    ever tied up by hashing. PBKDF2 (hashlib) releases the GIL, so the
+    threads hash in parallel.
+    """
+
+    def __init__(self, workers: int, queue_size: int, name: str = "password_hash"):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0  # Running plus queued
+        self._avg_seconds = 0.0
+        self._name = name
+        metrics.gauge(f"{name}.queue_depth", lambda: max(self._pending - self.workers, 0))
+        metrics.gauge(f"{name}.in_flight", lambda: self._pending)
+
+    def hash(self, password: str) -> str:
+        return self._run("hash", get_password_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run("verify", verify_password, plain_password, hashed_password)
+
+    def expected_wait(self) -> float:
+        """Seconds until the current backlog should have drained, i.e. the queueing delay a new call would see"""
+        with self._lock:
+            pending, avg = self._pending, self._avg_seconds
+        return pending * avg / self.workers
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.expected_wait()))
+
+    def _run(self, operation: str, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.capacity:
+                rejected = True
+            else:
+                rejected = False
+                self._pending += 1
+        if rejected:
+            metrics.increment(f"{self._name}.rejected")
+            raise HashQueueFullError(self.retry_after())
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            metrics.observe(f"{self._name}.wait", started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.observe(f"{self._name}.{operation}", elapsed)
+                with self._lock:
+                    # Smoothed cost of one hash, for Retry-After
+                    self._avg_seconds = elapsed if not self._avg_seconds else 0.8 * self._avg_seconds + 0.2 * elapsed
+
+        try:
+            return self._executor.submit(timed).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """The process-wide hasher sized by PASSWORD_HASH_WORKERS and PASSWORD_HASH_QUEUE_SIZE"""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
+    return _hasher
@@ -0,0 +1,161 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import HTTPException, Request
+from config import settings
+from utils.metrics import metrics
+from utils.password_hasher import get_password_hasher
+
+
+class RateLimitStore:
+    """Token buckets by key.
+
+    take() removes one token from the bucket, refilled at `rate` tokens per
+    second up to `burst`, and returns 0 when it succeeded or else the
+    seconds until a token will be available.
+    """
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        raise NotImplementedError
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Buckets in this process; each worker process limits on its own.
+
+    At most AUTH_RATE_LIMIT_MEMORY_KEYS buckets are kept, least recently
+    used dropped first, so a spray of distinct emails cannot grow memory
+    without bound.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self.max_keys = max_keys or settings.AUTH_RATE_LIMIT_MEMORY_KEYS
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated)
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# Refill, take and expire atomically on the server, timed by the server's
+# clock so that workers with drifting clocks agree
+_TAKE_SCRIPT = """
+redis.replicate_commands()
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Buckets in Redis, shared by every worker process.
+
+    When Redis cannot be reached, buckets fall back to this process, so
+    each worker still limits on its own rather than not at all, and Redis
+    is not tried again for a few seconds.
+    """
+
+    RETRY_SECONDS = 5
+
+    def __init__(self, url: Optional[str] = None):
+        import redis
+        self._errors = (redis.RedisError,)
+        self._client = redis.Redis.from_url(url or settings.AUTH_RATE_LIMIT_REDIS_URL,
+                                            socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self._fallback = MemoryRateLimitStore()
+        self._retry_at = 0.0
+
+    def take(self, key, rate, burst):
+        if time.monotonic() >= self._retry_at:
+            try:
+                return float(self._take(keys=[f"rate_limit:{key}"], args=[rate, burst]))
+            except self._errors:
+                metrics.increment("auth_rate_limit.store_errors")
+                self._retry_at = time.monotonic() + self.RETRY_SECONDS
+        return self._fallback.take(key, rate, burst)
+
+
+_stores = {"memory": MemoryRateLimitStore, "redis": RedisRateLimitStore}
+_store: Optional[RateLimitStore] = None
+
+
+def get_rate_limit_store() -> RateLimitStore:
+    """The store selected by AUTH_RATE_LIMIT_STORE, created on first use"""
+    global _store
+    if _store is None:
+        _store = _stores[settings.AUTH_RATE_LIMIT_STORE]()
+    return _store
+
+
+def limit_scale() -> float:
+    """Fraction of the configured rates currently allowed.
+
+    1 while a new password hash would start within
+    AUTH_RATE_LIMIT_TARGET_WAIT_MS; beyond that, inversely proportional to
+    the expected queueing delay, but at least AUTH_RATE_LIMIT_MIN_SCALE.
+    """
+    wait_ms = get_password_hasher().expected_wait() * 1000
+    if wait_ms <= settings.AUTH_RATE_LIMIT_TARGET_WAIT_MS:
+        return 1.0
+    return max(settings.AUTH_RATE_LIMIT_MIN_SCALE, settings.AUTH_RATE_LIMIT_TARGET_WAIT_MS / wait_ms)
+
+
+metrics.gauge("auth_rate_limit.scale", limit_scale)
+
+
+def _email_key(email: str) -> str:
+    # Keys may leave the process (Redis), so they carry no addresses
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:32]
+
+
+def check_auth_rate_limit(request: Request, email: str):
+    """Admit a login or registration attempt, or answer 429 with Retry-After.
+
+    Runs before any query or password hash, so rejected attempts cost
+    neither. The client IP bucket is checked first, then the email's.
+    """
+    store = get_rate_limit_store()
+    scale = limit_scale()
+    client_ip = request.client.host if request.client else "unknown"
+    limits = (
+        ("ip", client_ip, settings.AUTH_RATE_LIMIT_IP_PER_MINUTE, settings.AUTH_RATE_LIMIT_IP_BURST),
+        ("email", _email_key(email), settings.AUTH_RATE_LIMIT_EMAIL_PER_MINUTE, settings.AUTH_RATE_LIMIT_EMAIL_BURST),
+    )
+    for kind, value, per_minute, burst in limits:
+        wait = store.take(f"auth:{kind}:{value}", per_minute * scale / 60, max(1, round(burst * scale)))
+        if wait > 0:
+            metrics.increment(f"auth_rate_limit.rejected.{kind}")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many attempts, please retry later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
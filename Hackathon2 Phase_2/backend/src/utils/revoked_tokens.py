@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlmodel import Session, select
+from config import settings
+from models.refresh_token import RefreshToken
+from utils.metrics import metrics
+
+
+# Revocations by other processes are picked up by re-reading rows revoked
+# since the last sync, minus this margin for clock differences between hosts
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class RevokedTokenSet:
+    """In-process set of revoked, unexpired refresh token digests.
+
+    Refresh tokens are signed and carry their own expiry, so the only thing
+    a refresh needs from the database is whether the token was revoked.
+    That answer comes from this set instead: it is loaded from the table
+    on first use (warmed at startup), updated immediately by revocations
+    in this process, and re-synced with the table every
+    REFRESH_TOKEN_REVOCATION_SYNC_SECONDS for revocations made elsewhere.
+    Digests are dropped once their token has expired, since verification
+    rejects it by then anyway.
+    """
+
+    def __init__(self, sync_seconds: float, name: str = "revoked_refresh_tokens"):
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._digests: Dict[bytes, datetime] = {}  # digest -> token expires_at
+        self._synced_at: Optional[datetime] = None  # Wall clock of the last read, for revoked_at
+        self._next_sync = 0.0
+        metrics.gauge(f"{name}.size", lambda: len(self._digests))
+
+    def contains(self, session: Session, digest: bytes) -> bool:
+        """Whether the token with this digest has been revoked"""
+        if time.monotonic() >= self._next_sync:
+            self.sync(session)
+        return digest in self._digests
+
+    def add(self, digest: bytes, expires_at: datetime):
+        """Record a revocation made by this process, once it is committed"""
+        with self._lock:
+            self._digests[digest] = expires_at
+
+    def sync(self, session: Session, full: bool = False):
+        """Read revocations from the table: all of them on the first call or when full, else the recent ones"""
+        if not self._sync_lock.acquire(blocking=self._synced_at is None or full):
+            return  # Another thread is syncing; the current set is recent enough
+        try:
+            started = time.perf_counter()
+            now = datetime.utcnow()
+            query = select(RefreshToken.token_digest, RefreshToken.expires_at).where(
+                RefreshToken.revoked_at.is_not(None), RefreshToken.expires_at > now
+            )
+            if self._synced_at is not None and not full:
+                query = query.where(RefreshToken.revoked_at >= self._synced_at - _SYNC_OVERLAP)
+            rows = session.exec(query).all()
+
+            with self._lock:
+                if full or self._synced_at is None:
+                    self._digests = {}
+                else:
+                    for digest in [d for d, expires_at in self._digests.items() if expires_at <= now]:
+                        del self._digests[digest]
+                self._digests.update((bytes(digest), expires_at) for digest, expires_at in rows)
+            self._synced_at = now
+            self._next_sync = time.monotonic() + self.sync_seconds
+            metrics.observe("revoked_refresh_tokens.sync", time.perf_counter() - started)
+        finally:
+            self._sync_lock.release()
+
+
+revoked_refresh_tokens = RevokedTokenSet(settings.REFRESH_TOKEN_REVOCATION_SYNC_SECONDS)
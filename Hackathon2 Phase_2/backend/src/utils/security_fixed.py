@@ -1,35 +1,62 @@
 import hashlib
+import hmac
 import secrets
 from typing import Tuple
+from config import settings
+
+
+# Hashes are written as pbkdf2_sha256$<iterations>$<salt>$<hash>, so the
+# iteration count can be raised (see calibrate_password_hash.py) without
+# invalidating existing hashes
+SCHEME = "pbkdf2_sha256"
+# Older hashes carry no parameters: "<salt>$<hash>", or "<salt><hash>" as
+# written by the fallback in utils/security.py. Both used 100000 iterations.
+LEGACY_ITERATIONS = 100000
+_LEGACY_SALT_LENGTH = 64
+
+
+def _parse(hashed_password: str) -> Tuple[int, str, str]:
+    """Split a stored hash into (iterations, salt, hex digest)"""
+    parts = hashed_password.split('$')
+    if len(parts) == 4 and parts[0] == SCHEME:
+        return int(parts[1]), parts[2], parts[3]
+    if len(parts) == 2:
+        return LEGACY_ITERATIONS, parts[0], parts[1]
+    if len(parts) == 1 and len(hashed_password) > _LEGACY_SALT_LENGTH:
+        return LEGACY_ITERATIONS, hashed_password[:_LEGACY_SALT_LENGTH], hashed_password[_LEGACY_SALT_LENGTH:]
+    raise ValueError("Unrecognized password hash format")
+
+
+def _pbkdf2(password: str, salt: str, iterations: int) -> str:
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt.encode('utf-8'), iterations).hex()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
     try:
-        # Assuming the format is salt:hash
-        salt, stored_hash = hashed_password.split('$', 1)
-        pwdhash = hashlib.pbkdf2_hmac('sha256',
-                                      plain_password.encode('utf-8'),
-                                      salt.encode('utf-8'),
-                                      100000)
-        return pwdhash.hex() == stored_hash
+        iterations, salt, stored_hash = _parse(hashed_password)
+        return hmac.compare_digest(_pbkdf2(plain_password, salt, iterations), stored_hash)
     except Exception:
         return False
 
 
-def get_password_hash(password: str) -> str:
+def get_password_hash(password: str, iterations: int = None) -> str:
     """Generate a hash for a plain password."""
+    iterations = iterations or settings.PASSWORD_HASH_ITERATIONS
     # Bcrypt has a 72 character limit, so we truncate if necessary
     truncated_password = password[:72] if len(password) > 72 else password
-    
+
     # Generate a random salt
     salt = secrets.token_hex(32)
-    
-    # Hash the password with the salt
-    pwdhash = hashlib.pbkdf2_hmac('sha256',
-                                  truncated_password.encode('utf-8'),
-                                  salt.encode('utf-8'),
-                                  100000)
-    
-    # Return salt and hash combined
-    return f"{salt}${pwdhash.hex()}"
\ No newline at end of file
+
+    # Return the parameters, salt and hash combined
+    return f"{SCHEME}${iterations}${salt}${_pbkdf2(truncated_password, salt, iterations)}"
+
+
+def needs_update(hashed_password: str) -> bool:
+    """Whether a hash was made with other parameters than the configured ones and should be redone"""
+    try:
+        iterations, _, _ = _parse(hashed_password)
+    except ValueError:
+        return False  # Not ours to upgrade
+    return not hashed_password.startswith(SCHEME + '$') or iterations != settings.PASSWORD_HASH_ITERATIONS
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from utils.metrics import metrics
+
+
+class _Call:
+    """One in-flight execution that concurrent callers with the same key share."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _resolve_future(future: asyncio.Future, result: Any, error: Optional[BaseException]):
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into a single execution.
+
+    While a call for a key is running, further callers with the same key wait
+    for its result instead of running the function again. Nothing is cached
+    once the call finishes. Threadpool callers use ``do`` and event-loop
+    callers use ``do_async``; both share the same in-flight table, so a sync
+    leader can serve async followers and vice versa.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        prefix = f"single_flight.{name}"
+        self._calls_metric = f"{prefix}.calls"
+        self._coalesced_metric = f"{prefix}.coalesced"
+        self._wait_metric = f"{prefix}.wait_seconds"
+        metrics.gauge(f"{prefix}.coalesce_ratio", self.coalesce_ratio)
+
+    def coalesce_ratio(self) -> float:
+        """Fraction of calls that were served by another caller's execution"""
+        calls = metrics.counter(self._calls_metric)
+        return round(metrics.counter(self._coalesced_metric) / calls, 4) if calls else 0.0
+
+    def _join(self, key: Hashable, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Return (call, is_leader, future). Registers an async waiter when loop is given."""
+        metrics.increment(self._calls_metric)
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                return call, True, None
+            future = None
+            if loop is not None:
+                future = loop.create_future()
+                call.async_waiters.append((loop, future))
+        metrics.increment(self._coalesced_metric)
+        return call, False, future
+
+    def _finish(self, key: Hashable, call: _Call, result: Any, error: Optional[BaseException]):
+        call.result, call.error = result, error
+        with self._lock:
+            # After the pop no new waiter can register on this call
+            self._calls.pop(key, None)
+            waiters = list(call.async_waiters)
+        call.event.set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve_future, future, result, error)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already in flight (blocking)"""
+        call, leader, _ = self._join(key)
+        if leader:
+            return self._lead(key, call, fn)
+
+        started = time.perf_counter()
+        call.event.wait()
+        metrics.observe(self._wait_metric, time.perf_counter() - started)
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Await fn, or the identical call already in flight.
+
+        fn may be a coroutine function or a blocking function; the latter is
+        run in a worker thread so the event loop is never blocked.
+        """
+        call, leader, future = self._join(key, asyncio.get_running_loop())
+        if leader:
+            try:
+                if asyncio.iscoroutinefunction(fn):
+                    result = await fn()
+                else:
+                    result = await asyncio.to_thread(fn)
+            except BaseException as e:
+                self._finish(key, call, None, e)
+                raise
+            self._finish(key, call, result, None)
+            return result
+
+        started = time.perf_counter()
+        try:
+            return await future
+        finally:
+            metrics.observe(self._wait_metric, time.perf_counter() - started)
+
+    def _lead(self, key: Hashable, call: _Call, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, call, None, e)
+            raise
+        self._finish(key, call, result, None)
+        return result
@@ -0,0 +1,453 @@
+"""
+Filter expression language for task queries.
+
+Expressions look like:
+
+    priority:high AND (tag:work OR due<friday) AND NOT completed:true
+
+An expression is tokenized, parsed into a small AST, validated against the
+Task/Tag columns and compiled into a single SQLAlchemy WHERE clause. Compiled
+clauses are cached by their normalized text, so a repeated filter skips both
+parsing and compilation. Relative dates ("today", "friday", "+7d") are bound
+through callable parameters and resolved at execution time, which keeps the
+cached clause valid across days.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple, Union
+
+from sqlalchemy import and_, bindparam, exists, func, not_, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from config import settings
+from models.task_model import PriorityEnum, RecurrencePatternEnum, Tag, Task, TaskTag
+
+
+class TaskFilterError(ValueError):
+    """Raised when a filter expression is malformed, invalid or too complex."""
+
+
+# ---------------------------------------------------------------------------
+# AST
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Term:
+    """A field comparison such as ``priority:high`` or ``due<friday``."""
+    field: str
+    op: str
+    value: str
+
+
+@dataclass(frozen=True)
+class Text:
+    """A bare word or quoted phrase matched against title and description."""
+    value: str
+
+
+@dataclass(frozen=True)
+class Not:
+    operand: "Node"
+
+
+@dataclass(frozen=True)
+class And:
+    operands: Tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    operands: Tuple["Node", ...]
+
+
+Node = Union[Term, Text, Not, And, Or]
+
+
+# ---------------------------------------------------------------------------
+# Tokenizer and parser
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(
+    r'\s*(?:'
+    r'(?P<lparen>\()|(?P<rparen>\))'
+    r'|(?P<field>[A-Za-z_]+)(?P<op><=|>=|!=|:|=|<|>)(?P<value>"[^"]*"|[^\s()"]+)'
+    r'|(?P<word>"[^"]*"|[^\s()"]+)'
+    r')'
+)
+
+# A field and operator with nothing after them, which _TOKEN_RE reads as a word
+_EMPTY_TERM_RE = re.compile(r'^([A-Za-z_]+)(<=|>=|!=|:|=|<|>)$')
+
+_KEYWORDS = {"AND", "OR", "NOT"}
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _tokenize(expression: str) -> List[tuple]:
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match or match.end() == pos:
+            raise TaskFilterError(f"Unexpected character at position {pos}: {expression[pos:pos + 10]!r}")
+        pos = match.end()
+        if match.group("lparen"):
+            tokens.append(("(", None))
+        elif match.group("rparen"):
+            tokens.append((")", None))
+        elif match.group("field"):
+            term = Term(match.group("field").lower(), match.group("op"), _unquote(match.group("value")))
+            tokens.append(("term", term))
+        else:
+            word = match.group("word")
+            empty_term = _EMPTY_TERM_RE.match(word)
+            if empty_term and empty_term.group(1).lower() in FIELDS:
+                raise TaskFilterError(f"Missing value after {word!r} in filter expression")
+            if word.upper() in _KEYWORDS:
+                tokens.append((word.upper(), None))
+            else:
+                tokens.append(("term", Text(_unquote(word))))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser. NOT binds tighter than AND, AND tighter than OR;
+    adjacent terms without an operator are joined with AND."""
+
+    def __init__(self, tokens: List[tuple]):
+        self.tokens = tokens
+        self.pos = 0
+        self.terms = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self) -> tuple:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise TaskFilterError("Filter expression is empty")
+        node = self.parse_or(1)
+        if self.pos != len(self.tokens):
+            raise TaskFilterError(f"Unexpected {self.peek()!r} in filter expression")
+        return node
+
+    def check_depth(self, depth: int):
+        if depth > settings.TASK_FILTER_MAX_DEPTH:
+            raise TaskFilterError(
+                f"Filter expression is nested too deeply (max {settings.TASK_FILTER_MAX_DEPTH})"
+            )
+
+    def parse_or(self, depth: int) -> Node:
+        self.check_depth(depth)
+        operands = [self.parse_and(depth)]
+        while self.peek() == "OR":
+            self.take()
+            operands.append(self.parse_and(depth))
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def parse_and(self, depth: int) -> Node:
+        operands = [self.parse_not(depth)]
+        while self.peek() in ("AND", "NOT", "(", "term"):
+            if self.peek() == "AND":
+                self.take()
+            operands.append(self.parse_not(depth))
+        return operands[0] if len(operands) == 1 else And(tuple(operands))
+
+    def parse_not(self, depth: int) -> Node:
+        if self.peek() == "NOT":
+            self.take()
+            self.check_depth(depth + 1)
+            return Not(self.parse_not(depth + 1))
+        return self.parse_primary(depth)
+
+    def parse_primary(self, depth: int) -> Node:
+        kind = self.peek()
+        if kind is None:
+            raise TaskFilterError("Filter expression ends unexpectedly")
+        if kind == "(":
+            self.take()
+            node = self.parse_or(depth + 1)
+            if self.peek() != ")":
+                raise TaskFilterError("Missing closing parenthesis in filter expression")
+            self.take()
+            return node
+        if kind == "term":
+            self.terms += 1
+            if self.terms > settings.TASK_FILTER_MAX_TERMS:
+                raise TaskFilterError(
+                    f"Filter expression has too many terms (max {settings.TASK_FILTER_MAX_TERMS})"
+                )
+            return self.take()[1]
+        raise TaskFilterError(f"Unexpected {kind!r} in filter expression")
+
+
+_QUOTED_RE = re.compile(r'("[^"]*")')
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_filter(expression: str) -> str:
+    """Collapse whitespace so trivially different spellings share a cache entry.
+
+    Quoted phrases are kept as written: the whitespace in them is matched.
+    """
+    parts = _QUOTED_RE.split(expression)
+    # split() puts the quoted phrases at the odd indexes
+    return "".join(part if i % 2 else _SPACE_RE.sub(" ", part) for i, part in enumerate(parts)).strip()
+
+
+def parse_task_filter(expression: str) -> Node:
+    """Parse a filter expression into an AST, enforcing the complexity limits."""
+    if len(expression) > settings.TASK_FILTER_MAX_LENGTH:
+        raise TaskFilterError(
+            f"Filter expression is too long (max {settings.TASK_FILTER_MAX_LENGTH} characters)"
+        )
+    node = _Parser(_tokenize(expression)).parse()
+    _validate(node)
+    return node
+
+
+# ---------------------------------------------------------------------------
+# Field definitions and value resolution
+# ---------------------------------------------------------------------------
+
+_TEXT_FIELDS = {"title": Task.title, "description": Task.description}
+_DATE_FIELDS = {"due": Task.due_date, "created": Task.created_at, "updated": Task.updated_at}
+_PRIORITY_RANK = {PriorityEnum.low: 0, PriorityEnum.medium: 1, PriorityEnum.high: 2}
+_BOOL_VALUES = {"true": True, "yes": True, "1": True, "false": False, "no": False, "0": False}
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_OFFSET_RE = re.compile(r"^([+-])(\d{1,4})([dw])$")
+
+FIELDS = sorted(
+    list(_TEXT_FIELDS) + list(_DATE_FIELDS) + ["priority", "completed", "recurrence", "tag"]
+)
+
+_EQUALITY_OPS = (":", "=", "!=")
+_ORDER_OPS = ("<", "<=", ">", ">=")
+
+
+def _today_start(now: datetime) -> datetime:
+    return datetime.combine(now.date(), datetime.min.time())
+
+
+def _date_resolver(value: str) -> Tuple[Callable[[], datetime], bool]:
+    """Return (resolver, is_instant) for a date value.
+
+    Day values resolve to midnight UTC of that day; ``now`` resolves to the
+    current instant. Resolution happens at execution time.
+    """
+    lowered = value.lower()
+    if lowered == "now":
+        return datetime.utcnow, True
+    if lowered in ("today", "tomorrow", "yesterday"):
+        shift = {"today": 0, "tomorrow": 1, "yesterday": -1}[lowered]
+        return (lambda: _today_start(datetime.utcnow()) + timedelta(days=shift)), False
+    if lowered in _WEEKDAYS:
+        target = _WEEKDAYS.index(lowered)
+
+        def next_weekday() -> datetime:
+            today = _today_start(datetime.utcnow())
+            return today + timedelta(days=(target - today.weekday()) % 7)
+        return next_weekday, False
+    offset = _OFFSET_RE.match(lowered)
+    if offset:
+        sign, amount, unit = offset.groups()
+        days = int(amount) * (7 if unit == "w" else 1) * (-1 if sign == "-" else 1)
+        return (lambda: _today_start(datetime.utcnow()) + timedelta(days=days)), False
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise TaskFilterError(
+            f"Invalid date {value!r}; use YYYY-MM-DD, today, tomorrow, yesterday, now, a weekday or +Nd/+Nw"
+        )
+    return (lambda: day), False
+
+
+def _parse_bool(field: str, value: str) -> bool:
+    try:
+        return _BOOL_VALUES[value.lower()]
+    except KeyError:
+        raise TaskFilterError(f"Invalid value {value!r} for {field}; expected true or false")
+
+
+def _parse_enum(field: str, enum_cls, value: str):
+    try:
+        return enum_cls(value.lower())
+    except ValueError:
+        allowed = ", ".join(member.value for member in enum_cls)
+        raise TaskFilterError(f"Invalid value {value!r} for {field}; expected one of {allowed}")
+
+
+def _validate_term(term: Term):
+    field, op, value = term.field, term.op, term.value
+    if field in _TEXT_FIELDS or field == "tag":
+        if op not in _EQUALITY_OPS:
+            raise TaskFilterError(f"Operator {op!r} is not supported for {field}")
+        if field == "tag" and len(value) > 50:
+            raise TaskFilterError("Tag names are at most 50 characters")
+    elif field in _DATE_FIELDS:
+        if value.lower() == "none":
+            if op not in _EQUALITY_OPS:
+                raise TaskFilterError(f"Operator {op!r} cannot be used with {field}:none")
+            return
+        _, is_instant = _date_resolver(value)
+        if is_instant and op not in _ORDER_OPS:
+            raise TaskFilterError("'now' can only be compared with <, <=, > or >=")
+    elif field == "priority":
+        _parse_enum(field, PriorityEnum, value)
+    elif field == "completed":
+        if op not in _EQUALITY_OPS:
+            raise TaskFilterError(f"Operator {op!r} is not supported for {field}")
+        _parse_bool(field, value)
+    elif field == "recurrence":
+        if op not in _EQUALITY_OPS:
+            raise TaskFilterError(f"Operator {op!r} is not supported for {field}")
+        _parse_enum(field, RecurrencePatternEnum, value)
+    else:
+        raise TaskFilterError(f"Unknown filter field {field!r}; expected one of {', '.join(FIELDS)}")
+
+
+def _validate(node: Node):
+    if isinstance(node, Term):
+        _validate_term(node)
+    elif isinstance(node, Not):
+        _validate(node.operand)
+    elif isinstance(node, (And, Or)):
+        for operand in node.operands:
+            _validate(operand)
+
+
+# ---------------------------------------------------------------------------
+# Compilation to SQL
+# ---------------------------------------------------------------------------
+
+def _negate_if(op: str, clause: ColumnElement) -> ColumnElement:
+    return not_(clause) if op == "!=" else clause
+
+
+def _compile_date(column, op: str, value: str) -> ColumnElement:
+    if value.lower() == "none":
+        return column.is_(None) if op != "!=" else column.is_not(None)
+
+    resolve, is_instant = _date_resolver(value)
+    if is_instant:
+        param = bindparam(None, callable_=resolve, type_=column.type)
+        return {"<": column < param, "<=": column <= param,
+                ">": column > param, ">=": column >= param}[op]
+
+    start = bindparam(None, callable_=resolve, type_=column.type)
+    end = bindparam(None, callable_=lambda: resolve() + timedelta(days=1), type_=column.type)
+    if op in (":", "="):
+        return and_(column >= start, column < end)
+    if op == "!=":
+        return or_(column.is_(None), column < start, column >= end)
+    # Day values are whole days: "< friday" means before Friday starts,
+    # "<= friday" includes all of Friday.
+    return {"<": column < start, "<=": column < end,
+            ">": column >= end, ">=": column >= start}[op]
+
+
+def _compile_priority(op: str, value: str) -> ColumnElement:
+    rank = _PRIORITY_RANK[PriorityEnum(value.lower())]
+    compare = {
+        ":": lambda r: r == rank, "=": lambda r: r == rank, "!=": lambda r: r != rank,
+        "<": lambda r: r < rank, "<=": lambda r: r <= rank,
+        ">": lambda r: r > rank, ">=": lambda r: r >= rank,
+    }[op]
+    # Ordered comparisons become an IN over the matching levels, which keeps
+    # the predicate index-friendly instead of ranking with a CASE expression.
+    return Task.priority.in_([level for level, r in _PRIORITY_RANK.items() if compare(r)])
+
+
+def _compile_term(term: Term) -> ColumnElement:
+    field, op, value = term.field, term.op, term.value
+    if field in _TEXT_FIELDS:
+        return _negate_if(op, func.coalesce(_TEXT_FIELDS[field], "").contains(value))
+    if field in _DATE_FIELDS:
+        return _compile_date(_DATE_FIELDS[field], op, value)
+    if field == "priority":
+        return _compile_priority(op, value)
+    if field == "completed":
+        return _negate_if(op, Task.completed == _parse_bool(field, value))
+    if field == "recurrence":
+        return _negate_if(op, Task.recurrence_pattern == _parse_enum(field, RecurrencePatternEnum, value))
+    if field == "tag":
+        has_tag = exists().where(
+            TaskTag.task_id == Task.id,
+            TaskTag.tag_id == Tag.id,
+            Tag.name == value,
+        )
+        return _negate_if(op, has_tag)
+    raise TaskFilterError(f"Unknown filter field {field!r}")
+
+
+def _compile(node: Node) -> ColumnElement:
+    if isinstance(node, Term):
+        return _compile_term(node)
+    if isinstance(node, Text):
+        return (Task.title.contains(node.value)) | (func.coalesce(Task.description, "").contains(node.value))
+    if isinstance(node, Not):
+        return not_(_compile(node.operand))
+    if isinstance(node, And):
+        return and_(*[_compile(operand) for operand in node.operands])
+    return or_(*[_compile(operand) for operand in node.operands])
+
+
+@lru_cache(maxsize=settings.TASK_FILTER_CACHE_SIZE)
+def _compile_normalized(normalized: str) -> ColumnElement:
+    return _compile(parse_task_filter(normalized))
+
+
+def compile_task_filter(expression: str) -> ColumnElement:
+    """Compile a filter expression into a WHERE clause over Task.
+
+    The result is cached by normalized expression; it does not include the
+    ownership predicate, which callers apply separately.
+    """
+    if len(expression) > settings.TASK_FILTER_MAX_LENGTH:
+        raise TaskFilterError(
+            f"Filter expression is too long (max {settings.TASK_FILTER_MAX_LENGTH} characters)"
+        )
+    return _compile_normalized(normalize_filter(expression))
+
+
+def _time_granularity(node: Node) -> Optional[str]:
+    if isinstance(node, Term):
+        if node.field not in _DATE_FIELDS or node.value.lower() == "none":
+            return None
+        if node.value.lower() == "now":
+            return "instant"
+        try:
+            datetime.strptime(node.value, "%Y-%m-%d")
+            return None
+        except ValueError:
+            return "day"
+    if isinstance(node, Not):
+        return _time_granularity(node.operand)
+    if isinstance(node, (And, Or)):
+        found = {_time_granularity(operand) for operand in node.operands}
+        if "instant" in found:
+            return "instant"
+        return "day" if "day" in found else None
+    return None
+
+
+@lru_cache(maxsize=settings.TASK_FILTER_CACHE_SIZE)
+def filter_time_granularity(expression: str) -> Optional[str]:
+    """Return how often the result of an expression can change without any write.
+
+    ``None`` means the result only changes when tasks change, ``"day"`` means it
+    depends on relative dates such as ``today``, and ``"instant"`` means it
+    compares against ``now``.
+    """
+    return _time_granularity(parse_task_filter(normalize_filter(expression)))
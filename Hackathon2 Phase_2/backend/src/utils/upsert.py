@@ -0,0 +1,44 @@
+from typing import List
+from sqlalchemy import insert, update
+from sqlmodel import Session
+
+
+def dialect_insert(session: Session, table):
+    """Return an INSERT construct that supports ON CONFLICT for the session's dialect"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table)
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+    return None
+
+
+def increment_counters(session: Session, table, rows: List[dict], key_columns: List[str], counter_columns: List[str]):
+    """Add each row's counter values to the stored row with the same key, inserting it if missing.
+
+    Uses one INSERT ... ON CONFLICT DO UPDATE per batch on PostgreSQL and
+    SQLite; other dialects fall back to UPDATE then INSERT per row.
+    """
+    if not rows:
+        return
+
+    statement = dialect_insert(session, table)
+    if statement is not None:
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={name: table.c[name] + statement.excluded[name] for name in counter_columns},
+        )
+        session.execute(statement, rows)
+        return
+
+    for row in rows:
+        key = [table.c[name] == row[name] for name in key_columns]
+        result = session.execute(
+            update(table).where(*key).values(
+                {name: table.c[name] + row.get(name, 0) for name in counter_columns}
+            )
+        )
+        if result.rowcount == 0:
+            session.execute(insert(table).values(**row))
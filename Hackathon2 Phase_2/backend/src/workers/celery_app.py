@@ -21,7 +21,7 @@ celery_app.conf.update(
 )
 
 # Import tasks to register them with Celery
-from . import reminder_worker, recurring_task_worker
+from . import reminder_worker, recurring_task_worker, purge_worker
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+from celery import Celery
+from ..config import settings
+from ..db.session import get_session
+from ..services.task_purge_service import TaskPurgeService
+from ..services.refresh_token_purge_service import RefreshTokenPurgeService
+from ..utils.idempotency import get_idempotency_store
+
+
+# Create Celery instance for purging deleted tasks, expired refresh tokens and idempotency keys
+purge_worker = Celery("purge_worker")
+purge_worker.conf.update(
+    broker_url=settings.REDIS_URL,
+    result_backend=settings.REDIS_URL,
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="UTC",
+    enable_utc=True,
+    beat_schedule={
+        "purge-deleted-tasks": {
+            "task": "workers.purge_worker.purge_deleted_tasks",
+            "schedule": settings.TASK_PURGE_INTERVAL_SECONDS,
+        },
+        "purge-refresh-tokens": {
+            "task": "workers.purge_worker.purge_refresh_tokens",
+            "schedule": settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS,
+        },
+        "purge-idempotency-keys": {
+            "task": "workers.purge_worker.purge_idempotency_keys",
+            "schedule": settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+        },
+    },
+)
+
+
+@purge_worker.task(bind=True, max_retries=3, name="workers.purge_worker.purge_deleted_tasks")
+def purge_deleted_tasks(self):
+    """
+    Hard-delete tasks whose restore window has passed, with their dependent rows
+    """
+    # Get database session
+    session_gen = get_session()
+    session = next(session_gen)
+
+    try:
+        removed = TaskPurgeService(session).purge()
+        print(f"Purged {removed} deleted tasks")
+        return {"status": "success", "purged_count": removed}
+    except Exception as exc:
+        session.rollback()
+        print(f"Error purging deleted tasks: {str(exc)}")
+        raise self.retry(exc=exc, countdown=300)  # Retry after 5 minutes
+    finally:
+        session.close()
+
+
+@purge_worker.task(bind=True, max_retries=3, name="workers.purge_worker.purge_refresh_tokens")
+def purge_refresh_tokens(self):
+    """
+    Delete expired refresh tokens in batches
+    """
+    # Get database session
+    session_gen = get_session()
+    session = next(session_gen)
+
+    try:
+        removed = RefreshTokenPurgeService(session).purge()
+        print(f"Purged {removed} expired refresh tokens")
+        return {"status": "success", "purged_count": removed}
+    except Exception as exc:
+        session.rollback()
+        print(f"Error purging refresh tokens: {str(exc)}")
+        raise self.retry(exc=exc, countdown=300)  # Retry after 5 minutes
+    finally:
+        session.close()
+
+
+@purge_worker.task(bind=True, max_retries=3, name="workers.purge_worker.purge_idempotency_keys")
+def purge_idempotency_keys(self):
+    """
+    Delete expired idempotency keys in batches
+    """
+    # Get database session
+    session_gen = get_session()
+    session = next(session_gen)
+
+    try:
+        removed = get_idempotency_store().purge_expired(session)
+        print(f"Purged {removed} expired idempotency keys")
+        return {"status": "success", "purged_count": removed}
+    except Exception as exc:
+        session.rollback()
+        print(f"Error purging idempotency keys: {str(exc)}")
+        raise self.retry(exc=exc, countdown=300)  # Retry after 5 minutes
+    finally:
+        session.close()
@@ -5,6 +5,9 @@ from ..config import settings
 from ..models.task_model import Task, RecurrencePatternEnum
 from ..models.recurring_task_history_model import RecurringTaskHistory
 from ..db.session import get_session
+from ..services.smart_list_service import SmartListService
+from ..services.analytics_service import AnalyticsService
+from ..services.task_rank_service import TaskRankService
 import calendar
 
 
@@ -33,7 +36,7 @@ def create_recurring_task_instance(self, task_id: int):
     try:
         # Get the original recurring task
         original_task = session.get(Task, task_id)
-        if not original_task:
+        if not original_task or original_task.deleted_at is not None:
             print(f"Original task with ID {task_id} not found, skipping recurring task generation")
             return {"status": "error", "message": f"Original task with ID {task_id} not found"}
         
@@ -50,10 +53,17 @@ def create_recurring_task_instance(self, task_id: int):
             recurrence_pattern=original_task.recurrence_pattern,
             reminder_time=original_task.reminder_time,
             user_id=original_task.user_id,  # Same user as the original task
-            last_occurrence_id=original_task.id  # Link to the original task
+            last_occurrence_id=original_task.id,  # Link to the original task
+            rank=TaskRankService(session).new_ranks(original_task.user_id, 1)[0]  # Top of the manual order, like new tasks
         )
         
         session.add(next_task)
+        session.flush()
+
+        # Keep materialized smart list membership in step with the new instance
+        SmartListService(session).sync_task(next_task.id, next_task.user_id)
+        AnalyticsService(session).record_created(next_task, [])
+
         session.commit()
         session.refresh(next_task)
         
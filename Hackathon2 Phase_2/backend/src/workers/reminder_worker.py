@@ -32,7 +32,7 @@ def send_reminder_task(self, task_id: int):
     try:
         # Get the task
         task = session.get(Task, task_id)
-        if not task:
+        if not task or task.deleted_at is not None:
             # Log error and don't retry if task doesn't exist
             print(f"Task with ID {task_id} not found, skipping reminder")
             return {"status": "error", "message": f"Task with ID {task_id} not found"}
@@ -0,0 +1,63 @@
+"""Shared fixtures: the app runs against a throwaway SQLite database.
+
+Settings are read from the environment when src is first imported, so the
+environment is set up here before anything from src is loaded.
+"""
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix="todo-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["AUTH_RATE_LIMIT_IP_BURST"] = "100000"
+os.environ["AUTH_RATE_LIMIT_EMAIL_BURST"] = "100000"
+os.environ["IDEMPOTENCY_WAIT_SECONDS"] = "0.3"
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+import main  # noqa: E402
+import initialize_db  # noqa: E402,F401  (registers every model on the metadata)
+from database import get_engine  # noqa: E402
+
+PASSWORD = "TestPass123"
+
+
+@pytest.fixture(scope="session")
+def client():
+    SQLModel.metadata.create_all(get_engine())
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client):
+    """Register a fresh user and return the Authorization headers for them"""
+    def make():
+        email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+        response = client.post("/api/auth/register", json={"email": email, "password": PASSWORD})
+        assert response.status_code in (200, 201), response.text
+        response = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return make
+
+
+@pytest.fixture
+def headers(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def create_task(client):
+    def create(headers, title="Task", **fields):
+        response = client.post("/api/tasks", json={"title": title, **fields}, headers=headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+    return create
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from utils.fractional_index import key_between, n_keys_between, validate_key
+
+
+def test_first_key_and_appending():
+    first = key_between(None, None)
+    validate_key(first)
+    keys = [first]
+    for _ in range(100):
+        keys.append(key_between(keys[-1], None))
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_prepending():
+    keys = [key_between(None, None)]
+    for _ in range(100):
+        keys.insert(0, key_between(None, keys[0]))
+    assert keys == sorted(keys)
+
+
+def test_key_between_is_strictly_between():
+    a = key_between(None, None)
+    b = key_between(a, None)
+    for _ in range(50):
+        middle = key_between(a, b)
+        validate_key(middle)
+        assert a < middle < b
+        b = middle
+
+
+def test_random_inserts_keep_order():
+    rng = random.Random(1234)
+    keys = [key_between(None, None)]
+    for _ in range(500):
+        i = rng.randint(0, len(keys))
+        before = keys[i - 1] if i > 0 else None
+        after = keys[i] if i < len(keys) else None
+        key = key_between(before, after)
+        validate_key(key)
+        keys.insert(i, key)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+@pytest.mark.parametrize("bounds", [(None, None), ("a0", None), (None, "a0"), ("a0", "a1"), ("a0", "a0V")])
+@pytest.mark.parametrize("n", [0, 1, 2, 7, 64])
+def test_n_keys_between(bounds, n):
+    a, b = bounds
+    keys = n_keys_between(a, b, n)
+    assert len(keys) == n
+    assert keys == sorted(keys)
+    assert len(set(keys)) == n
+    for key in keys:
+        validate_key(key)
+        assert a is None or key > a
+        assert b is None or key < b
+
+
+def test_rejects_bounds_out_of_order():
+    with pytest.raises(ValueError):
+        key_between("a1", "a0")
+    with pytest.raises(ValueError):
+        key_between("a0", "a0")
+
+
+@pytest.mark.parametrize("key", ["", "a", "a0!", "a10", "A" + "0" * 26, "?0"])
+def test_validate_key_rejects_malformed_keys(key):
+    with pytest.raises(ValueError):
+        validate_key(key)
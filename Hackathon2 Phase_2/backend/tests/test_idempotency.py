@@ -0,0 +1,74 @@
+import uuid
+
+from sqlmodel import Session
+
+from database import get_engine
+from utils.idempotency import CLAIMED, get_idempotency_store, request_fingerprint
+
+
+def _titles(client, headers):
+    return [task["title"] for task in client.get("/api/tasks", headers=headers).json()]
+
+
+def test_retry_replays_the_first_response(client, headers):
+    key = {"Idempotency-Key": str(uuid.uuid4())}
+    first = client.post("/api/tasks", json={"title": "Once"}, headers={**headers, **key})
+    assert first.status_code == 201, first.text
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = client.post("/api/tasks", json={"title": "Once"}, headers={**headers, **key})
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert retry.headers["ETag"] == first.headers["ETag"]
+    assert _titles(client, headers) == ["Once"]
+
+
+def test_key_reused_for_another_payload_is_rejected(client, headers):
+    key = {"Idempotency-Key": str(uuid.uuid4())}
+    assert client.post("/api/tasks", json={"title": "A"}, headers={**headers, **key}).status_code == 201
+    response = client.post("/api/tasks", json={"title": "B"}, headers={**headers, **key})
+    assert response.status_code == 422
+    assert _titles(client, headers) == ["A"]
+
+
+def test_keys_are_scoped_to_the_user(client, make_user):
+    key = {"Idempotency-Key": str(uuid.uuid4())}
+    alice, bob = make_user(), make_user()
+    assert client.post("/api/tasks", json={"title": "Same"}, headers={**alice, **key}).status_code == 201
+    response = client.post("/api/tasks", json={"title": "Same"}, headers={**bob, **key})
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+    assert _titles(client, bob) == ["Same"]
+
+
+def test_key_length_is_checked(client, headers):
+    for key in ("", "k" * 256):
+        response = client.post("/api/tasks", json={"title": "X"}, headers={**headers, "Idempotency-Key": key})
+        assert response.status_code == 400
+    assert _titles(client, headers) == []
+
+
+def test_client_errors_are_stored(client, headers):
+    key = {"Idempotency-Key": str(uuid.uuid4())}
+    first = client.put("/api/tasks/999999999", json={"title": "Gone"}, headers={**headers, **key})
+    assert first.status_code == 404
+    retry = client.put("/api/tasks/999999999", json={"title": "Gone"}, headers={**headers, **key})
+    assert retry.status_code == 404
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_duplicate_of_a_request_still_running_gets_409(client, headers, create_task):
+    task = create_task(headers)
+    key = str(uuid.uuid4())
+    route = f"/api/tasks/{task['id']}/toggle-complete"
+    with Session(get_engine()) as session:
+        # Claim the key as if the first request were still running
+        state, _ = get_idempotency_store().claim(
+            session, task["user_id"], key, request_fingerprint(f"PATCH /tasks/{task['id']}/toggle-complete")
+        )
+    assert state == CLAIMED
+
+    response = client.patch(route, headers={**headers, "Idempotency-Key": key})
+    assert response.status_code == 409
+    assert client.get(f"/api/tasks/{task['id']}", headers=headers).json()["completed"] is False
@@ -0,0 +1,67 @@
+def _version(response):
+    return int(response.headers["ETag"].strip('"').lstrip("v"))
+
+
+def test_get_returns_the_version_as_etag(client, headers, create_task):
+    task = create_task(headers)
+    response = client.get(f"/api/tasks/{task['id']}", headers=headers)
+    assert response.headers["ETag"] == f'"v{task["version"]}"'
+
+
+def test_update_with_current_etag_applies(client, headers, create_task):
+    task = create_task(headers, "Draft")
+    etag = client.get(f"/api/tasks/{task['id']}", headers=headers).headers["ETag"]
+
+    response = client.put(f"/api/tasks/{task['id']}", json={"title": "Final"}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200, response.text
+    assert response.json()["title"] == "Final"
+    assert _version(response) == task["version"] + 1
+
+
+def test_update_with_stale_etag_is_refused(client, headers, create_task):
+    task = create_task(headers, "Draft")
+    stale = f'"v{task["version"]}"'
+    assert client.put(f"/api/tasks/{task['id']}", json={"title": "Theirs"}, headers=headers).status_code == 200
+
+    response = client.put(f"/api/tasks/{task['id']}", json={"title": "Mine"}, headers={**headers, "If-Match": stale})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == f'"v{task["version"] + 1}"'
+    assert client.get(f"/api/tasks/{task['id']}", headers=headers).json()["title"] == "Theirs"
+
+
+def test_if_match_accepts_lists_weak_tags_and_wildcard(client, headers, create_task):
+    task = create_task(headers)
+    url = f"/api/tasks/{task['id']}"
+    version = task["version"]
+
+    response = client.put(url, json={"title": "1"}, headers={**headers, "If-Match": f'"v999", W/"v{version}"'})
+    assert response.status_code == 200
+    response = client.put(url, json={"title": "2"}, headers={**headers, "If-Match": "*"})
+    assert response.status_code == 200
+    response = client.put(url, json={"title": "3"}, headers={**headers, "If-Match": "garbage"})
+    assert response.status_code == 412
+
+
+def test_toggle_honors_if_match(client, headers, create_task):
+    task = create_task(headers)
+    url = f"/api/tasks/{task['id']}/toggle-complete"
+    stale = f'"v{task["version"]}"'
+
+    response = client.patch(url, headers={**headers, "If-Match": stale})
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+
+    response = client.patch(url, headers={**headers, "If-Match": stale})
+    assert response.status_code == 412
+    assert client.get(f"/api/tasks/{task['id']}", headers=headers).json()["completed"] is True
+
+
+def test_move_and_reparent_honor_if_match(client, headers, create_task):
+    parent = create_task(headers, "Parent")
+    task = create_task(headers, "Child")
+    stale = {**headers, "If-Match": '"v999"'}
+
+    assert client.patch(f"/api/tasks/{task['id']}/move", json={"after": parent["id"]}, headers=stale).status_code == 412
+    response = client.patch(f"/api/tasks/{task['id']}/parent", json={"parent_id": parent["id"]}, headers=stale)
+    assert response.status_code == 412
+    assert client.get(f"/api/tasks/{task['id']}", headers=headers).json()["parent_id"] is None
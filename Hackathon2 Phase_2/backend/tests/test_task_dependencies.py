@@ -0,0 +1,37 @@
+def _block(client, headers, task_id, blocker_id):
+    return client.post(f"/api/tasks/{task_id}/blockers", json={"blocker_id": blocker_id}, headers=headers)
+
+
+def _actionable(client, headers):
+    return {task["title"] for task in client.get("/api/tasks/actionable", headers=headers).json()}
+
+
+def test_cycles_are_rejected(client, headers, create_task):
+    a, b, c = (create_task(headers, title) for title in "ABC")
+    assert _block(client, headers, b["id"], a["id"]).status_code == 201
+    assert _block(client, headers, c["id"], b["id"]).status_code == 201
+
+    assert _block(client, headers, a["id"], c["id"]).status_code == 400
+    assert _block(client, headers, a["id"], b["id"]).status_code == 400
+    assert _block(client, headers, a["id"], a["id"]).status_code == 400
+
+
+def test_blockers_of_another_user_are_not_found(client, make_user, create_task):
+    alice, bob = make_user(), make_user()
+    mine, theirs = create_task(alice), create_task(bob)
+    assert _block(client, alice, mine["id"], theirs["id"]).status_code == 404
+
+
+def test_actionable_follows_blocker_completion(client, headers, create_task):
+    blocker, blocked = create_task(headers, "Blocker"), create_task(headers, "Blocked")
+    assert _block(client, headers, blocked["id"], blocker["id"]).status_code == 201
+    assert _actionable(client, headers) == {"Blocker"}
+
+    client.patch(f"/api/tasks/{blocker['id']}/toggle-complete", headers=headers)
+    assert _actionable(client, headers) == {"Blocked"}
+
+    client.patch(f"/api/tasks/{blocker['id']}/toggle-complete", headers=headers)
+    assert _actionable(client, headers) == {"Blocker"}
+
+    assert client.delete(f"/api/tasks/{blocked['id']}/blockers/{blocker['id']}", headers=headers).status_code == 204
+    assert _actionable(client, headers) == {"Blocker", "Blocked"}
@@ -0,0 +1,83 @@
+import pytest
+
+from utils.task_filter import (
+    And, Not, Or, Term, Text, TaskFilterError, normalize_filter, parse_task_filter,
+)
+
+
+def test_parses_precedence_and_implicit_and():
+    node = parse_task_filter('priority:high AND (tag:work OR due<friday) NOT completed:true')
+    assert node == And((
+        Term("priority", ":", "high"),
+        Or((Term("tag", ":", "work"), Term("due", "<", "friday"))),
+        Not(Term("completed", ":", "true")),
+    ))
+
+
+def test_field_names_and_keywords_are_case_insensitive():
+    assert parse_task_filter("Priority:high or TAG:work") == Or((
+        Term("priority", ":", "high"), Term("tag", ":", "work"),
+    ))
+
+
+def test_quoted_values_and_free_text():
+    assert parse_task_filter('title:"weekly review" groceries') == And((
+        Term("title", ":", "weekly review"), Text("groceries"),
+    ))
+
+
+@pytest.mark.parametrize("expression", [
+    "",
+    "   ",
+    "(priority:high",
+    "priority:high)",
+    "priority:high AND",
+    "NOT",
+    "colour:red",
+    "priority:urgent",
+    "completed<true",
+    "due:someday",
+    "priority:",
+    "due<",
+    "priority: high",
+    'title:"unterminated',
+])
+def test_rejects_malformed_expressions(expression):
+    with pytest.raises(TaskFilterError):
+        parse_task_filter(expression)
+
+
+def test_rejects_too_many_terms():
+    with pytest.raises(TaskFilterError, match="too many terms"):
+        parse_task_filter(" OR ".join(["priority:high"] * 21))
+    parse_task_filter(" OR ".join(["priority:high"] * 20))
+
+
+def test_rejects_deep_nesting():
+    with pytest.raises(TaskFilterError, match="nested too deeply"):
+        parse_task_filter("(" * 8 + "priority:high" + ")" * 8)
+    with pytest.raises(TaskFilterError, match="nested too deeply"):
+        parse_task_filter("NOT " * 8 + "priority:high")
+    parse_task_filter("(" * 7 + "priority:high" + ")" * 7)
+
+
+def test_rejects_long_expressions():
+    with pytest.raises(TaskFilterError, match="too long"):
+        parse_task_filter("x" * 501)
+
+
+def test_normalize_collapses_whitespace_outside_quotes():
+    assert normalize_filter('  priority:high   AND\ttitle:"a  b" ') == 'priority:high AND title:"a  b"'
+
+
+def test_filter_errors_are_bad_requests(client, headers, create_task):
+    create_task(headers, "Pay rent", priority="high")
+    create_task(headers, "Water plants", priority="low")
+
+    response = client.get("/api/tasks", params={"q": "priority:high"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert [task["title"] for task in response.json()] == ["Pay rent"]
+
+    for expression in ("priority:", "(priority:high", "colour:red"):
+        response = client.get("/api/tasks", params={"q": expression}, headers=headers)
+        assert response.status_code == 400, (expression, response.text)
@@ -0,0 +1,45 @@
+def _reparent(client, headers, task_id, parent_id):
+    return client.patch(f"/api/tasks/{task_id}/parent", json={"parent_id": parent_id}, headers=headers)
+
+
+def _subtree(client, headers, task_id):
+    response = client.get(f"/api/tasks/{task_id}/subtree", headers=headers)
+    assert response.status_code == 200, response.text
+    return {task["title"]: task["depth"] for task in response.json()["subtasks"]}
+
+
+def test_moving_a_subtree_updates_depths(client, headers, create_task):
+    root, other = create_task(headers, "Root"), create_task(headers, "Other")
+    child = create_task(headers, "Child", parent_id=root["id"])
+    create_task(headers, "Grandchild", parent_id=child["id"])
+    assert _subtree(client, headers, root["id"]) == {"Child": 1, "Grandchild": 2}
+
+    assert _reparent(client, headers, child["id"], other["id"]).status_code == 200
+    assert _subtree(client, headers, root["id"]) == {}
+    assert _subtree(client, headers, other["id"]) == {"Child": 1, "Grandchild": 2}
+
+    assert _reparent(client, headers, child["id"], None).status_code == 200
+    assert _subtree(client, headers, child["id"]) == {"Grandchild": 1}
+
+
+def test_a_task_cannot_move_under_its_own_subtree(client, headers, create_task):
+    root = create_task(headers, "Root")
+    child = create_task(headers, "Child", parent_id=root["id"])
+    assert _reparent(client, headers, root["id"], child["id"]).status_code == 400
+    assert _reparent(client, headers, root["id"], root["id"]).status_code == 400
+
+
+def test_delete_and_restore_a_subtree(client, headers, create_task):
+    root = create_task(headers, "Root")
+    child = create_task(headers, "Child", parent_id=root["id"])
+
+    assert client.delete(f"/api/tasks/{root['id']}", headers=headers).status_code == 204
+    assert client.get(f"/api/tasks/{child['id']}", headers=headers).status_code == 404
+
+    # The child went with its parent, so it cannot come back on its own
+    assert client.post(f"/api/tasks/{child['id']}/restore", headers=headers).status_code == 400
+
+    response = client.post(f"/api/tasks/{root['id']}/restore", headers=headers)
+    assert response.status_code == 200, response.text
+    assert client.get(f"/api/tasks/{child['id']}", headers=headers).status_code == 200
+    assert _subtree(client, headers, root["id"]) == {"Child": 1}